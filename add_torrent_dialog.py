@@ -5,18 +5,30 @@ Add Torrent Dialog - Dialog for adding new torrents
 import os
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                              QLineEdit, QPushButton, QFileDialog, QCheckBox,
-                             QTreeWidget, QTreeWidgetItem, QDialogButtonBox,
-                             QGroupBox, QFormLayout)
-from PyQt5.QtCore import Qt
+                             QTreeView, QDialogButtonBox, QGroupBox, QFormLayout)
+from PyQt5.QtCore import Qt, pyqtSignal
 import libtorrent as lt
 
+from magnet_resolver import torrent_summary
+from file_tree_model import FileTreeModel, EXPAND_ALL_MAX_FILES
+
 class AddTorrentDialog(QDialog):
-    def __init__(self, torrent_path_or_magnet, parent=None):
+    # Delivered on the manager thread, which answers with metadata_looked_up
+    resolve_requested = pyqtSignal(str)  # magnet link
+    cancel_requested = pyqtSignal(str)  # hash
+    
+    def __init__(self, torrent_path_or_magnet, parent=None, torrent_manager=None):
         super().__init__(parent)
         self.torrent_path_or_magnet = torrent_path_or_magnet
         self.is_magnet = torrent_path_or_magnet.startswith('magnet:')
         self.torrent_info = None
         
+        # Magnet metadata is fetched in the background while the dialog is open
+        self.torrent_manager = torrent_manager
+        self.torrent_hash = None
+        self.metadata = None  # {'name', 'total_size', 'files': [(path, size)]}
+        self.files_model = None
+        
         self.init_ui()
         self.load_torrent_info()
         
@@ -68,9 +80,9 @@ class AddTorrentDialog(QDialog):
         self.files_group = QGroupBox("Files")
         files_layout = QVBoxLayout(self.files_group)
         
-        self.files_tree = QTreeWidget()
-        self.files_tree.setHeaderLabels(["File", "Size"])
+        self.files_tree = QTreeView()
         self.files_tree.setRootIsDecorated(True)
+        self.files_tree.setUniformRowHeights(True)  # Lets the view skip measuring every row
         files_layout.addWidget(self.files_tree)
         
         # Select all/none buttons
@@ -99,85 +111,76 @@ class AddTorrentDialog(QDialog):
         """Load torrent information"""
         try:
             if self.is_magnet:
-                # For magnet links, we can't get detailed info without starting the download
                 self.name_label.setText("Magnet Link")
-                self.size_label.setText("Unknown (will be determined after metadata download)")
+                if self.torrent_manager is None:
+                    self.size_label.setText("Unknown (will be determined after metadata download)")
+                    self.files_label.setText("Unknown")
+                    return
+                    
+                # Fetch the metadata from peers on the manager thread; cached metadata shows up right away
+                self.torrent_hash = str(lt.parse_magnet_uri(self.torrent_path_or_magnet).info_hash)
+                self.size_label.setText("Fetching metadata from peers...")
                 self.files_label.setText("Unknown")
+                self.torrent_manager.metadata_looked_up.connect(self.on_metadata_resolved)
+                self.torrent_manager.metadata_resolved.connect(self.on_metadata_resolved)
+                self.resolve_requested.connect(self.torrent_manager.resolve_metadata)
+                self.cancel_requested.connect(self.torrent_manager.cancel_metadata)
+                self.resolve_requested.emit(self.torrent_path_or_magnet)
             else:
                 # Load from torrent file
                 self.torrent_info = lt.torrent_info(self.torrent_path_or_magnet)
-                
-                # Update labels
-                self.name_label.setText(self.torrent_info.name())
-                self.size_label.setText(self.format_size(self.torrent_info.total_size()))
-                self.files_label.setText(f"{self.torrent_info.num_files()} files")
-                
-                # Load file list if multi-file torrent
-                if self.torrent_info.num_files() > 1:
-                    self.load_file_list()
-                    self.files_group.setVisible(True)
+                self.show_metadata(torrent_summary(self.torrent_info))
                     
         except Exception as e:
             self.name_label.setText("Error loading torrent")
             self.size_label.setText(str(e))
             self.files_label.setText("0 files")
             
+    def show_metadata(self, metadata):
+        """Show name, size and files once the metadata is known"""
+        self.metadata = metadata
+        
+        # Update labels
+        self.name_label.setText(metadata['name'])
+        self.size_label.setText(self.format_size(metadata['total_size']))
+        self.files_label.setText(f"{len(metadata['files'])} files")
+        
+        # Load file list if multi-file torrent
+        if len(metadata['files']) > 1:
+            self.load_file_list()
+            self.files_group.setVisible(True)
+            
+    def on_metadata_resolved(self, torrent_hash, metadata):
+        """Fill in the dialog when the magnet link's metadata is known"""
+        if torrent_hash == self.torrent_hash and metadata is not None and self.metadata is None:
+            self.show_metadata(metadata)
+            
+    def done(self, result):
+        """Stop resolving the magnet link unless it is being added"""
+        if self.torrent_hash is not None:
+            self.torrent_manager.metadata_looked_up.disconnect(self.on_metadata_resolved)
+            self.torrent_manager.metadata_resolved.disconnect(self.on_metadata_resolved)
+            if result != QDialog.Accepted:
+                # Queued behind the resolve request, so a resolve still on its way is undone too
+                self.cancel_requested.emit(self.torrent_hash)
+            self.torrent_hash = None
+        super().done(result)
+        
     def load_file_list(self):
         """Load file list for multi-file torrents"""
-        if not self.torrent_info:
+        if not self.metadata:
             return
             
-        self.files_tree.clear()
-        
-        # Group files by directory
-        file_structure = {}
-        
-        for i in range(self.torrent_info.num_files()):
-            file_info = self.torrent_info.file_at(i)
-            file_path = file_info.path
-            file_size = file_info.size
+        # Directories are only built when expanded, so huge torrents open instantly
+        self.files_model = FileTreeModel(self.metadata['files'], self)
+        self.files_tree.setModel(self.files_model)
+        self.files_tree.setColumnWidth(0, 400)
+        
+        if len(self.metadata['files']) <= EXPAND_ALL_MAX_FILES:
+            self.files_tree.expandAll()
+        else:
+            self.files_tree.expandToDepth(0)
             
-            # Split path into components
-            path_parts = file_path.split('/')
-            
-            # Build directory structure
-            current_dict = file_structure
-            for part in path_parts[:-1]:  # All but the filename
-                if part not in current_dict:
-                    current_dict[part] = {}
-                current_dict = current_dict[part]
-                
-            # Add file
-            filename = path_parts[-1]
-            current_dict[filename] = {
-                'size': file_size,
-                'index': i,
-                'is_file': True
-            }
-            
-        # Populate tree widget
-        self.populate_file_tree(self.files_tree.invisibleRootItem(), file_structure)
-        
-        # Expand all items
-        self.files_tree.expandAll()
-        
-    def populate_file_tree(self, parent_item, structure):
-        """Recursively populate the file tree"""
-        for name, content in structure.items():
-            item = QTreeWidgetItem(parent_item)
-            item.setText(0, name)
-            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
-            item.setCheckState(0, Qt.Checked)
-            
-            if isinstance(content, dict) and content.get('is_file', False):
-                # This is a file
-                item.setText(1, self.format_size(content['size']))
-                item.setData(0, Qt.UserRole, content['index'])
-            else:
-                # This is a directory
-                item.setText(1, "")
-                self.populate_file_tree(item, content)
-                
     def browse_download_path(self):
         """Browse for download directory"""
         path = QFileDialog.getExistingDirectory(
@@ -196,14 +199,8 @@ class AddTorrentDialog(QDialog):
         
     def set_all_files_checked(self, state):
         """Set check state for all files"""
-        def set_item_checked(item, state):
-            item.setCheckState(0, state)
-            for i in range(item.childCount()):
-                set_item_checked(item.child(i), state)
-                
-        root = self.files_tree.invisibleRootItem()
-        for i in range(root.childCount()):
-            set_item_checked(root.child(i), state)
+        if self.files_model is not None:
+            self.files_model.set_all_checked(state == Qt.Checked)
             
     def get_download_path(self):
         """Get the selected download path"""
@@ -215,25 +212,10 @@ class AddTorrentDialog(QDialog):
         
     def get_selected_files(self):
         """Get list of selected file indices"""
-        if not self.files_group.isVisible():
-            return None  # Single file or magnet, download all
-            
-        selected_files = []
-        
-        def check_item(item):
-            if item.checkState(0) == Qt.Checked:
-                file_index = item.data(0, Qt.UserRole)
-                if file_index is not None:  # This is a file, not a directory
-                    selected_files.append(file_index)
-                    
-            for i in range(item.childCount()):
-                check_item(item.child(i))
-                
-        root = self.files_tree.invisibleRootItem()
-        for i in range(root.childCount()):
-            check_item(root.child(i))
+        if self.files_model is None:
+            return None  # Single file or magnet without metadata, download all
             
-        return selected_files
+        return self.files_model.selected_files()
         
     def format_size(self, size_bytes):
         """Format file size in human readable format"""
@@ -0,0 +1,44 @@
+"""
+Alert Dispatcher - Routes libtorrent alerts to registered handlers
+"""
+
+import threading
+
+
+class AlertDispatcher(threading.Thread):
+    """Background thread that waits for session alerts and dispatches them by type.
+
+    This is the only place that pops alerts from the session. Alert objects
+    are only valid until the next pop_alerts() call, so handlers run on this
+    thread and must copy whatever they need before returning.
+    """
+
+    def __init__(self, session, timeout_ms=500):
+        super().__init__(name='AlertDispatcher', daemon=True)
+        self.session = session
+        self.timeout_ms = timeout_ms
+        self.handlers = {}  # alert type -> [handlers]
+        self._stop_event = threading.Event()
+
+    def register(self, alert_type, handler):
+        """Register a handler for an alert type (e.g. lt.torrent_finished_alert)"""
+        self.handlers.setdefault(alert_type, []).append(handler)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            # Blocks in the session until an alert is posted, no polling
+            if self.session.wait_for_alert(self.timeout_ms) is None:
+                continue
+
+            for alert in self.session.pop_alerts():
+                for handler in self.handlers.get(type(alert), ()):
+                    try:
+                        handler(alert)
+                    except Exception as e:
+                        print(f"Error handling {alert.what()} alert: {e}")
+
+    def stop(self):
+        """Stop the dispatcher thread and wait for it to exit"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(self.timeout_ms / 1000.0 * 2)
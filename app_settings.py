@@ -0,0 +1,161 @@
+"""
+App Settings - Reads the preferences the engine needs, with or without Qt
+"""
+
+import os
+import sys
+import re
+import configparser
+
+ORGANIZATION = "PyTorrent"
+APPLICATION = "PyTorrent"
+
+# Escapes QSettings writes in INI string values: \xNNNN (UTF-16 code units in hex) and \<char>
+ESCAPE_PATTERN = re.compile(r'\\x([0-9a-fA-F]+)|\\(.)', re.DOTALL)
+ESCAPES = {'a': '\a', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t', 'v': '\v'}
+
+
+def unescape_ini(raw):
+    """Decode a string value the way QSettings reads its INI files.
+
+    Non-ASCII characters are written as hex UTF-16 code units (surrogate
+    pairs beyond the BMP) and a hex digit right after one is escaped too,
+    since the digits are read greedily. Control characters are C escapes:
+
+    >>> unescape_ini(r'/home/j\\xfcrgen/T\\xe9l\\xe9\\x63hargements/\\x65e5\\x672c')
+    '/home/jürgen/Téléchargements/日本'
+    >>> unescape_ini(r'a = 1\\nb = \\xd83c\\xdfb5\\\\x')
+    'a = 1\\nb = 🎵\\\\x'
+    """
+    def replace(match):
+        if match.group(1) is not None:
+            # A surrogate half is combined with its partner when encoded below
+            return chr(int(match.group(1), 16) & 0xFFFF)
+        return ESCAPES.get(match.group(2), match.group(2))
+
+    decoded = ESCAPE_PATTERN.sub(replace, raw)
+    return decoded.encode('utf-16', 'surrogatepass').decode('utf-16')
+
+
+class IniSettings:
+    """Read-only QSettings look-alike over the INI file QSettings writes on Linux.
+
+    Lets the headless daemon share the GUI's preferences without loading Qt.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            config_home = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+            path = os.path.join(config_home, ORGANIZATION, f"{APPLICATION}.conf")
+        self.path = path
+        self._parser = configparser.RawConfigParser()
+        self._parser.optionxform = str  # Keys are case sensitive, as in QSettings
+        try:
+            self._parser.read(path, encoding='utf-8')
+        except configparser.Error as e:
+            print(f"Error reading settings from {path}: {e}")
+
+    def value(self, key, default=None, type=None):
+        """Get a value like QSettings.value(key, default, type=...)"""
+        section, _, name = key.rpartition('/')
+        section = section or 'General'
+        if not self._parser.has_option(section, name):
+            return default
+
+        raw = self._parser.get(section, name)
+        if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+            raw = raw[1:-1]
+        # QSettings escapes non-ASCII characters, newlines and backslashes
+        raw = unescape_ini(raw)
+        try:
+            if type is bool:
+                return raw.lower() == 'true'
+            if type is not None:
+                return type(raw)
+        except ValueError:
+            return default
+        return raw
+
+
+def open_settings(use_qt=True):
+    """Get the application settings: QSettings if wanted and available, else the INI file"""
+    if use_qt:
+        try:
+            from PyQt5.QtCore import QSettings
+            return QSettings(ORGANIZATION, APPLICATION)
+        except ImportError:
+            pass
+    return IniSettings()
+
+
+def load_preferences(settings):
+    """Collect the session, queue, bandwidth schedule, performance, download and watch folder preferences"""
+    session_settings = {
+        # Connection settings
+        'port': settings.value("connection/port", 6881, type=int),
+        'enable_dht': settings.value("connection/enable_dht", True, type=bool),
+        'enable_lsd': settings.value("connection/enable_lsd", True, type=bool),
+        'enable_upnp': settings.value("connection/upnp", True, type=bool),
+        'enable_natpmp': settings.value("connection/upnp", True, type=bool),  # Use same setting as UPnP
+        'max_connections': settings.value("connection/max_connections", 200, type=int),
+        'max_uploads': settings.value("connection/max_uploads", 4, type=int),
+        'auto_tune': settings.value("connection/auto_tune", False, type=bool),
+
+        # Bandwidth settings
+        'limit_download': settings.value("bandwidth/limit_download", False, type=bool),
+        'download_limit': settings.value("bandwidth/download_limit", 1000, type=int),
+        'limit_upload': settings.value("bandwidth/limit_upload", False, type=bool),
+        'upload_limit': settings.value("bandwidth/upload_limit", 100, type=int),
+        'lan_unthrottled': settings.value("bandwidth/lan_unthrottled", True, type=bool),
+    }
+
+    download_path = settings.value("downloads/default_path",
+                                   os.path.join(os.path.expanduser('~'), 'Downloads', 'PyTorrent'))
+
+    # Resume data checkpoint interval, stored in minutes
+    resume_interval = settings.value("downloads/resume_interval", 5, type=int)
+
+    # How many torrents run at once; -1 is unlimited
+    queue_settings = {
+        'enabled': settings.value("downloads/auto_manage", True, type=bool),
+        'active_downloads': settings.value("queue/active_downloads", 3, type=int),
+        'active_seeds': settings.value("queue/active_seeds", 5, type=int),
+        'active_checking': settings.value("queue/active_checking", 1, type=int),
+        'active_limit': settings.value("queue/active_limit", 15, type=int),
+    }
+
+    # Alternative rate limits (KB/s) and the weekly schedule switching to them
+    bandwidth_schedule = {
+        'alt_limits': settings.value("bandwidth/alt_limits", False, type=bool),
+        'alt_download': settings.value("bandwidth/alt_download", 500, type=int),
+        'alt_upload': settings.value("bandwidth/alt_upload", 50, type=int),
+        'schedule_enabled': settings.value("bandwidth/schedule_enabled", False, type=bool),
+        'schedule': settings.value("bandwidth/schedule", "") or None,
+    }
+
+    # Disk and buffer settings: a named profile and raw libtorrent settings on top
+    performance_settings = {
+        'profile': settings.value("performance/profile", "desktop"),
+        'overrides': settings.value("performance/overrides", ""),
+    }
+
+    # Spool directory for .torrent/.magnet files
+    watch_folder = None
+    if settings.value("downloads/watch_enabled", False, type=bool):
+        watch_folder = settings.value("downloads/watch_path", "") or None
+
+    return {
+        'session': session_settings,
+        'download_path': download_path,
+        'resume_interval': resume_interval * 60,
+        'queue': queue_settings,
+        'bandwidth_schedule': bandwidth_schedule,
+        'performance': performance_settings,
+        'watch_folder': watch_folder,
+        'watch_polling': settings.value("downloads/watch_polling", False, type=bool)
+    }
+
+
+def headless_settings():
+    """Settings for the headless daemon, which avoids loading Qt where the INI file can be read directly"""
+    return open_settings(use_qt=not sys.platform.startswith('linux'))
@@ -0,0 +1,320 @@
+"""
+Auto Tuner - Adjusts connection, request queue and choking settings from session counters
+"""
+
+import time
+import threading
+from collections import deque
+
+# choking_algorithm values (settings_pack::choking_algorithm_t)
+FIXED_SLOTS_CHOKER = 0
+RATE_BASED_CHOKER = 2
+
+# Settings the tuner owns while it is on, and the range it keeps them in
+BOUNDS = {
+    'connections_limit': (50, 2000),
+    'connection_speed': (5, 200),
+    'max_out_request_queue': (250, 5000),
+    'unchoke_slots_limit': (2, 100),
+    'choking_algorithm': (FIXED_SLOTS_CHOKER, RATE_BASED_CHOKER),
+}
+TUNED_SETTINGS = tuple(BOUNDS)
+
+EVALUATE_INTERVAL = 10.0  # Seconds between decisions
+SETTLE_TIME = 30.0  # Seconds a changed setting is left alone before it is judged or changed again
+SMOOTHING = 0.3  # Weight of a new sample in the moving averages
+
+MIN_ACTIVE_RATE = 50 * 1024  # Below this payload rate (B/s) throughput says nothing
+MIN_GAIN = 0.05  # A raise has to improve throughput this much to be kept
+PLATEAU_CHANGE = 0.25  # Probe again once throughput moved this far from where raising stopped helping
+LIMIT_HEADROOM = 0.9  # Near a rate limit, the limit is what holds throughput back
+
+TIMEOUT_WASTE_RATIO = 0.02  # Share of the download lost to timed out requests that means the queue is too deep
+PEER_TIMEOUT_RATE = 0.2  # Peers timing out per second that means the same
+DISK_BACKLOG_RATIO = 0.8  # Write queue fill (of max_queued_disk_bytes) at which the disk is the bottleneck
+CONNECT_TIMEOUT_RATIO = 0.5  # Share of connection attempts timing out at which we connect slower
+
+# Upload rate per unchoked peer (B/s): below LOW slots are spread too thin, above HIGH more fit
+SLOT_RATE_LOW = 4 * 1024
+SLOT_RATE_HIGH = 64 * 1024
+
+LOG_SIZE = 500
+
+
+def clamp(name, value):
+    low, high = BOUNDS[name]
+    return max(low, min(high, int(value)))
+
+
+def format_rate(rate):
+    return f"{rate / 1024:.0f} KB/s"
+
+
+class AutoTuner:
+    """Closed-loop tuning of the settings that decide how full the network pipe is.
+
+    observe() takes session counters every poll tick and keeps moving
+    averages; every EVALUATE_INTERVAL it decides. Safety rules come
+    first: requests timing out or a disk write backlog shrink the
+    per-peer request queue, connection attempts timing out slow down
+    connecting. Otherwise settings are raised, one at a time, while there
+    is throughput to gain (a hill climb): a raise is judged after
+    SETTLE_TIME and undone if payload throughput did not improve by
+    MIN_GAIN, and not tried again until throughput moves. Under an upload
+    limit the rate-based choker sizes unchoke slots to it; without one the
+    fixed slots are sized to the upload rate per peer.
+
+    Values stay within BOUNDS. apply_settings(values) pushes changes to
+    the session, on_change(entry) reports each one; entries also go to
+    log, with the setting, old and new value and the reason.
+    """
+
+    def __init__(self, apply_settings, on_change=None):
+        self.apply_settings = apply_settings
+        self.on_change = on_change
+        self.enabled = False
+        self.base = {}  # Configured values: where tuning starts and what is restored when it stops
+        self.values = {}  # Values the tuner applied
+        self.averages = {}
+        self.log = deque(maxlen=LOG_SIZE)
+        self.evaluate_interval = EVALUATE_INTERVAL
+        self.settle_time = SETTLE_TIME
+        self._changed_at = {}  # name -> when the tuner last changed it
+        self._probes = {}  # name -> (value before the raise, throughput before, throughput key)
+        self._plateaus = {}  # name -> (throughput key, throughput at which raising stopped helping)
+        self._evaluated_at = None
+        self._lock = threading.Lock()
+
+    def set_base(self, values):
+        """Record configured values of tuned settings.
+
+        While tuning, the caller has just pushed them to the session, so
+        the tuned values are pushed again on top.
+        """
+        with self._lock:
+            for name, value in values.items():
+                if name in BOUNDS:
+                    self.base[name] = int(value)
+            reapply = dict(self.values) if self.enabled else None
+        if reapply:
+            self.apply_settings(reapply)
+
+    def set_enabled(self, enabled):
+        """Start tuning from the configured values, or stop and restore them.
+
+        Configured values outside BOUNDS are clamped, and logged as changes
+        with the reason "bounds".
+        """
+        entries = []
+        with self._lock:
+            enabled = bool(enabled)
+            if enabled == self.enabled:
+                return
+            self.enabled = enabled
+            if enabled:
+                self.values = {name: clamp(name, self.base[name]) for name in TUNED_SETTINGS if name in self.base}
+                apply = dict(self.values)
+                for name, value in self.values.items():
+                    if value != self.base[name]:
+                        entry = {'time': time.time(), 'setting': name, 'old': self.base[name], 'new': value,
+                                 'reason': "bounds"}
+                        self.log.append(entry)
+                        entries.append(entry)
+            else:
+                apply = {name: self.base[name] for name in self.values if name in self.base}
+                self.values = {}
+            self.averages = {}
+            self._changed_at = {}
+            self._probes = {}
+            self._plateaus = {}
+            self._evaluated_at = None
+        if apply:
+            self.apply_settings(apply)
+        if self.on_change is not None:
+            for entry in entries:
+                self.on_change(entry)
+
+    def state(self):
+        """Whether tuning is on, the tuned and configured values, and the averages it works from"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'values': dict(self.values),
+                'base': dict(self.base),
+                'averages': dict(self.averages),
+                'bounds': dict(BOUNDS)
+            }
+
+    def get_log(self, limit=None):
+        """The most recent changes, oldest first"""
+        with self._lock:
+            entries = list(self.log)
+        return entries[-limit:] if limit else entries
+
+    def observe(self, sample, context, now=None):
+        """Take one sample of session counters; decide and apply when an evaluation is due.
+
+        sample is a SessionStats snapshot; context holds 'download_limit'
+        and 'upload_limit' (B/s in force, 0 for unlimited) and
+        'max_queued_disk_bytes'. Returns the log entries of the changes made.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self.enabled:
+                return []
+            for key, value in sample.items():
+                previous = self.averages.get(key)
+                self.averages[key] = value if previous is None else previous + SMOOTHING * (value - previous)
+            if self._evaluated_at is None:
+                self._evaluated_at = now
+            if now - self._evaluated_at < self.evaluate_interval:
+                return []
+            self._evaluated_at = now
+
+            entries = []
+            for name, value, reason in self._decide(self.averages, context, now):
+                entry = {'time': time.time(), 'setting': name, 'old': self.values[name], 'new': value,
+                         'reason': reason}
+                self.values[name] = value
+                self._changed_at[name] = now
+                self.log.append(entry)
+                entries.append(entry)
+
+        if entries:
+            self.apply_settings({entry['setting']: entry['new'] for entry in entries})
+            if self.on_change is not None:
+                for entry in entries:
+                    self.on_change(entry)
+        return entries
+
+    # Decisions (called with the lock held)
+
+    def _settled(self, name, now):
+        return now - self._changed_at.get(name, float('-inf')) >= self.settle_time
+
+    def _decide(self, averages, context, now):
+        """Work out the changes for this evaluation as [(name, value, reason)]"""
+        changes = {}
+
+        def propose(name, value, reason):
+            if name in changes or name not in self.values or not self._settled(name, now):
+                return False
+            value = clamp(name, value)
+            if value == self.values[name]:
+                return False
+            changes[name] = (name, value, reason)
+            return True
+
+        def back_off(name, value, reason):
+            # A safety rule overrides any raise being judged
+            if propose(name, value, reason):
+                self._probes.pop(name, None)
+                self._plateaus.pop(name, None)
+
+        download = averages.get('download_rate', 0)
+        upload = averages.get('upload_rate', 0)
+        throughput = {'download': download, 'transfer': download + upload}
+        download_limit = context.get('download_limit') or 0
+        upload_limit = context.get('upload_limit') or 0
+        download_limited = download_limit and download >= LIMIT_HEADROOM * download_limit
+        upload_limited = upload_limit and upload >= LIMIT_HEADROOM * upload_limit
+
+        # Raises that had their time are kept or undone
+        for name, (previous, before, key) in list(self._probes.items()):
+            if not self._settled(name, now):
+                continue
+            del self._probes[name]
+            gain = throughput[key] / before - 1 if before else 0.0
+            if gain < MIN_GAIN:
+                self._plateaus[name] = (key, throughput[key])
+                propose(name, previous, f"{key} rate {gain:+.0%} after raising to {self.values[name]}, "
+                                        f"back to {previous}")
+
+        def probe(name, factor, key, reason):
+            """Raise a setting and judge it later, unless raising stopped helping at this throughput"""
+            # One raise judged at a time, so its effect on throughput can be told apart. Changes to
+            # other settings this evaluation (back-offs) don't hold it up, or steady mild pressure
+            # would keep the tuner from ever exploring upward
+            if self._probes or name in changes:
+                return
+            plateau = self._plateaus.get(name)
+            if plateau is not None:
+                plateau_key, plateau_rate = plateau
+                if abs(throughput[plateau_key] - plateau_rate) < PLATEAU_CHANGE * max(plateau_rate, 1):
+                    return
+                del self._plateaus[name]
+            current = self.values[name]
+            if propose(name, max(current * factor, current + 1), reason):
+                self._probes[name] = (current, throughput[key], key)
+
+        # Per-peer request queue: deep enough to fill the pipe, shallow enough not to time out
+        queue = self.values.get('max_out_request_queue')
+        if queue is not None:
+            waste = averages.get('timed_out_waste_rate', 0) / max(download, 1)
+            peer_timeouts = averages.get('peer_timeouts', 0)
+            disk_limit = context.get('max_queued_disk_bytes') or 0
+            disk_backlog = averages.get('disk_queued_write_bytes', 0)
+            if peer_timeouts > PEER_TIMEOUT_RATE or (download >= MIN_ACTIVE_RATE and waste > TIMEOUT_WASTE_RATIO):
+                back_off('max_out_request_queue', queue * 0.7,
+                         f"requests time out ({waste:.1%} of the download wasted, "
+                         f"{peer_timeouts:.2f} peer timeouts/s)")
+            elif disk_limit and disk_backlog > DISK_BACKLOG_RATIO * disk_limit:
+                back_off('max_out_request_queue', queue * 0.8,
+                         f"disk write queue at {disk_backlog / disk_limit:.0%} of max_queued_disk_bytes, "
+                         f"the disk is the bottleneck")
+            elif download >= MIN_ACTIVE_RATE and not download_limited:
+                probe('max_out_request_queue', 1.5, 'download',
+                      f"downloading at {format_rate(download)} below any limit, trying a deeper request queue")
+
+        # Connections: room for more peers while they add throughput
+        limit = self.values.get('connections_limit')
+        peers = averages.get('num_peers', 0)
+        if limit is not None:
+            transferring = download + upload >= MIN_ACTIVE_RATE and not (download_limited and upload_limited)
+            if peers >= 0.9 * limit and transferring:
+                probe('connections_limit', 1.25, 'transfer',
+                      f"{peers:.0f} of {limit} connections in use, trying more")
+            elif peers < 0.5 * limit and limit > self.base.get('connections_limit', limit) \
+                    and 'connections_limit' not in self._probes:
+                propose('connections_limit', max(self.base['connections_limit'], peers * 1.5),
+                        f"only {peers:.0f} of {limit} connections in use")
+
+        # Connection attempts per second: slower when they time out, faster while peers are missing
+        speed = self.values.get('connection_speed')
+        if speed is not None and limit is not None:
+            connect_timeouts = averages.get('connect_timeouts', 0)
+            half_open = averages.get('num_peers_half_open', 0)
+            if connect_timeouts > CONNECT_TIMEOUT_RATIO * speed:
+                back_off('connection_speed', speed * 0.7,
+                         f"{connect_timeouts:.1f} of {speed} connection attempts/s time out")
+            elif peers < 0.5 * limit and half_open >= speed and connect_timeouts < 0.1 * speed:
+                propose('connection_speed', speed * 1.5,
+                        f"{peers:.0f} of {limit} connections in use with attempts paced at {speed}/s")
+            elif peers >= 0.9 * limit and speed > self.base.get('connection_speed', speed):
+                propose('connection_speed', max(self.base['connection_speed'], speed * 0.7),
+                        f"{peers:.0f} of {limit} connections in use, no need to connect fast")
+
+        # Choking: the rate-based choker under an upload limit, otherwise slots sized to the upload rate
+        choker = self.values.get('choking_algorithm')
+        slots = self.values.get('unchoke_slots_limit')
+        if choker is not None:
+            if upload_limit and choker != RATE_BASED_CHOKER:
+                propose('choking_algorithm', RATE_BASED_CHOKER,
+                        f"upload limited to {format_rate(upload_limit)}, the rate-based choker sizes unchoke "
+                        f"slots to it")
+            elif not upload_limit and choker != FIXED_SLOTS_CHOKER:
+                propose('choking_algorithm', FIXED_SLOTS_CHOKER, "no upload limit, back to fixed unchoke slots")
+        if slots is not None and choker == FIXED_SLOTS_CHOKER and upload >= MIN_ACTIVE_RATE:
+            unchoked = max(averages.get('num_peers_up_unchoked', 0), 1)
+            interested = averages.get('num_peers_up_interested', 0)
+            per_peer = upload / unchoked
+            step = max(1, slots // 4)
+            if interested > slots and per_peer > SLOT_RATE_HIGH:
+                propose('unchoke_slots_limit', slots + step,
+                        f"{format_rate(per_peer)} per unchoked peer with {interested:.0f} interested, "
+                        f"unchoking more")
+            elif per_peer < SLOT_RATE_LOW:
+                propose('unchoke_slots_limit', slots - step,
+                        f"only {format_rate(per_peer)} per unchoked peer, unchoking fewer")
+
+        return list(changes.values())
@@ -0,0 +1,172 @@
+"""
+Bandwidth Scheduler - Switches between normal, alternative and no rate limits on a weekly schedule
+"""
+
+import time
+import threading
+
+NORMAL = 'normal'
+ALTERNATIVE = 'alternative'
+UNLIMITED = 'unlimited'
+
+# One letter per hour of the week (Monday 00:00 first) in a stored schedule
+SLOT_CODES = {'n': NORMAL, 'a': ALTERNATIVE, 'u': UNLIMITED}
+MODE_CODES = {mode: code for code, mode in SLOT_CODES.items()}
+SLOTS_PER_DAY = 24
+SLOTS = 7 * SLOTS_PER_DAY
+DEFAULT_SCHEDULE = 'n' * SLOTS
+
+# Re-check at least this often, so clock changes are picked up
+MAX_SLEEP = 60.0
+
+
+def parse_schedule(schedule):
+    """Turn a stored schedule string into a list of SLOTS modes (invalid: all normal)"""
+    if not isinstance(schedule, str) or len(schedule) != SLOTS or any(c not in SLOT_CODES for c in schedule):
+        schedule = DEFAULT_SCHEDULE
+    return [SLOT_CODES[c] for c in schedule]
+
+
+def format_schedule(modes):
+    """Turn a list of SLOTS modes into the stored schedule string"""
+    return ''.join(MODE_CODES[mode] for mode in modes)
+
+
+def current_slot(now=None):
+    """Hour of the week in local time (0 is Monday 00:00-01:00)"""
+    local = time.localtime(now)
+    return local.tm_wday * SLOTS_PER_DAY + local.tm_hour
+
+
+class BandwidthScheduler:
+    """Decides which rate limits are in force and applies them when that changes.
+
+    Without a schedule, alternative limits are on while the toggle is on.
+    With one, each hour of the week is normal, alternative or unlimited;
+    the toggle then overrides the schedule until the scheduled mode next
+    changes. apply_rates(download, upload) is called (in B/s, 0 for
+    unlimited) only when the effective limits differ from the last ones
+    applied; on_change(mode, alternative_active) reports mode switches.
+    """
+
+    def __init__(self, apply_rates, on_change=None):
+        self.apply_rates = apply_rates
+        self.on_change = on_change
+        self.normal_limits = (0, 0)
+        self.alternative_limits = (0, 0)
+        self.schedule = parse_schedule(DEFAULT_SCHEDULE)
+        self.schedule_enabled = False
+        self.alternative_toggled = False
+        self._override = None  # (mode, scheduled mode it overrides)
+        self._mode = None
+        self._applied = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='bandwidth-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def set_limits(self, normal=None, alternative=None):
+        """Set (download, upload) limits in B/s for normal and/or alternative mode"""
+        with self._lock:
+            if normal is not None:
+                self.normal_limits = tuple(normal)
+            if alternative is not None:
+                self.alternative_limits = tuple(alternative)
+        self.evaluate()
+
+    def set_schedule(self, enabled, schedule=None):
+        """Turn the weekly schedule on or off, optionally replacing it (string or list of modes)"""
+        with self._lock:
+            old = (self.schedule_enabled, self.schedule)
+            self.schedule_enabled = bool(enabled)
+            if schedule is not None:
+                self.schedule = parse_schedule(schedule if isinstance(schedule, str) else format_schedule(schedule))
+            # Re-applying the same schedule (other preferences saved) keeps a toggle override
+            if (self.schedule_enabled, self.schedule) != old:
+                self._override = None
+        self.evaluate()
+
+    def set_alternative(self, enabled):
+        """The toggle: use alternative limits (or stop using them) from now on"""
+        with self._lock:
+            self.alternative_toggled = bool(enabled)
+            if self.schedule_enabled:
+                mode = ALTERNATIVE if enabled else NORMAL
+                scheduled = self.schedule[current_slot()]
+                self._override = (mode, scheduled) if mode != scheduled else None
+        self.evaluate()
+
+    def _effective_mode(self, now=None):
+        """Mode in force now (called with the lock held)"""
+        if not self.schedule_enabled:
+            return ALTERNATIVE if self.alternative_toggled else NORMAL
+        scheduled = self.schedule[current_slot(now)]
+        if self._override is not None:
+            mode, overridden = self._override
+            if overridden == scheduled:
+                return mode
+            # The schedule moved on, it is in charge again
+            self._override = None
+        return scheduled
+
+    def evaluate(self, now=None):
+        """Apply the limits of the current mode if they changed, returns the mode"""
+        with self._lock:
+            mode = self._effective_mode(now)
+            if mode == ALTERNATIVE:
+                limits = self.alternative_limits
+            elif mode == UNLIMITED:
+                limits = (0, 0)
+            else:
+                limits = self.normal_limits
+            apply = limits != self._applied
+            self._applied = limits
+            changed = mode != self._mode
+            self._mode = mode
+            if self.schedule_enabled:
+                self.alternative_toggled = mode == ALTERNATIVE
+
+        if apply:
+            try:
+                self.apply_rates(*limits)
+            except Exception as e:
+                print(f"Error applying rate limits: {e}")
+        if changed and self.on_change is not None:
+            self.on_change(mode, mode == ALTERNATIVE)
+        return mode
+
+    def state(self):
+        """Mode in force, its limits, and the schedule settings"""
+        with self._lock:
+            mode = self._mode or NORMAL
+            download, upload = self._applied or (0, 0)
+            return {
+                'mode': mode,
+                'alternative_active': mode == ALTERNATIVE,
+                'download_limit': download,
+                'upload_limit': upload,
+                'schedule_enabled': self.schedule_enabled,
+                'schedule': format_schedule(self.schedule),
+                'overridden': self._override is not None
+            }
+
+    def _run(self):
+        while self._running:
+            self.evaluate()
+            # Wake up just after the next hour starts
+            now = time.time()
+            until_next_slot = 3600 - now % 3600 + 0.5
+            self._wakeup.wait(min(until_next_slot, MAX_SLEEP))
+            self._wakeup.clear()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmark: download rate with and without the auto-tuner over links with latency
+
+Several seeder sessions seed the same torrent on localhost. Each one is
+reached through an in-process TCP relay that adds a one-way delay and a
+rate cap in each direction (what tc netem/tbf would do on a real link),
+with a small buffer so queues can't grow without bound. A fresh
+TorrentCore downloads through the relays only (an IP filter blocks direct
+connections from the seeders) for a fixed time, once with auto-tuning
+off and once on, for each round-trip time. Reports the average payload
+rate and prints the tuner's log.
+"""
+
+import os
+import sys
+import time
+import queue
+import socket
+import tempfile
+import threading
+
+SEEDERS = 4
+SIZE = 1024 * 1024 * 1024  # Bytes, more than a run downloads
+LINK_RATE = 4 * 1024 * 1024  # B/s each way per relay
+RTTS = [0.01, 0.1, 0.3]  # Seconds
+DURATION = 120
+RELAY_HOST = '127.0.0.2'  # Relays listen here, seeders connect from 127.0.0.1 (blocked)
+CHUNK = 16 * 1024
+NO_DISCOVERY = {'enable_dht': False, 'enable_lsd': False, 'enable_upnp': False, 'enable_natpmp': False}
+
+
+class DelayRelay:
+    """TCP relay to one target adding a one-way delay and a rate cap in each direction"""
+
+    def __init__(self, target_port, delay, rate):
+        self.target_port = target_port
+        self.delay = delay
+        self.rate = rate
+        self.listener = socket.create_server((RELAY_HOST, 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, address = self.listener.accept()
+                upstream = socket.create_connection(('127.0.0.1', self.target_port))
+            except OSError:
+                return
+            for source, destination in ((client, upstream), (upstream, client)):
+                self._pipe(source, destination)
+
+    def _pipe(self, source, destination):
+        # Room for about 50 ms at the link rate: beyond that the reader blocks, like a full router queue
+        chunks = queue.Queue(maxsize=max(4, int(self.rate * 0.05 / CHUNK)))
+
+        def read():
+            while True:
+                try:
+                    data = source.recv(CHUNK)
+                except OSError:
+                    data = b''
+                chunks.put((time.monotonic() + self.delay, data))
+                if not data:
+                    return
+
+        def write():
+            while True:
+                due, data = chunks.get()
+                wait = due - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                if not data:
+                    try:
+                        destination.shutdown(socket.SHUT_WR)
+                    except OSError:
+                        pass
+                    return
+                try:
+                    destination.sendall(data)
+                except OSError:
+                    return
+                time.sleep(len(data) / self.rate)  # Serialization delay at the link rate
+
+        threading.Thread(target=read, daemon=True).start()
+        threading.Thread(target=write, daemon=True).start()
+
+
+def make_seed_data(size, directory):
+    """Write one file of random data and its .torrent file, returns (data dir, .torrent path)"""
+    import libtorrent as lt
+
+    data_dir = os.path.join(directory, 'data')
+    os.makedirs(data_dir)
+    name = "autotune.bin"
+    with open(os.path.join(data_dir, name), 'wb') as f:
+        for _ in range(size // (1024 * 1024)):
+            f.write(os.urandom(1024 * 1024))
+    fs = lt.file_storage()
+    lt.add_files(fs, os.path.join(data_dir, name))
+    ct = lt.create_torrent(fs)
+    lt.set_piece_hashes(ct, data_dir)
+    path = os.path.join(directory, f"{name}.torrent")
+    with open(path, 'wb') as f:
+        f.write(lt.bencode(ct.generate()))
+    return data_dir, path
+
+
+def start_seeders(count, data_dir, torrent_path):
+    """Seed the torrent from count sessions on localhost, returns [(session, port)]"""
+    import libtorrent as lt
+    from bench_util import make_session
+
+    seeders = []
+    for _ in range(count):
+        session = make_session()
+        params = lt.add_torrent_params()
+        params.ti = lt.torrent_info(torrent_path)
+        params.save_path = data_dir
+        params.flags = lt.torrent_flags.seed_mode
+        session.add_torrent(params)
+        seeders.append((session, session.listen_port()))
+    return seeders
+
+
+def run(auto_tune, torrent_path, relay_ports):
+    """Download through the relays for DURATION, returns (average payload B/s, tuner log)"""
+    os.environ['HOME'] = tempfile.mkdtemp(prefix='pytorrent-autotune-')
+    save_path = os.path.join(os.environ['HOME'], 'Downloads')
+
+    import libtorrent as lt
+    from torrent_core import TorrentCore
+
+    core = TorrentCore()
+    core.session.apply_settings(NO_DISCOVERY)
+    ip_filter = lt.ip_filter()
+    ip_filter.add_rule('127.0.0.1', '127.0.0.1', 1)  # Blocked: only relayed connections count
+    core.session.set_ip_filter(ip_filter)
+    # Decide faster than in normal use, so the tuner gets several rounds in one run
+    core.auto_tuner.evaluate_interval = 5.0
+    core.auto_tuner.settle_time = 15.0
+    core.set_auto_tune(auto_tune)
+    core.set_window_visible(True)
+    core.start()
+
+    core.add_torrent_files([(torrent_path, save_path, None)])
+    while not core.torrent_handles:
+        time.sleep(0.05)
+    handle = next(iter(core.torrent_handles.values()))
+    for port in relay_ports:
+        handle.connect_peer((RELAY_HOST, port))
+
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        status = handle.status()
+        if status.is_seeding:
+            break
+        if status.num_peers < len(relay_ports):
+            for port in relay_ports:
+                handle.connect_peer((RELAY_HOST, port))
+        time.sleep(1)
+    seconds = time.perf_counter() - start
+    downloaded = handle.status().total_payload_download
+    log = core.get_tuning_log()
+
+    core.shutdown()
+    return downloaded / seconds, log
+
+
+def main():
+    rtts = [float(arg) / 1000 for arg in sys.argv[1:]] or RTTS
+
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+
+    data_dir, torrent_path = make_seed_data(SIZE, tempfile.mkdtemp(prefix='pytorrent-seed-'))
+    seeders = start_seeders(SEEDERS, data_dir, torrent_path)
+
+    results = []
+    for rtt in rtts:
+        relays = [DelayRelay(port, rtt / 2, LINK_RATE) for session, port in seeders]
+        for auto_tune in [False, True]:
+            rate, log = run(auto_tune, torrent_path, [relay.port for relay in relays])
+            results.append((rtt, auto_tune, rate))
+            if auto_tune:
+                print(f"Tuner log at {rtt * 1000:.0f} ms RTT:")
+                for entry in log:
+                    print(f"  {entry['setting']}: {entry['old']} -> {entry['new']} ({entry['reason']})")
+        for relay in relays:
+            relay.listener.close()
+
+    link_mb = SEEDERS * LINK_RATE / (1024 * 1024)
+    print(f"\n{SEEDERS} seeders, {link_mb:.0f} MB/s of links in total")
+    print(f"{'RTT ms':>7} {'auto-tune':>10} {'MB/s':>7}")
+    for rtt, auto_tune, rate in results:
+        print(f"{rtt * 1000:>7.0f} {'on' if auto_tune else 'off':>10} {rate / (1024 * 1024):>7.2f}")
+
+    del seeders
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark: how categories share bandwidth, and the LAN exemption
+
+A loopback seeder session seeds one torrent per category. A fresh
+TorrentCore downloads them from it (connected by hand, there is no
+tracker or DHT) and the download rate of each category is averaged over
+a measurement window, in three scenarios:
+
+  weights  - global limit, LAN exemption off, weights 3:1: expect a 3:1 split
+  cap      - no global limit, one category capped: expect it at its cap
+  lan      - global limit, LAN exemption on: loopback peers ignore the limit
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+SIZE = 512 * 1024 * 1024  # Bytes per torrent, enough not to finish during a run
+GLOBAL_LIMIT = 4096  # KB/s
+CAP = 512  # KB/s
+WARMUP = 10
+WINDOW = 20
+NO_DISCOVERY = {'enable_dht': False, 'enable_lsd': False, 'enable_upnp': False, 'enable_natpmp': False}
+
+SCENARIOS = {
+    'weights': {'global_limit': GLOBAL_LIMIT, 'lan_unthrottled': False,
+                'categories': {'urgent': {'weight': 3}, 'bulk': {'weight': 1}}},
+    'cap': {'global_limit': 0, 'lan_unthrottled': True,
+            'categories': {'urgent': {'weight': 1}, 'bulk': {'weight': 1, 'download_limit': CAP}}},
+    'lan': {'global_limit': GLOBAL_LIMIT, 'lan_unthrottled': True,
+            'categories': {'urgent': {'weight': 3}, 'bulk': {'weight': 1}}},
+}
+
+
+def make_seed_data(names, size, directory):
+    """Write one file of random data per name and its .torrent file, returns (data dir, {name: path})"""
+    import libtorrent as lt
+
+    data_dir = os.path.join(directory, 'data')
+    torrent_dir = os.path.join(directory, 'torrents')
+    os.makedirs(data_dir)
+    os.makedirs(torrent_dir)
+    paths = {}
+    for name in names:
+        file_name = f"category-{name}.bin"
+        with open(os.path.join(data_dir, file_name), 'wb') as f:
+            for _ in range(size // (1024 * 1024)):
+                f.write(os.urandom(1024 * 1024))
+        fs = lt.file_storage()
+        lt.add_files(fs, os.path.join(data_dir, file_name))
+        ct = lt.create_torrent(fs)
+        lt.set_piece_hashes(ct, data_dir)
+        path = os.path.join(torrent_dir, f"{file_name}.torrent")
+        with open(path, 'wb') as f:
+            f.write(lt.bencode(ct.generate()))
+        paths[name] = path
+    return data_dir, paths
+
+
+def start_seeder(data_dir, torrent_paths):
+    """Seed the torrents on localhost, returns (session, port)"""
+    import libtorrent as lt
+    from bench_util import make_session
+
+    session = make_session(active_seeds=-1, active_limit=-1)
+    for path in torrent_paths.values():
+        params = lt.add_torrent_params()
+        params.ti = lt.torrent_info(path)
+        params.save_path = data_dir
+        params.flags = lt.torrent_flags.seed_mode
+        session.add_torrent(params)
+    return session, session.listen_port()
+
+
+def run(scenario, torrent_paths, port):
+    """Download with a fresh core under a scenario, returns {category: average B/s}"""
+    os.environ['HOME'] = tempfile.mkdtemp(prefix='pytorrent-categories-')
+    save_path = os.path.join(os.environ['HOME'], 'Downloads')
+
+    from torrent_core import TorrentCore
+
+    core = TorrentCore()
+    core.session.apply_settings(NO_DISCOVERY)
+    core.apply_session_settings({
+        'limit_download': bool(scenario['global_limit']), 'download_limit': scenario['global_limit'],
+        'limit_upload': False, 'upload_limit': 0, 'lan_unthrottled': scenario['lan_unthrottled']
+    })
+    for name, settings in scenario['categories'].items():
+        core.set_category(name, settings)
+    core.set_window_visible(True)  # Poll every second so limits follow the rates quickly
+    core.start()
+
+    core.add_torrent_files([(path, save_path, None) for path in torrent_paths.values()])
+    hashes = {}
+    deadline = time.perf_counter() + 30
+    while len(hashes) < len(torrent_paths) and time.perf_counter() < deadline:
+        for torrent_hash, handle in list(core.torrent_handles.items()):
+            name = handle.status().name
+            for category, path in torrent_paths.items():
+                if name == os.path.basename(path)[:-len('.torrent')]:
+                    hashes[category] = torrent_hash
+        time.sleep(0.1)
+    for category, torrent_hash in hashes.items():
+        core.set_torrent_category(torrent_hash, category, move_storage=False)
+        core.torrent_handles[torrent_hash].connect_peer(('127.0.0.1', port))
+
+    def downloaded():
+        return {category: core.torrent_handles[torrent_hash].status().total_payload_download
+                for category, torrent_hash in hashes.items()}
+
+    time.sleep(WARMUP)
+    before = downloaded()
+    time.sleep(WINDOW)
+    after = downloaded()
+
+    core.shutdown()
+    return {category: (after[category] - before[category]) / WINDOW for category in hashes}
+
+
+def main():
+    scenarios = sys.argv[1:] or list(SCENARIOS)
+
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+
+    data_dir, torrent_paths = make_seed_data(['urgent', 'bulk'], SIZE, tempfile.mkdtemp(prefix='pytorrent-seed-'))
+    seeder, port = start_seeder(data_dir, torrent_paths)
+
+    print(f"{'scenario':>9} {'urgent KB/s':>12} {'bulk KB/s':>10} {'total KB/s':>11} {'ratio':>6}  expected")
+    for name in scenarios:
+        scenario = SCENARIOS[name]
+        rates = run(scenario, torrent_paths, port)
+        urgent, bulk = rates.get('urgent', 0) / 1024, rates.get('bulk', 0) / 1024
+        ratio = urgent / bulk if bulk else float('inf')
+        if name == 'weights':
+            expected = f"3.0 ratio, {GLOBAL_LIMIT} total"
+        elif name == 'cap':
+            expected = f"bulk at {CAP}"
+        else:
+            expected = f"total above {GLOBAL_LIMIT}"
+        print(f"{name:>9} {urgent:>12.0f} {bulk:>10.0f} {urgent + bulk:>11.0f} {ratio:>6.2f}  {expected}")
+
+    del seeder
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: file list of the add dialog for torrents with many files
+
+Builds the file list for a synthetic torrent of N files (nested 3 deep)
+the old way (a QTreeWidgetItem per file and directory, expandAll) and
+with the lazy FileTreeModel, then collects the selected files from each.
+Runs offscreen.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+COUNTS = [10000, 100000]
+
+
+def make_files(count):
+    """[(path, size)] spread over a few hundred directories"""
+    return [(f"dump/part-{i % 50:02d}/shard-{i % 997:03d}/file-{i:07d}.bin", 4096 + i) for i in range(count)]
+
+
+def build_widget_tree(files):
+    from PyQt5.QtWidgets import QTreeWidget, QTreeWidgetItem
+    from PyQt5.QtCore import Qt
+
+    tree = QTreeWidget()
+    tree.setHeaderLabels(["File", "Size"])
+    structure = {}
+    for i, (path, size) in enumerate(files):
+        parts = path.split('/')
+        current = structure
+        for part in parts[:-1]:
+            current = current.setdefault(part, {})
+        current[parts[-1]] = {'size': size, 'index': i, 'is_file': True}
+
+    def populate(parent_item, structure):
+        for name, content in structure.items():
+            item = QTreeWidgetItem(parent_item)
+            item.setText(0, name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(0, Qt.Checked)
+            if content.get('is_file', False):
+                item.setText(1, str(content['size']))
+                item.setData(0, Qt.UserRole, content['index'])
+            else:
+                populate(item, content)
+
+    populate(tree.invisibleRootItem(), structure)
+    tree.expandAll()
+    return tree
+
+
+def widget_tree_selection(tree):
+    from PyQt5.QtCore import Qt
+
+    selected = []
+
+    def check_item(item):
+        if item.checkState(0) == Qt.Checked and item.data(0, Qt.UserRole) is not None:
+            selected.append(item.data(0, Qt.UserRole))
+        for i in range(item.childCount()):
+            check_item(item.child(i))
+
+    check_item(tree.invisibleRootItem())
+    return selected
+
+
+def build_model_tree(files):
+    from PyQt5.QtWidgets import QTreeView
+    from file_tree_model import FileTreeModel
+
+    view = QTreeView()
+    view.setUniformRowHeights(True)
+    model = FileTreeModel(files, view)
+    view.setModel(model)
+    view.expandToDepth(0)
+    return view
+
+
+def measure(build, select, files):
+    """Returns (build seconds, peak MB while building, selection seconds, selected count)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = build(files)
+    build_seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    selected = select(tree)
+    return build_seconds, peak, time.perf_counter() - start, len(selected)
+
+
+def main():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    counts = [int(arg) for arg in sys.argv[1:]] or COUNTS
+
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv)  # noqa: F841
+
+    print(f"{'files':>8} {'tree':>7} {'build s':>8} {'peak MB':>8} {'select s':>9} {'selected':>9}")
+    for count in counts:
+        files = make_files(count)
+        runs = [
+            ('widget', build_widget_tree, widget_tree_selection),
+            ('model', build_model_tree, lambda view: view.model().selected_files()),
+        ]
+        for label, build, select in runs:
+            build_seconds, peak, select_seconds, selected = measure(build, select, files)
+            print(f"{count:>8} {label:>7} {build_seconds:>8.3f} {peak:>8.1f} {select_seconds:>9.4f} {selected:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: main-thread event loop stalls while torrents are added and removed
+
+A 1 ms probe timer runs on the GUI thread and records the gap between its
+ticks while 1,000 .torrent files are added through the window's command
+signals and then removed again. Any gap over 16 ms is a dropped frame.
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+COUNT = 1000
+FRAME_MS = 16.0
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+
+    # Isolated state, settings and display
+    home = tempfile.mkdtemp(prefix='pytorrent-latency-')
+    os.environ['HOME'] = home
+    os.environ['XDG_CONFIG_HOME'] = os.path.join(home, '.config')
+    if not os.environ.get('DISPLAY'):
+        os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+
+    from bench_util import make_torrent_data
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+    from torrent_client import TorrentClient
+
+    torrent_dir = os.path.join(home, 'torrents')
+    os.makedirs(torrent_dir)
+    paths = []
+    for i in range(count):
+        path = os.path.join(torrent_dir, f"bench-{i}.torrent")
+        with open(path, 'wb') as f:
+            f.write(make_torrent_data(i, size=256 * 1024))
+        paths.append(path)
+
+    app = QApplication(sys.argv[:1])
+    client = TorrentClient()
+    client.show()
+
+    gaps = []
+    last_tick = [time.perf_counter()]
+
+    def probe():
+        now = time.perf_counter()
+        gaps.append((now - last_tick[0]) * 1000)
+        last_tick[0] = now
+
+    probe_timer = QTimer()
+    probe_timer.timeout.connect(probe)
+    probe_timer.start(1)
+
+    added = []
+
+    def on_added(torrent_hash, info):
+        added.append(torrent_hash)
+        if len(added) == count:
+            # Everything is in, now remove it all again
+            for h in added:
+                client.remove_requested.emit(h, False)
+
+    removed = []
+
+    def on_removed(torrent_hash):
+        removed.append(torrent_hash)
+        if len(removed) == count:
+            QTimer.singleShot(500, app.quit)
+
+    client.torrent_manager.torrent_added.connect(on_added)
+    client.torrent_manager.torrent_removed.connect(on_removed)
+
+    def start():
+        gaps.clear()
+        last_tick[0] = time.perf_counter()
+        for path in paths:
+            client.add_torrent_file_requested.emit(path, os.path.join(home, 'Downloads'), None)
+
+    QTimer.singleShot(1000, start)
+    QTimer.singleShot(600000, app.quit)
+    app.exec_()
+    client.shutdown_manager()
+
+    gaps.sort()
+    stalls = [gap for gap in gaps if gap > FRAME_MS]
+    p99 = gaps[int(len(gaps) * 0.99)] if gaps else 0
+    print(f"torrents added/removed: {len(added)}/{len(removed)}")
+    print(f"probe ticks: {len(gaps)}  p99 gap: {p99:.1f} ms  max gap: {gaps[-1] if gaps else 0:.1f} ms")
+    print(f"stalls over {FRAME_MS:.0f} ms: {len(stalls)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory and startup time of the headless daemon vs the GUI
+
+Each run restores the same session store of N synthetic torrents in a
+child process, once through the Qt-free TorrentCore and once through the
+TorrentClient window, and reports the time until session_restored and the
+peak resident memory of the process.
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import tempfile
+import threading
+import subprocess
+
+COUNTS = [1000, 10000]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_headless_child():
+    start = time.perf_counter()
+
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+    from torrent_core import TorrentCore
+
+    restored = threading.Event()
+    core = TorrentCore()
+    core.events.subscribe('session_restored', lambda count, seconds: restored.set())
+    core.set_window_visible(False)
+    core.start()
+    core.restore_session()
+    restored.wait(600)
+
+    results = {'restored': time.perf_counter() - start, 'rss_mb': peak_rss_mb()}
+    core.shutdown()
+    print(json.dumps(results))
+
+
+def run_gui_child():
+    start = time.perf_counter()
+
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+    from torrent_client import TorrentClient
+
+    results = {}
+    app = QApplication(sys.argv[:1])
+    client = TorrentClient()
+
+    def on_restored(count, seconds):
+        results['restored'] = time.perf_counter() - start
+        QTimer.singleShot(0, app.quit)
+
+    client.torrent_manager.session_restored.connect(on_restored)
+    client.show()
+    QTimer.singleShot(600000, app.quit)
+    app.exec_()
+
+    results['rss_mb'] = peak_rss_mb()
+    client.shutdown_manager()
+    print(json.dumps(results))
+
+
+def run_child(home, mode):
+    env = dict(os.environ, HOME=home, XDG_CONFIG_HOME=os.path.join(home, '.config'))
+    if not env.get('DISPLAY'):
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), mode],
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--headless-child':
+        run_headless_child()
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == '--gui-child':
+        run_gui_child()
+        return
+
+    from bench_startup import populate_store
+
+    counts = [int(arg) for arg in sys.argv[1:]] or COUNTS
+    print(f"{'torrents':>10} {'mode':>9} {'restored s':>11} {'peak RSS MB':>12}")
+    for count in counts:
+        home = tempfile.mkdtemp(prefix='pytorrent-headless-')
+        populate_store(home, count)
+        for label, mode in [('headless', '--headless-child'), ('gui', '--gui-child')]:
+            results = run_child(home, mode)
+            print(f"{count:>10} {label:>9} {results.get('restored', float('nan')):>11.2f} "
+                  f"{results.get('rss_mb', float('nan')):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk import vs adding .torrent files one at a time
+
+Writes N synthetic .torrent files (plus some duplicates and corrupt files)
+and adds them to a fresh TorrentCore, once with add_torrent_file per file
+(what the add dialog does, one checkpoint each) and once with
+start_import (process pool parse, batched adds, one checkpoint).
+Reports torrents per second until everything is in the session store.
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+
+COUNTS = [1000, 5000]
+DUPLICATE_EVERY = 20  # Every 20th file is a copy of another one
+CORRUPT_EVERY = 100  # Every 100th file is truncated
+
+
+def write_torrent_files(directory, count):
+    """Write count torrent files plus duplicates of some of them"""
+    from bench_util import make_torrent_data
+
+    for i in range(count):
+        data = make_torrent_data(i, size=256 * 1024)
+        if i % CORRUPT_EVERY == CORRUPT_EVERY - 1:
+            data = data[:len(data) // 2]
+        with open(os.path.join(directory, f"bench-{i}.torrent"), 'wb') as f:
+            f.write(data)
+        if i % DUPLICATE_EVERY == 0:
+            shutil.copy(os.path.join(directory, f"bench-{i}.torrent"),
+                        os.path.join(directory, f"bench-{i}-copy.torrent"))
+
+
+def run(mode, torrent_dir):
+    """Add every file in torrent_dir with a fresh core, returns (seconds, torrents in the store)"""
+    # Each run gets its own session store
+    os.environ['HOME'] = tempfile.mkdtemp(prefix='pytorrent-import-')
+    save_path = os.path.join(os.environ['HOME'], 'Downloads')
+
+    from torrent_core import TorrentCore
+    from bulk_import import find_torrent_files
+
+    core = TorrentCore()
+    core.set_window_visible(False)
+    core.start()
+    # Report failures instead of printing them
+    core.events.subscribe('error_occurred', lambda title, message: None)
+
+    start = time.perf_counter()
+    if mode == 'single':
+        for path in find_torrent_files([torrent_dir]):
+            core.add_torrent_file(path, save_path)
+    else:
+        finished = threading.Event()
+        core.events.subscribe('import_finished', lambda summary: finished.set())
+        core.start_import([torrent_dir], save_path)
+        finished.wait()
+    added = core.torrent_count()
+
+    # Until the store has every torrent (shutdown flushes pending checkpoints)
+    core.shutdown()
+    seconds = time.perf_counter() - start
+    return seconds, added
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or COUNTS
+
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+
+    print(f"{'files':>8} {'mode':>8} {'added':>8} {'seconds':>9} {'torrents/s':>11}")
+    for count in counts:
+        torrent_dir = tempfile.mkdtemp(prefix='pytorrent-import-files-')
+        write_torrent_files(torrent_dir, count)
+        files = len(os.listdir(torrent_dir))
+        for mode in ['single', 'bulk']:
+            seconds, added = run(mode, torrent_dir)
+            print(f"{files:>8} {mode:>8} {added:>8} {seconds:>9.2f} {added / seconds:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
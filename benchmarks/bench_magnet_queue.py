@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time-to-metadata for 500 magnets, with and without the fetch cap
+
+A loopback seeder session holds N synthetic torrents. Their magnet links
+(with the seeder as x.pe peer, DHT off) are added to a fresh TorrentCore
+in one batch, once with the metadata queue's default cap and once with no
+limit, and the time from the add until each metadata_resolved is recorded.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+
+COUNT = 500
+TIMEOUT = 300
+NO_DISCOVERY = {'enable_dht': False, 'enable_lsd': False, 'enable_upnp': False, 'enable_natpmp': False}
+
+
+def start_seeder(count):
+    """Seed count synthetic torrents on localhost, returns (session, port, hashes)"""
+    import libtorrent as lt
+    from bench_util import make_session, make_torrent_info
+
+    session = make_session()
+    save_path = tempfile.mkdtemp(prefix='pytorrent-seeder-')
+    hashes = []
+    for i in range(count):
+        params = lt.add_torrent_params()
+        params.ti = make_torrent_info(i, size=256 * 1024)
+        params.save_path = save_path
+        # Only metadata is exchanged, so claim to have the data without checking it
+        params.flags = lt.torrent_flags.seed_mode
+        hashes.append(str(session.add_torrent(params).info_hash()))
+    return session, session.listen_port(), hashes
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(max_active, magnets):
+    """Add the magnets to a fresh core, returns ({hash: seconds to metadata}, seconds, queue stats)"""
+    # Fresh state (and so an empty metadata cache) for every run
+    os.environ['HOME'] = tempfile.mkdtemp(prefix='pytorrent-magnets-')
+
+    from torrent_core import TorrentCore
+
+    core = TorrentCore()
+    core.session.apply_settings(NO_DISCOVERY)
+    core.set_metadata_fetch_limit(max_active)
+    core.set_window_visible(False)
+    core.start()
+
+    resolved = {}
+    all_resolved = threading.Event()
+
+    def on_metadata_resolved(torrent_hash, summary):
+        resolved[torrent_hash] = time.perf_counter() - start
+        if len(resolved) >= len(magnets):
+            all_resolved.set()
+
+    core.events.subscribe('metadata_resolved', on_metadata_resolved)
+    start = time.perf_counter()
+    core.add_magnet_links(magnets)
+    all_resolved.wait(TIMEOUT)
+    seconds = time.perf_counter() - start
+
+    stats = core.get_metadata_queue_stats()
+    core.shutdown()
+    return resolved, seconds, stats
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+    from magnet_resolver import MetadataQueue
+
+    seeder, port, hashes = start_seeder(count)
+    magnets = [f"magnet:?xt=urn:btih:{torrent_hash}&x.pe=127.0.0.1:{port}" for torrent_hash in hashes]
+
+    print(f"{'cap':>9} {'resolved':>9} {'median s':>9} {'p95 s':>7} {'all s':>7} {'timeouts':>9}")
+    for max_active in [MetadataQueue.MAX_ACTIVE, 0]:
+        resolved, seconds, stats = run(max_active, magnets)
+        times = list(resolved.values()) or [float('nan')]
+        label = str(max_active) if max_active else 'none'
+        print(f"{label:>9} {len(resolved):>9} {percentile(times, 0.5):>9.2f} {percentile(times, 0.95):>7.2f} "
+              f"{seconds:>7.2f} {stats['timeouts']:>9}")
+
+    del seeder
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: idle CPU use of status polling, fixed vs adaptive cadence
+
+Loads N paused torrents into a TorrentCore and measures process CPU
+time over a fixed window with the old fixed 1 s polling, with adaptive
+polling and a visible window, and with adaptive polling while hidden.
+Then the torrents are resumed with no active slots, so the download
+queue holds all of them back: that must not keep polling at the fast
+interval.
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+COUNT = 2000
+WINDOW_SECONDS = 20
+SETTLE_SECONDS = 12  # Longer than the slowest interval, so the new cadence is in effect
+
+
+def check_queued_cadence():
+    """Torrents waiting in the queue are idle; only waiting for a check polls fast"""
+    from poll_scheduler import PollScheduler
+
+    no_traffic = {'download_rate': 0, 'upload_rate': 0}
+    scheduler = PollScheduler()
+    scheduler.choose({'Queued': 500}, no_traffic)
+    assert scheduler.mode == 'idle', f"500 queue-held torrents poll in {scheduler.mode} mode"
+    scheduler.choose({'Queued': 500, 'Downloading': 3}, no_traffic)
+    assert scheduler.mode == 'normal', f"queue-held and downloading torrents poll in {scheduler.mode} mode"
+    scheduler.choose({'Checking queued': 1}, no_traffic)
+    assert scheduler.mode == 'fast', f"a torrent queued for checking polls in {scheduler.mode} mode"
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    window = float(sys.argv[2]) if len(sys.argv) > 2 else WINDOW_SECONDS
+
+    # Isolated state directory
+    home = tempfile.mkdtemp(prefix='pytorrent-cadence-')
+    os.environ['HOME'] = home
+
+    from bench_util import make_torrent_data
+    from torrent_core import TorrentCore
+
+    check_queued_cadence()
+
+    core = TorrentCore()
+    core.start()
+
+    torrent_dir = os.path.join(home, 'torrents')
+    os.makedirs(torrent_dir)
+    save_path = os.path.join(home, 'Downloads')
+    for i in range(count):
+        path = os.path.join(torrent_dir, f"bench-{i}.torrent")
+        with open(path, 'wb') as f:
+            f.write(make_torrent_data(i, size=256 * 1024))
+        torrent_hash = core.add_torrent_file(path, save_path)
+        if torrent_hash:
+            core.pause_torrent(torrent_hash)
+
+    def run(adaptive, visible):
+        """Measure CPU use over the window and return (cpu %, stats)"""
+        core.poll_scheduler.adaptive = adaptive
+        core.set_window_visible(visible)
+        # Let the cadence settle before measuring
+        time.sleep(SETTLE_SECONDS)
+
+        ticks_before = core.get_poll_stats()['ticks']
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        time.sleep(window)
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+
+        stats = core.get_poll_stats()
+        stats['ticks'] -= ticks_before
+        return cpu / wall * 100, stats
+
+    print(f"{'polling':>18} {'mode':>8} {'interval ms':>12} {'ticks':>6} {'avg tick ms':>12} {'cpu %':>7}")
+    for label, adaptive, visible in [('fixed', False, True),
+                                     ('adaptive', True, True),
+                                     ('adaptive, hidden', True, False)]:
+        cpu, stats = run(adaptive, visible)
+        print(f"{label:>18} {stats['mode']:>8} {stats['interval_ms']:>12} {stats['ticks']:>6} "
+              f"{stats['average_tick_ms']:>12.2f} {cpu:>7.2f}")
+
+    # Everything resumed but held back by the queue: waiting, not working
+    core.set_queue_settings({'enabled': True, 'active_downloads': 0, 'active_seeds': 0, 'active_limit': 0,
+                             'active_checking': 100})
+    core.resume_torrents(list(core.torrent_handles))
+    cpu, stats = run(True, True)
+    print(f"{'adaptive, queued':>18} {stats['mode']:>8} {stats['interval_ms']:>12} {stats['ticks']:>6} "
+          f"{stats['average_tick_ms']:>12.2f} {cpu:>7.2f}")
+    if stats['mode'] == 'fast':
+        print(f"Queue-held torrents kept polling fast: {core.get_state_counts()}")
+
+    core.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark: disk performance profiles on a loopback swarm
+
+A seeder session in this process seeds N torrents of real data from
+localhost. For each profile a child process starts a fresh TorrentCore
+with that profile, downloads every torrent from the seeder (connected by
+hand, there is no tracker or DHT), then re-checks them all. Reports the
+download time and rate, the re-check time and the child's peak resident
+memory. The seeder always uses the seedbox-nvme profile so it is not the
+bottleneck.
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import tempfile
+import subprocess
+
+COUNT = 8
+SIZE = 64 * 1024 * 1024  # Bytes per torrent
+TIMEOUT = 1800
+NO_DISCOVERY = {'enable_dht': False, 'enable_lsd': False, 'enable_upnp': False, 'enable_natpmp': False}
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def wait_until(core, done, deadline):
+    """Poll until done(status) holds for every torrent, returns whether it did"""
+    while time.perf_counter() < deadline:
+        if core.torrent_handles and all(done(handle.status()) for handle in list(core.torrent_handles.values())):
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def run_child(profile, torrent_dir, port):
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+    from torrent_core import TorrentCore
+
+    save_path = os.path.join(os.environ['HOME'], 'Downloads')
+    torrent_paths = [os.path.join(torrent_dir, name) for name in sorted(os.listdir(torrent_dir))]
+
+    core = TorrentCore()
+    core.session.apply_settings(NO_DISCOVERY)
+    core.set_performance_settings({'profile': profile})
+    core.set_queue_settings({'enabled': False})
+    core.set_window_visible(False)
+    core.start()
+
+    start = time.perf_counter()
+    core.add_torrent_files([(path, save_path, None) for path in torrent_paths])
+    deadline = start + TIMEOUT
+    while len(core.torrent_handles) < len(torrent_paths) and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    for handle in list(core.torrent_handles.values()):
+        handle.connect_peer(('127.0.0.1', port))
+    downloaded = wait_until(core, lambda status: status.is_seeding, deadline)
+    download_seconds = time.perf_counter() - start
+
+    # Hash everything again from disk
+    start = time.perf_counter()
+    for handle in list(core.torrent_handles.values()):
+        handle.force_recheck()
+    time.sleep(0.5)
+    checked = wait_until(core, lambda status: status.is_seeding, start + TIMEOUT)
+    check_seconds = time.perf_counter() - start
+
+    results = {
+        'download': download_seconds if downloaded else None,
+        'check': check_seconds if checked else None,
+        'rss_mb': peak_rss_mb(),
+        'effective': core.get_performance_settings()['effective']
+    }
+    core.shutdown()
+    print(json.dumps(results))
+
+
+def make_seed_data(count, size, directory):
+    """Write count files of random data and their .torrent files, returns (data dir, torrent dir)"""
+    import libtorrent as lt
+
+    data_dir = os.path.join(directory, 'data')
+    torrent_dir = os.path.join(directory, 'torrents')
+    os.makedirs(data_dir)
+    os.makedirs(torrent_dir)
+    for i in range(count):
+        name = f"profile-{i}.bin"
+        with open(os.path.join(data_dir, name), 'wb') as f:
+            for _ in range(size // (1024 * 1024)):
+                f.write(os.urandom(1024 * 1024))
+        fs = lt.file_storage()
+        lt.add_files(fs, os.path.join(data_dir, name))
+        ct = lt.create_torrent(fs)
+        lt.set_piece_hashes(ct, data_dir)
+        with open(os.path.join(torrent_dir, f"{name}.torrent"), 'wb') as f:
+            f.write(lt.bencode(ct.generate()))
+    return data_dir, torrent_dir
+
+
+def start_seeder(data_dir, torrent_dir):
+    """Seed the torrents on localhost, returns (session, port)"""
+    import libtorrent as lt
+    from bench_util import make_session
+    from performance_profiles import profile_settings
+
+    session = make_session(active_seeds=-1, active_limit=-1, **profile_settings('seedbox-nvme'))
+    for name in os.listdir(torrent_dir):
+        params = lt.add_torrent_params()
+        params.ti = lt.torrent_info(os.path.join(torrent_dir, name))
+        params.save_path = data_dir
+        params.flags = lt.torrent_flags.seed_mode
+        session.add_torrent(params)
+    return session, session.listen_port()
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+    from performance_profiles import PROFILES
+
+    profiles = sys.argv[1:] or list(PROFILES)
+    data_dir, torrent_dir = make_seed_data(COUNT, SIZE, tempfile.mkdtemp(prefix='pytorrent-seed-'))
+    seeder, port = start_seeder(data_dir, torrent_dir)
+    total_mb = COUNT * SIZE / (1024 * 1024)
+
+    print(f"{'profile':>14} {'download s':>11} {'MB/s':>7} {'re-check s':>11} {'peak RSS MB':>12}")
+    for profile in profiles:
+        home = tempfile.mkdtemp(prefix='pytorrent-profile-')
+        env = dict(os.environ, HOME=home)
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', profile, torrent_dir, str(port)],
+                                env=env, capture_output=True, text=True, check=True).stdout
+        results = json.loads(output.strip().splitlines()[-1])
+        download, check = results['download'], results['check']
+        rate = f"{total_mb / download:>7.1f}" if download else f"{'-':>7}"
+        download = f"{download:>11.1f}" if download else f"{'timeout':>11}"
+        check = f"{check:>11.1f}" if check else f"{'timeout':>11}"
+        print(f"{profile:>14} {download} {rate} {check} {results['rss_mb']:>12.1f}")
+
+    del seeder
+
+
+if __name__ == "__main__":
+    main()
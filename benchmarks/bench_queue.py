@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: aggregate throughput of 500 downloads, queued vs all at once
+
+A loopback seeder session seeds N torrents of real data. A fresh
+TorrentCore adds all of them in one batch, once with queueing on (the
+default active limits) and once with queueing off, and downloads them
+from the seeder (connected by hand, there is no tracker or DHT). Reports
+the time until every torrent is complete and the aggregate rate.
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+COUNT = 500
+SIZE = 1024 * 1024  # Bytes per torrent
+TIMEOUT = 1800
+NO_DISCOVERY = {'enable_dht': False, 'enable_lsd': False, 'enable_upnp': False, 'enable_natpmp': False}
+
+
+def make_seed_data(count, size, directory):
+    """Write count files of random data and their .torrent files, returns the .torrent paths"""
+    import libtorrent as lt
+
+    data_dir = os.path.join(directory, 'data')
+    torrent_dir = os.path.join(directory, 'torrents')
+    os.makedirs(data_dir)
+    os.makedirs(torrent_dir)
+    paths = []
+    for i in range(count):
+        name = f"queue-{i}.bin"
+        with open(os.path.join(data_dir, name), 'wb') as f:
+            f.write(os.urandom(size))
+        fs = lt.file_storage()
+        lt.add_files(fs, os.path.join(data_dir, name))
+        ct = lt.create_torrent(fs)
+        lt.set_piece_hashes(ct, data_dir)
+        path = os.path.join(torrent_dir, f"{name}.torrent")
+        with open(path, 'wb') as f:
+            f.write(lt.bencode(ct.generate()))
+        paths.append(path)
+    return data_dir, paths
+
+
+def start_seeder(data_dir, torrent_paths):
+    """Seed the torrents on localhost, returns (session, port)"""
+    import libtorrent as lt
+    from bench_util import make_session
+
+    session = make_session(active_seeds=-1, active_limit=-1)
+    for path in torrent_paths:
+        params = lt.add_torrent_params()
+        params.ti = lt.torrent_info(path)
+        params.save_path = data_dir
+        params.flags = lt.torrent_flags.seed_mode
+        session.add_torrent(params)
+    return session, session.listen_port()
+
+
+def run(queueing, torrent_paths, port):
+    """Download everything with a fresh core, returns (seconds, completed, bytes)"""
+    os.environ['HOME'] = tempfile.mkdtemp(prefix='pytorrent-queue-')
+    save_path = os.path.join(os.environ['HOME'], 'Downloads')
+
+    from torrent_core import TorrentCore
+
+    core = TorrentCore()
+    core.session.apply_settings(NO_DISCOVERY)
+    core.set_queue_settings({'enabled': queueing})
+    core.set_window_visible(False)
+    core.start()
+
+    start = time.perf_counter()
+    core.add_torrent_files([(path, save_path, None) for path in torrent_paths])
+
+    # Torrents only find the seeder when connected to it, which is done as
+    # soon as the queue starts them
+    completed = 0
+    while time.perf_counter() - start < TIMEOUT:
+        completed = 0
+        for handle in list(core.torrent_handles.values()):
+            status = handle.status()
+            if status.is_seeding:
+                completed += 1
+            elif not status.paused and status.num_peers == 0:
+                handle.connect_peer(('127.0.0.1', port))
+        if completed == len(torrent_paths):
+            break
+        time.sleep(0.2)
+    seconds = time.perf_counter() - start
+
+    core.shutdown()
+    return seconds, completed, completed * SIZE
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+
+    data_dir, torrent_paths = make_seed_data(count, SIZE, tempfile.mkdtemp(prefix='pytorrent-seed-'))
+    seeder, port = start_seeder(data_dir, torrent_paths)
+
+    print(f"{'queueing':>9} {'completed':>10} {'seconds':>8} {'MB/s':>7}")
+    for queueing in [True, False]:
+        seconds, completed, total_bytes = run(queueing, torrent_paths, port)
+        label = 'on' if queueing else 'off'
+        print(f"{label:>9} {completed:>10} {seconds:>8.1f} {total_bytes / seconds / (1024 * 1024):>7.1f}")
+
+    del seeder
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON-RPC control API throughput at 10k torrents
+
+Runs a TorrentCore with the RPC server on a free localhost port and drives
+it from an asyncio client that keeps up to CONCURRENCY requests in flight:
+batch adds, single status queries, single vs batch pauses, a status delta
+subscription, and a batch removal.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+
+COUNT = 10000
+CONCURRENCY = 64
+ADD_CHUNK = 1000
+
+
+class RpcClient:
+    """Minimal pipelining JSON-RPC client"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.pending = {}  # id -> future
+        self.notifications = 0
+        self.listener = asyncio.ensure_future(self._listen())
+
+    @classmethod
+    async def connect(cls, port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port, limit=64 * 1024 * 1024)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            if 'id' in message:
+                future = self.pending.pop(message['id'])
+                if 'error' in message:
+                    future.set_exception(RuntimeError(message['error']['message']))
+                else:
+                    future.set_result(message['result'])
+            else:
+                self.notifications += 1
+
+    def call(self, method, *params):
+        self.next_id += 1
+        future = asyncio.get_event_loop().create_future()
+        self.pending[self.next_id] = future
+        request = {'jsonrpc': '2.0', 'id': self.next_id, 'method': method, 'params': list(params)}
+        self.writer.write(json.dumps(request).encode('utf-8') + b'\n')
+        return future
+
+    async def call_many(self, calls):
+        """Run [(method, params)] with at most CONCURRENCY in flight, returns calls/s"""
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def one(method, params):
+            async with semaphore:
+                return await self.call(method, *params)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(method, params) for method, params in calls))
+        return len(calls) / (time.perf_counter() - start)
+
+    def close(self):
+        self.listener.cancel()
+        self.writer.close()
+
+
+def report(label, count, seconds):
+    print(f"{label:<34} {count:>8} {seconds:>9.2f} {count / seconds:>12.0f}")
+
+
+async def drive(port, token, paths, save_path):
+    client = await RpcClient.connect(port)
+    await client.call('authenticate', token)
+    print(f"{'operation':<34} {'ops':>8} {'seconds':>9} {'ops/s':>12}")
+
+    # Batch adds, one checkpoint per chunk
+    start = time.perf_counter()
+    hashes = []
+    for i in range(0, len(paths), ADD_CHUNK):
+        items = [[path, save_path] for path in paths[i:i + ADD_CHUNK]]
+        hashes.extend(await client.call('add_torrent_files', items))
+    report(f"add_torrent_files (x{ADD_CHUNK})", len(paths), time.perf_counter() - start)
+    hashes = [h for h in hashes if h]
+
+    # Single status queries
+    calls = [('get_torrent_info', [h]) for h in hashes]
+    rate = await client.call_many(calls)
+    report("get_torrent_info", len(calls), len(calls) / rate)
+
+    calls = [('get_totals', [])] * len(hashes)
+    rate = await client.call_many(calls)
+    report("get_totals", len(calls), len(calls) / rate)
+
+    # Single pauses vs one batch
+    calls = [('pause_torrent', [h]) for h in hashes]
+    rate = await client.call_many(calls)
+    report("pause_torrent", len(calls), len(calls) / rate)
+
+    await client.call('resume_torrents', hashes)
+    start = time.perf_counter()
+    await client.call('pause_torrents', hashes)
+    report("pause_torrents (one batch)", len(hashes), time.perf_counter() - start)
+
+    # Status deltas pushed to a subscriber while everything resumes
+    await client.call('subscribe', ['torrents_updated'])
+    await client.call('resume_torrents', hashes)
+    await asyncio.sleep(5)
+    print(f"torrents_updated notifications in 5 s: {client.notifications}")
+    await client.call('unsubscribe')
+
+    start = time.perf_counter()
+    await client.call('remove_torrents', hashes)
+    report("remove_torrents (one batch)", len(hashes), time.perf_counter() - start)
+
+    client.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+
+    # Isolated state directory
+    home = tempfile.mkdtemp(prefix='pytorrent-rpc-')
+    os.environ['HOME'] = home
+
+    from bench_util import make_torrent_data
+    from torrent_core import TorrentCore
+    from rpc_server import RpcServer
+
+    torrent_dir = os.path.join(home, 'torrents')
+    os.makedirs(torrent_dir)
+    paths = []
+    for i in range(count):
+        path = os.path.join(torrent_dir, f"bench-{i}.torrent")
+        with open(path, 'wb') as f:
+            f.write(make_torrent_data(i, size=256 * 1024))
+        paths.append(path)
+
+    core = TorrentCore()
+    core.start()
+    server = RpcServer(core, port=0)
+    server.start()
+
+    try:
+        asyncio.get_event_loop().run_until_complete(drive(server.port, server.token, paths, os.path.join(home, 'Downloads')))
+    finally:
+        server.stop()
+        core.shutdown()
+
+
+if __name__ == "__main__":
+    main()
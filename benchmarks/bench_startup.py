@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: startup time to first paint and to a fully restored session
+
+Each run uses a throwaway HOME holding a session store with N synthetic
+torrents, and starts the real TorrentClient window in a child process
+(offscreen when there is no display).
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+COUNTS = [1000, 10000, 50000]
+
+
+def populate_store(home, count):
+    """Create ~/.pytorrent/session.db with count synthetic torrents"""
+    import libtorrent as lt
+    from bench_util import make_torrent_data
+    from session_store import SessionStore
+
+    state_path = os.path.join(home, '.pytorrent')
+    os.makedirs(state_path, exist_ok=True)
+    store = SessionStore(os.path.join(state_path, 'session.db'))
+    save_path = os.path.join(home, 'Downloads')
+
+    ops = []
+    for i in range(count):
+        data = make_torrent_data(i, size=256 * 1024)
+        torrent_hash = str(lt.torrent_info(lt.bdecode(data)).info_hash())
+        ops.append(('torrent', torrent_hash, f"bench-{i}", save_path, None))
+        ops.append(('metainfo', torrent_hash, data))
+        if len(ops) >= 10000:
+            store.apply(ops)
+            ops = []
+    store.apply(ops)
+    store.close()
+
+
+def run_child():
+    """Start the client and report first paint / restore times as JSON"""
+    start = time.perf_counter()
+
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QObject, QEvent, QTimer
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+    from torrent_client import TorrentClient
+
+    results = {}
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and 'first_paint' not in results:
+                results['first_paint'] = time.perf_counter() - start
+            return False
+
+    app = QApplication(sys.argv[:1])
+    client = TorrentClient()
+    watcher = PaintWatcher()
+    client.installEventFilter(watcher)
+
+    def on_restored(count, seconds):
+        results['restored'] = time.perf_counter() - start
+        results['count'] = count
+        QTimer.singleShot(0, app.quit)
+
+    client.torrent_manager.session_restored.connect(on_restored)
+    client.show()
+    QTimer.singleShot(600000, app.quit)
+    app.exec_()
+
+    client.shutdown_manager()
+    print(json.dumps(results))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        run_child()
+        return
+
+    counts = [int(arg) for arg in sys.argv[1:]] or COUNTS
+    print(f"{'torrents':>10} {'first paint s':>14} {'restored s':>11}")
+    for count in counts:
+        home = tempfile.mkdtemp(prefix='pytorrent-startup-')
+        populate_store(home, count)
+
+        env = dict(os.environ, HOME=home, XDG_CONFIG_HOME=os.path.join(home, '.config'))
+        if not env.get('DISPLAY'):
+            env['QT_QPA_PLATFORM'] = 'offscreen'
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'],
+                                env=env, capture_output=True, text=True, check=True).stdout
+        results = json.loads(output.strip().splitlines()[-1])
+        print(f"{count:>10} {results.get('first_paint', float('nan')):>14.2f} "
+              f"{results.get('restored', float('nan')):>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-tick status polling cost against torrent count
+
+Compares the old per-handle polling (handle.status() plus name, save_path
+and info_hash round-trips) with one post_torrent_updates() call.
+"""
+
+import sys
+
+import libtorrent as lt
+
+from bench_util import make_session, add_paused_torrents, timed
+
+from status_engine import StatusEngine, status_to_info
+
+COUNTS = [100, 1000, 5000]
+
+
+def per_handle_tick(handles):
+    for handle in handles:
+        status = handle.status()
+        handle.name()
+        handle.save_path()
+        handle.info_hash()
+        status.download_rate
+
+
+def batched_tick(session, engine):
+    engine.request_updates()
+    while session.wait_for_alert(1000) is not None:
+        for alert in session.pop_alerts():
+            if isinstance(alert, lt.state_update_alert):
+                for status in alert.status:
+                    status_to_info(status)
+                return
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or COUNTS
+    print(f"{'torrents':>10} {'per-handle ms':>15} {'batched ms':>12}")
+    for count in counts:
+        session = make_session()
+        handles = add_paused_torrents(session, count)
+        engine = StatusEngine(session)
+
+        # First batch reports every torrent, steady state only the changed ones
+        batched_tick(session, engine)
+
+        per_handle = timed(lambda: per_handle_tick(handles))
+        batched = timed(lambda: batched_tick(session, engine))
+        print(f"{count:>10} {per_handle * 1000:>15.2f} {batched * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory and per-tick cost of the status dict cache vs StatusTable
+
+The old cache kept one 15-key dict per torrent and the window copied the
+whole cache four times per tick to sum rates. StatusTable keeps the same
+data in NumPy columns and answers totals with vectorized reductions.
+
+Change detection is compared too: the old per-torrent _info_changed loop
+against one StatusTable.diff() pass over the whole table.
+"""
+
+import sys
+import random
+import tracemalloc
+
+from bench_util import timed
+
+from status_table import StatusTable
+
+COUNTS = [1000, 10000]
+STATES = ['Downloading', 'Seeding', 'Paused', 'Queued', 'Checking']
+
+
+def make_info(index, rng):
+    """Create one synthetic info dict, as status_to_info would"""
+    return {
+        'name': f"bench-{index}",
+        'hash': f"{index:040x}",
+        'total_size': rng.randrange(1 << 20, 1 << 34),
+        'downloaded': rng.randrange(0, 1 << 34),
+        'uploaded': rng.randrange(0, 1 << 34),
+        'download_rate': rng.randrange(0, 1 << 22),
+        'upload_rate': rng.randrange(0, 1 << 20),
+        'progress': rng.random() * 100,
+        'eta': rng.randrange(0, 86400),
+        'ratio': rng.random() * 3,
+        'state': rng.choice(STATES),
+        'num_peers': rng.randrange(0, 200),
+        'num_seeds': rng.randrange(0, 50),
+        'save_path': '/home/user/Downloads',
+        'paused': False
+    }
+
+
+def dict_tick(cache, infos):
+    for info in infos:
+        cache[info['hash']] = info
+    # update_torrents and update_tray_tooltip each copied the cache twice
+    for _ in range(2):
+        sum(info.get('download_rate', 0) for info in cache.copy().values())
+        sum(info.get('upload_rate', 0) for info in cache.copy().values())
+
+
+def info_changed(old_info, new_info):
+    """The old TorrentManager._info_changed"""
+    for key in ['progress', 'download_rate', 'upload_rate', 'state', 'num_peers']:
+        old_val = old_info.get(key, 0)
+        new_val = new_info.get(key, 0)
+        if isinstance(old_val, (int, float)) and isinstance(new_val, (int, float)):
+            if abs(old_val - new_val) > 0.1:
+                return True
+        elif old_val != new_val:
+            return True
+    return False
+
+
+def dict_diff(previous, infos):
+    return [info['hash'] for info in infos if info_changed(previous[info['hash']], info)]
+
+
+def table_tick(table, infos):
+    for info in infos:
+        table.set_info(info['hash'], info)
+    for _ in range(2):
+        table.totals()
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or COUNTS
+    print(f"{'torrents':>10} {'dict MB':>9} {'table MB':>9} {'dict tick ms':>13} {'table tick ms':>14} "
+          f"{'dict diff ms':>13} {'table diff ms':>14}")
+    for count in counts:
+        rng = random.Random(count)
+        infos = [make_info(i, rng) for i in range(count)]
+
+        # Copies so both stores own their strings and dicts
+        cache, dict_bytes = measure_memory(lambda: {info['hash']: dict(info) for info in infos})
+
+        def build_table():
+            table = StatusTable()
+            for info in infos:
+                table.set_info(info['hash'], info)
+            return table
+        table, table_bytes = measure_memory(build_table)
+
+        dict_time = timed(lambda: dict_tick(cache, infos))
+        table_time = timed(lambda: table_tick(table, infos))
+
+        # Next tick: rates jitter on every torrent
+        table.diff()
+        previous = {info['hash']: info for info in infos}
+        infos = [dict(info, download_rate=info['download_rate'] + rng.randrange(-512, 512)) for info in infos]
+        for info in infos:
+            table.set_info(info['hash'], info)
+        dict_diff_time = timed(lambda: dict_diff(previous, infos))
+        table_diff_time = timed(table.diff)
+
+        print(f"{count:>10} {dict_bytes / 1e6:>9.2f} {table_bytes / 1e6:>9.2f} "
+              f"{dict_time * 1000:>13.2f} {table_time * 1000:>14.2f} "
+              f"{dict_diff_time * 1000:>13.2f} {table_diff_time * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
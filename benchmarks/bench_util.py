@@ -0,0 +1,74 @@
+"""
+Shared helpers for the PyTorrent benchmarks
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+import libtorrent as lt
+
+# Make the application modules importable when run from the benchmarks folder
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+def make_torrent_data(index, size=16 * 1024 * 1024, num_files=1):
+    """Create bencoded metainfo for a synthetic torrent with random piece hashes"""
+    fs = lt.file_storage()
+    file_size = size // num_files
+    for i in range(num_files):
+        fs.add_file(f"bench-{index}/file-{i}.bin", file_size)
+
+    flags = getattr(lt.create_torrent, 'v1_only', 0)
+    ct = lt.create_torrent(fs, 0, flags=flags) if flags else lt.create_torrent(fs, 0)
+    for piece in range(ct.num_pieces()):
+        ct.set_hash(piece, os.urandom(20))
+    return lt.bencode(ct.generate())
+
+
+def make_torrent_info(index, size=16 * 1024 * 1024, num_files=1):
+    """Create a synthetic torrent_info"""
+    return lt.torrent_info(lt.bdecode(make_torrent_data(index, size, num_files)))
+
+
+def make_session(**extra_settings):
+    """Create an isolated session with no network discovery"""
+    settings = {
+        'enable_dht': False,
+        'enable_lsd': False,
+        'enable_upnp': False,
+        'enable_natpmp': False,
+        'listen_interfaces': '127.0.0.1:0',
+        'alert_mask': lt.alert.category_t.status_notification | lt.alert.category_t.error_notification,
+    }
+    settings.update(extra_settings)
+    return lt.session(settings)
+
+
+def add_paused_torrents(session, count, save_path=None):
+    """Add count synthetic torrents in paused state, returns the handles"""
+    if save_path is None:
+        save_path = tempfile.mkdtemp(prefix='pytorrent-bench-')
+    handles = []
+    for i in range(count):
+        params = lt.add_torrent_params()
+        params.ti = make_torrent_info(i)
+        params.save_path = save_path
+        params.flags = lt.torrent_flags.paused
+        handles.append(session.add_torrent(params))
+    return handles
+
+
+def timed(func, repeat=5):
+    """Run func repeat times and return the best wall time in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: watch folder ingest latency when 10,000 files land at once
+
+Prepares N .torrent files (and a few .magnet files) in a staging directory,
+renames them all into the watch folder of a running TorrentCore and
+measures how long it takes until the first and the last torrent are in
+the session and every file has been moved to done/, with inotify and
+with the polling fallback.
+"""
+
+import os
+import sys
+import time
+import tempfile
+import threading
+
+COUNT = 10000
+MAGNET_EVERY = 100  # Every 100th file is a .magnet file instead
+TIMEOUT = 600
+
+
+def stage_files(directory, count):
+    """Write count files into directory, returns their names"""
+    from bench_util import make_torrent_data
+
+    names = []
+    for i in range(count):
+        if i % MAGNET_EVERY == MAGNET_EVERY - 1:
+            name = f"bench-{i}.magnet"
+            with open(os.path.join(directory, name), 'w') as f:
+                f.write(f"magnet:?xt=urn:btih:{i:040x}&dn=bench-{i}\n")
+        else:
+            name = f"bench-{i}.torrent"
+            with open(os.path.join(directory, name), 'wb') as f:
+                f.write(make_torrent_data(i, size=256 * 1024))
+        names.append(name)
+    return names
+
+
+def run(mode, count):
+    """Drop count files into a watch folder, returns the timings in seconds"""
+    # Each run gets its own session store and spool directory
+    home = tempfile.mkdtemp(prefix='pytorrent-watch-')
+    os.environ['HOME'] = home
+    staging = os.path.join(home, 'staging')
+    spool = os.path.join(home, 'spool')
+    os.makedirs(staging)
+    names = stage_files(staging, count)
+
+    from torrent_core import TorrentCore
+
+    core = TorrentCore()
+    core.set_window_visible(False)
+    core.start()
+
+    added = []
+    all_added = threading.Event()
+
+    def on_torrents_added(torrents):
+        added.append((time.perf_counter(), len(torrents)))
+        if sum(n for t, n in added) >= count:
+            all_added.set()
+
+    core.events.subscribe('torrents_added', on_torrents_added)
+    core.set_watch_folder(spool, use_polling=(mode == 'polling'))
+    time.sleep(0.5)
+
+    # Renames are atomic, like a spooler moving finished files in
+    start = time.perf_counter()
+    for name in names:
+        os.rename(os.path.join(staging, name), os.path.join(spool, name))
+    dropped = time.perf_counter() - start
+
+    all_added.wait(TIMEOUT)
+    done_dir = os.path.join(spool, 'done')
+    while len(os.listdir(done_dir)) < count and time.perf_counter() - start < TIMEOUT:
+        time.sleep(0.01)
+    moved = time.perf_counter() - start
+
+    stats = dict(core.watch_folder.stats, mode=core.watch_folder.mode)
+    core.shutdown()
+    first = added[0][0] - start if added else float('nan')
+    last = added[-1][0] - start if added else float('nan')
+    return dropped, first, last, moved, stats
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+
+    import bench_util  # noqa: F401 (puts the application on sys.path)
+
+    print(f"{'mode':>9} {'files':>7} {'drop s':>7} {'first s':>8} {'all added s':>12} "
+          f"{'all moved s':>12} {'files/s':>8} {'batches':>8} {'failed':>7}")
+    modes = ['inotify', 'polling'] if sys.platform.startswith('linux') else ['polling']
+    for mode in modes:
+        dropped, first, last, moved, stats = run(mode, count)
+        print(f"{stats['mode']:>9} {count:>7} {dropped:>7.2f} {first:>8.2f} {last:>12.2f} "
+              f"{moved:>12.2f} {count / moved:>8.0f} {stats['batches']:>8} {stats['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
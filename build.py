@@ -25,7 +25,7 @@ def check_requirements():
         print("✅ PyInstaller installed")
     
     # Check if all dependencies are available
-    required_modules = ['PyQt5', 'libtorrent', 'requests']
+    required_modules = ['PyQt5', 'libtorrent', 'requests', 'numpy']
     missing_modules = []
     
     for module in required_modules:
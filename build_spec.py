@@ -29,13 +29,13 @@ a = Analysis(
         'libtorrent',
         'bencode',
         'requests',
+        'numpy',
     ],
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
     excludes=[
         'matplotlib',
-        'numpy',
         'scipy',
         'pandas',
         'PIL',
@@ -0,0 +1,71 @@
+"""
+Bulk Import - Find and validate .torrent files for batch adding
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import libtorrent as lt
+
+# Torrents added to the session (and shown in the GUI) at a time
+IMPORT_BATCH_SIZE = 500
+
+# Below this many files the worker processes cost more than they save
+POOL_MIN_FILES = 64
+
+# Metainfo files larger than this are rejected without parsing
+MAX_TORRENT_FILE_BYTES = 64 * 1024 * 1024
+
+
+def find_torrent_files(paths):
+    """Expand files and directories (recursively) into a sorted list of .torrent files"""
+    found = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                for name in files:
+                    if name.lower().endswith('.torrent'):
+                        found.add(os.path.join(root, name))
+        elif os.path.isfile(path):
+            found.add(path)
+    return sorted(found)
+
+
+def parse_torrent_file(path):
+    """Read and validate one metainfo file (runs in a worker process).
+
+    Returns (path, info_hash, data, error): the raw bencoded data for a
+    valid torrent, or the reason it was rejected.
+    """
+    try:
+        if os.path.getsize(path) > MAX_TORRENT_FILE_BYTES:
+            return path, None, None, "File is too large to be a torrent"
+        with open(path, 'rb') as f:
+            data = f.read()
+        torrent_info = lt.torrent_info(lt.bdecode(data))
+        return path, str(torrent_info.info_hash()), data, None
+    except Exception as e:
+        return path, None, None, str(e) or "Invalid torrent file"
+
+
+def parse_torrent_files(paths, workers=None):
+    """Parse metainfo files, in a process pool for large imports.
+
+    Yields parse_torrent_file results in the order of paths. Workers are
+    spawned rather than forked, since the caller has libtorrent threads running.
+    """
+    if len(paths) < POOL_MIN_FILES:
+        for path in paths:
+            yield parse_torrent_file(path)
+        return
+
+    context = multiprocessing.get_context('spawn')
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+    try:
+        yield from pool.map(parse_torrent_file, paths, chunksize=64)
+    finally:
+        # Don't parse the rest if the import was cancelled
+        try:
+            pool.shutdown(wait=True, cancel_futures=True)
+        except TypeError:
+            pool.shutdown(wait=True)  # Python < 3.9
@@ -0,0 +1,311 @@
+"""
+Categories - Torrent labels with save paths, rate caps and bandwidth weights
+"""
+
+import os
+import json
+import threading
+import libtorrent as lt
+
+DEFAULT_WEIGHT = 1
+MAX_WEIGHT = 100
+
+# Addresses whose peers don't count against the WAN rate limits
+LOCAL_RANGES = [
+    ('10.0.0.0', '10.255.255.255'),
+    ('172.16.0.0', '172.31.255.255'),
+    ('192.168.0.0', '192.168.255.255'),
+    ('169.254.0.0', '169.254.255.255'),
+    ('127.0.0.0', '127.255.255.255'),
+    ('::1', '::1'),
+    ('fc00::', 'fdff:ffff:ffff:ffff:ffff:ffff:ffff:ffff'),
+    ('fe80::', 'febf:ffff:ffff:ffff:ffff:ffff:ffff:ffff')
+]
+
+# Headroom over a torrent's current rate when sharing out a cap, so it can grow into spare bandwidth
+DEMAND_HEADROOM = 1.25
+MIN_DEMAND = 16 * 1024
+
+# Per-torrent limits are only re-applied when they move by more than this
+LIMIT_TOLERANCE = 0.05
+
+
+def water_fill(total, demands, weights):
+    """Split total between claimants by weight, none getting more than its demand.
+
+    What a claimant doesn't need is shared out among the others, again by
+    weight. Returns the allocations in the order of demands.
+    """
+    allocations = [0.0] * len(demands)
+    open_claims = [i for i, demand in enumerate(demands) if demand > 0]
+    remaining = float(total)
+    while open_claims and remaining > 1e-6:
+        weight_sum = sum(weights[i] for i in open_claims)
+        satisfied = []
+        for i in open_claims:
+            share = remaining * weights[i] / weight_sum
+            if demands[i] - allocations[i] <= share:
+                satisfied.append(i)
+        if not satisfied:
+            # Nobody is held back by their demand: split what's left by weight
+            for i in open_claims:
+                allocations[i] += remaining * weights[i] / weight_sum
+            break
+        for i in satisfied:
+            remaining -= demands[i] - allocations[i]
+            allocations[i] = demands[i]
+            open_claims.remove(i)
+    return allocations
+
+
+class CategoryManager:
+    """Categories and which torrents are in them, persisted to a JSON file.
+
+    A category has a default save path, download/upload caps in B/s (0 is
+    unlimited) and a weight. libtorrent has no public API to put a torrent
+    into a peer class (classes follow the peer's address and socket type),
+    so caps and weights are enforced with per-torrent limits: rebalance()
+    splits each category's cap, and under a global limit the global rate
+    by category weight, between its torrents by their recent demand.
+    Peer classes do what they are made for: libtorrent's built-in local
+    peer class, for LAN and loopback peers, is kept free of rate limits so
+    local transfers don't use up the WAN limits.
+    """
+
+    def __init__(self, session, path):
+        self.session = session
+        self.path = path
+        self.categories = {}  # name -> {'save_path', 'download_limit', 'upload_limit', 'weight'}
+        self.assignments = {}  # hash -> category name
+        self.lan_unthrottled = True
+        self.local_class = getattr(lt.session, 'local_peer_class_id', 2)
+        self._applied = {}  # hash -> (download limit, upload limit) set on the handle
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.categories = {name: self._normalized(settings)
+                               for name, settings in data.get('categories', {}).items()}
+            self.assignments = {torrent_hash: name for torrent_hash, name in data.get('torrents', {}).items()
+                                if name in self.categories}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Error loading categories from {self.path}: {e}")
+
+    def _save(self):
+        """Write categories and assignments (called with the lock held)"""
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'categories': self.categories, 'torrents': self.assignments}, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Error saving categories to {self.path}: {e}")
+
+    @staticmethod
+    def _normalized(settings):
+        weight = int(settings.get('weight', DEFAULT_WEIGHT))
+        if not 1 <= weight <= MAX_WEIGHT:
+            raise ValueError(f"Category weight must be 1-{MAX_WEIGHT}: {weight}")
+        download_limit = int(settings.get('download_limit', 0))
+        upload_limit = int(settings.get('upload_limit', 0))
+        if download_limit < 0 or upload_limit < 0:
+            raise ValueError("Category rate limits can't be negative")
+        return {
+            'save_path': settings.get('save_path') or None,
+            'download_limit': download_limit,
+            'upload_limit': upload_limit,
+            'weight': weight
+        }
+
+    # Categories
+
+    def set_category(self, name, settings):
+        """Create or change a category"""
+        name = name.strip()
+        if not name:
+            raise ValueError("Category name can't be empty")
+        category = self._normalized(settings)
+        with self._lock:
+            self.categories[name] = category
+            self._save()
+
+    def remove_category(self, name):
+        """Delete a category; its torrents become uncategorized. Returns False if unknown"""
+        with self._lock:
+            if self.categories.pop(name, None) is None:
+                return False
+            self.assignments = {torrent_hash: category for torrent_hash, category in self.assignments.items()
+                                if category != name}
+            self._save()
+            return True
+
+    def get_categories(self):
+        with self._lock:
+            return {name: dict(category) for name, category in self.categories.items()}
+
+    def get(self, name):
+        with self._lock:
+            category = self.categories.get(name)
+            return dict(category) if category is not None else None
+
+    # Torrents
+
+    def assign(self, torrent_hashes, name):
+        """Put torrents in a category (None: no category)"""
+        with self._lock:
+            if name is not None and name not in self.categories:
+                raise ValueError(f"Unknown category: {name}")
+            for torrent_hash in torrent_hashes:
+                if name is None:
+                    self.assignments.pop(torrent_hash, None)
+                else:
+                    self.assignments[torrent_hash] = name
+            self._save()
+
+    def category_of(self, torrent_hash):
+        with self._lock:
+            return self.assignments.get(torrent_hash)
+
+    def member_counts(self):
+        """Number of torrents per category"""
+        with self._lock:
+            counts = dict.fromkeys(self.categories, 0)
+            for name in self.assignments.values():
+                counts[name] += 1
+            return counts
+
+    def forget(self, torrent_hashes):
+        """Drop removed torrents"""
+        with self._lock:
+            changed = False
+            for torrent_hash in torrent_hashes:
+                self._applied.pop(torrent_hash, None)
+                if self.assignments.pop(torrent_hash, None) is not None:
+                    changed = True
+            if changed:
+                self._save()
+
+    # Enforcement
+
+    def setup_peer_classes(self, lan_unthrottled=True):
+        """Keep LAN and loopback peers in libtorrent's local class, outside the global rate limit (or not)"""
+        global_class = getattr(lt.session, 'global_peer_class_id', 0)
+        info = self.session.get_peer_class(self.local_class)
+        info.update({'download_limit': 0, 'upload_limit': 0, 'ignore_unchoke_slots': True})
+        self.session.set_peer_class(self.local_class, info)
+
+        # Every address is in the global class, local ones only in the local class
+        ip_filter = lt.ip_filter()
+        ip_filter.add_rule('0.0.0.0', '255.255.255.255', 1 << global_class)
+        ip_filter.add_rule('::', 'ffff:ffff:ffff:ffff:ffff:ffff:ffff:ffff', 1 << global_class)
+        for first, last in LOCAL_RANGES:
+            ip_filter.add_rule(first, last, 1 << self.local_class)
+        self.session.set_peer_class_filter(ip_filter)
+
+        # TCP sockets keep libtorrent's TCP class (used to balance TCP against uTP).
+        # Without the exemption, every kind of socket is put in the global class and taken out of
+        # the local one (disallow, since the IP filter assigned it and remove only undoes an add)
+        type_filter = lt.peer_class_type_filter()
+        tcp_class = getattr(lt.session, 'tcp_peer_class_id', 1)
+        type_filter.add(lt.peer_class_type_filter.tcp_socket, tcp_class)
+        type_filter.add(lt.peer_class_type_filter.ssl_tcp_socket, tcp_class)
+        if not lan_unthrottled:
+            for socket_type in ('tcp_socket', 'utp_socket', 'ssl_tcp_socket', 'ssl_utp_socket'):
+                socket_type = getattr(lt.peer_class_type_filter, socket_type)
+                type_filter.add(socket_type, global_class)
+                type_filter.disallow(socket_type, self.local_class)
+        self.session.set_peer_class_type_filter(type_filter)
+        self.lan_unthrottled = lan_unthrottled
+
+    def needs_rebalance(self):
+        """Whether any torrent is in a category, or still has limits from one"""
+        with self._lock:
+            return bool(self.categories and self.assignments) or bool(self._applied)
+
+    def rebalance(self, torrents, global_limits):
+        """Recompute and apply per-torrent limits.
+
+        torrents is {hash: (handle, download rate, upload rate, running)}
+        for every torrent and global_limits the (download, upload) limits in
+        force (B/s, 0 for unlimited). Does nothing while there are no
+        categories with torrents in them.
+        """
+        with self._lock:
+            categories = dict(self.categories)
+            assignments = dict(self.assignments)
+            if not categories or not assignments:
+                if self._applied:
+                    self._apply({torrent_hash: (0, 0) for torrent_hash in self._applied}, torrents)
+                return
+
+        limits = {torrent_hash: [0, 0] for torrent_hash in torrents}
+        for direction in (0, 1):
+            # Group running torrents by category ('' for uncategorized)
+            groups = {}
+            for torrent_hash, (handle, download_rate, upload_rate, running) in torrents.items():
+                if running:
+                    rate = download_rate if direction == 0 else upload_rate
+                    groups.setdefault(assignments.get(torrent_hash, ''), []).append(
+                        (torrent_hash, max(rate * DEMAND_HEADROOM, MIN_DEMAND)))
+            if not groups:
+                continue
+
+            key = 'download_limit' if direction == 0 else 'upload_limit'
+            names = list(groups)
+            caps = [categories[name][key] if name in categories else 0 for name in names]
+            demands = [sum(demand for torrent_hash, demand in groups[name]) for name in names]
+            # A capped category never needs more than its cap
+            demands = [min(demand, cap) if cap else demand for demand, cap in zip(demands, caps)]
+
+            global_limit = global_limits[direction]
+            if global_limit:
+                weights = [categories[name]['weight'] if name in categories else DEFAULT_WEIGHT for name in names]
+                budgets = water_fill(global_limit, demands, weights)
+                # Global bandwidth nobody asks for yet is shared by weight (within caps) so demand can grow
+                spare = global_limit - sum(budgets)
+                budgets = [budget + spare * weight / sum(weights) for budget, weight in zip(budgets, weights)]
+                budgets = [min(budget, cap) if cap else budget for budget, cap in zip(budgets, caps)]
+            else:
+                budgets = caps  # Only capped categories are limited
+
+            for name, budget in zip(names, budgets):
+                if not budget:
+                    continue
+                members = groups[name]
+                shares = water_fill(budget, [demand for torrent_hash, demand in members], [1] * len(members))
+                # What no member asks for yet is shared evenly so each can grow
+                spare = (budget - sum(shares)) / len(members)
+                for (torrent_hash, demand), share in zip(members, shares):
+                    limits[torrent_hash][direction] = max(1, int(share + spare))
+
+        with self._lock:
+            self._apply({torrent_hash: tuple(limit) for torrent_hash, limit in limits.items()}, torrents)
+
+    def _apply(self, limits, torrents):
+        """Set changed per-torrent limits on the handles (called with the lock held)"""
+        for torrent_hash, (download_limit, upload_limit) in limits.items():
+            entry = torrents.get(torrent_hash)
+            if entry is None:
+                self._applied.pop(torrent_hash, None)
+                continue
+            applied = self._applied.get(torrent_hash, (0, 0))
+            if not self._differs(applied[0], download_limit) and not self._differs(applied[1], upload_limit):
+                continue
+            handle = entry[0]
+            handle.set_download_limit(download_limit or -1)
+            handle.set_upload_limit(upload_limit or -1)
+            if download_limit or upload_limit:
+                self._applied[torrent_hash] = (download_limit, upload_limit)
+            else:
+                self._applied.pop(torrent_hash, None)
+
+    @staticmethod
+    def _differs(old, new):
+        if not old or not new:
+            return old != new
+        return abs(new - old) > LIMIT_TOLERANCE * old
@@ -0,0 +1,133 @@
+"""
+Category Dialog - Edit categories: save path, rate caps and bandwidth weight
+"""
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QSpinBox, QTableWidget, QTableWidgetItem, QHeaderView,
+                             QAbstractItemView, QDialogButtonBox, QFileDialog, QMessageBox)
+from PyQt5.QtCore import Qt
+
+from categories import DEFAULT_WEIGHT, MAX_WEIGHT
+
+
+class CategoryDialog(QDialog):
+    """Table of categories; existing ones keep their name so their torrents stay in them"""
+
+    COLUMNS = ["Name", "Save Path", "Download Cap", "Upload Cap", "Weight"]
+    NAME, SAVE_PATH, DOWNLOAD, UPLOAD, WEIGHT = range(len(COLUMNS))
+
+    def __init__(self, categories, parent=None):
+        super().__init__(parent)
+        self.original = set(categories)
+        self.init_ui()
+        for name, category in sorted(categories.items()):
+            self.add_row(name, category, existing=True)
+
+    def init_ui(self):
+        self.setWindowTitle("Categories")
+        self.setModal(True)
+        self.resize(700, 350)
+
+        layout = QVBoxLayout(self)
+
+        help_label = QLabel("Caps limit all torrents of a category together (0 is unlimited). "
+                            "Under a global rate limit, categories share it by weight.")
+        help_label.setWordWrap(True)
+        layout.addWidget(help_label)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(self.SAVE_PATH, QHeaderView.Stretch)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+
+        buttons_layout = QHBoxLayout()
+        add_btn = QPushButton("Add")
+        add_btn.clicked.connect(lambda: self.add_row("", {}, existing=False))
+        buttons_layout.addWidget(add_btn)
+
+        remove_btn = QPushButton("Remove")
+        remove_btn.clicked.connect(self.remove_selected)
+        buttons_layout.addWidget(remove_btn)
+
+        browse_btn = QPushButton("Save Path...")
+        browse_btn.clicked.connect(self.browse_save_path)
+        buttons_layout.addWidget(browse_btn)
+        buttons_layout.addStretch()
+        layout.addLayout(buttons_layout)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+
+    def create_spin(self, minimum, maximum, value, suffix=""):
+        spin = QSpinBox()
+        spin.setRange(minimum, maximum)
+        spin.setValue(value)
+        spin.setSuffix(suffix)
+        return spin
+
+    def add_row(self, name, category, existing):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+
+        name_item = QTableWidgetItem(name)
+        if existing:
+            # Renaming would drop the category's torrents, so names are fixed
+            name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
+        self.table.setItem(row, self.NAME, name_item)
+        self.table.setItem(row, self.SAVE_PATH, QTableWidgetItem(category.get('save_path') or ""))
+        self.table.setCellWidget(row, self.DOWNLOAD,
+                                 self.create_spin(0, 1000000, category.get('download_limit', 0), " KB/s"))
+        self.table.setCellWidget(row, self.UPLOAD,
+                                 self.create_spin(0, 1000000, category.get('upload_limit', 0), " KB/s"))
+        self.table.setCellWidget(row, self.WEIGHT,
+                                 self.create_spin(1, MAX_WEIGHT, category.get('weight', DEFAULT_WEIGHT)))
+
+        if not existing:
+            self.table.setCurrentCell(row, self.NAME)
+            self.table.editItem(name_item)
+
+    def remove_selected(self):
+        row = self.table.currentRow()
+        if row >= 0:
+            self.table.removeRow(row)
+
+    def browse_save_path(self):
+        row = self.table.currentRow()
+        if row < 0:
+            return
+        directory = QFileDialog.getExistingDirectory(self, "Select Save Path",
+                                                     self.table.item(row, self.SAVE_PATH).text())
+        if directory:
+            self.table.item(row, self.SAVE_PATH).setText(directory)
+
+    def categories(self):
+        """The edited categories: name -> settings (limits in KB/s)"""
+        categories = {}
+        for row in range(self.table.rowCount()):
+            name = self.table.item(row, self.NAME).text().strip()
+            categories[name] = {
+                'save_path': self.table.item(row, self.SAVE_PATH).text().strip() or None,
+                'download_limit': self.table.cellWidget(row, self.DOWNLOAD).value(),
+                'upload_limit': self.table.cellWidget(row, self.UPLOAD).value(),
+                'weight': self.table.cellWidget(row, self.WEIGHT).value()
+            }
+        return categories
+
+    def removed(self):
+        """Names of the categories that were deleted"""
+        return sorted(self.original - set(self.categories()))
+
+    def accept(self):
+        names = [self.table.item(row, self.NAME).text().strip() for row in range(self.table.rowCount())]
+        if "" in names:
+            QMessageBox.warning(self, "Categories", "Every category needs a name.")
+            return
+        if len(set(names)) != len(names):
+            QMessageBox.warning(self, "Categories", "Category names must be unique.")
+            return
+        super().accept()
@@ -0,0 +1,39 @@
+"""
+Event Bus - Minimal publish/subscribe hub used by the torrent core
+"""
+
+import threading
+
+
+class EventBus:
+    """Thread-safe registry of callbacks per event name.
+
+    Callbacks run synchronously on the thread that emits the event, so a
+    subscriber that owns thread-affine state (a GUI) has to hand the call
+    over to its own thread, e.g. by re-emitting it as a queued Qt signal.
+    """
+
+    def __init__(self):
+        self._subscribers = {}  # event name -> [callbacks]
+        self._lock = threading.Lock()
+
+    def subscribe(self, event, callback):
+        """Call callback(*args) whenever event is emitted"""
+        with self._lock:
+            self._subscribers.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event, callback):
+        with self._lock:
+            callbacks = self._subscribers.get(event, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def emit(self, event, *args):
+        """Call every subscriber of event; one failing subscriber doesn't stop the others"""
+        with self._lock:
+            callbacks = list(self._subscribers.get(event, ()))
+        for callback in callbacks:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error handling {event} event: {e}")
@@ -0,0 +1,94 @@
+"""
+File Priorities - Priority levels and file selectors for per-file priorities
+"""
+
+import re
+import fnmatch
+
+import numpy as np
+
+# libtorrent download priorities (0-7) by name
+PRIORITY_LEVELS = {'skip': 0, 'low': 1, 'normal': 4, 'high': 7}
+
+RANGE_PATTERN = re.compile(r'^\s*(\d+)\s*-\s*(\d+)\s*$')
+
+
+def parse_priority(priority):
+    """Turn a level name ('skip', 'low', 'normal', 'high') or 0-7 into a libtorrent priority"""
+    if isinstance(priority, str):
+        name = priority.strip().lower()
+        if name in PRIORITY_LEVELS:
+            return PRIORITY_LEVELS[name]
+        if not name.isdigit():
+            raise ValueError(f"Unknown file priority: {priority}")
+        priority = int(name)
+    if isinstance(priority, bool) or not isinstance(priority, int) or not 0 <= priority <= 7:
+        raise ValueError(f"File priority must be 0-7 or one of {', '.join(PRIORITY_LEVELS)}: {priority}")
+    return priority
+
+
+def priority_name(priority):
+    """Display name of a libtorrent priority (the nearest level for in-between values)"""
+    if priority <= 0:
+        return "Skip"
+    if priority < 4:
+        return "Low"
+    if priority < 7:
+        return "Normal"
+    return "High"
+
+
+def select_files(selectors, num_files, load_paths):
+    """Which files a selection covers, as a boolean mask by file index.
+
+    selectors is None (every file) or one or a list of: a file index, an
+    inclusive index range 'first-last', or a glob pattern. Patterns with a
+    '/' match the path inside the torrent, others just the file name.
+    load_paths() returns the file paths; it is only called for globs.
+    """
+    mask = np.zeros(num_files, dtype=bool)
+    if selectors is None:
+        mask[:] = True
+        return mask
+    if isinstance(selectors, (int, str)):
+        selectors = [selectors]
+
+    indices = []
+    file_paths = names = None
+    for selector in selectors:
+        if isinstance(selector, str) and selector.strip().isdigit():
+            selector = int(selector)
+        if isinstance(selector, (int, np.integer)) and not isinstance(selector, bool):
+            indices.append(selector)
+            continue
+        if not isinstance(selector, str):
+            raise ValueError(f"Invalid file selector: {selector!r}")
+
+        match = RANGE_PATTERN.match(selector)
+        if match:
+            first, last = int(match.group(1)), int(match.group(2))
+            if first > last or last >= num_files:
+                raise ValueError(f"File range out of range (0-{num_files - 1}): {selector}")
+            mask[first:last + 1] = True
+            continue
+
+        # One compiled pattern per glob, not fnmatch's per-call cache lookup
+        pattern = re.compile(fnmatch.translate(selector.replace('\\', '/')))
+        if file_paths is None:
+            file_paths = [path.replace('\\', '/') for path in load_paths()]
+        if '/' in selector or '\\' in selector:
+            candidates = file_paths
+        else:
+            if names is None:
+                names = [path.rsplit('/', 1)[-1] for path in file_paths]
+            candidates = names
+        mask |= np.fromiter((pattern.match(candidate) is not None for candidate in candidates),
+                            dtype=bool, count=num_files)
+
+    # Plain indices (a GUI selection can be every file) in one vectorized assignment
+    if indices:
+        indices = np.array(indices, dtype=np.int64)
+        if indices.min() < 0 or indices.max() >= num_files:
+            raise ValueError(f"File index out of range (0-{num_files - 1})")
+        mask[indices] = True
+    return mask
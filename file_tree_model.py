@@ -0,0 +1,325 @@
+"""
+File Tree Model - Lazily built, checkable tree over a torrent's files
+"""
+
+import time
+from bisect import bisect_left
+
+import numpy as np
+from PyQt5.QtCore import QAbstractItemModel, QModelIndex, Qt, pyqtSignal
+
+from torrent_model import format_size
+from file_priorities import PRIORITY_LEVELS, priority_name
+
+# Views of torrents with more files than this start collapsed
+EXPAND_ALL_MAX_FILES = 1000
+
+# Seconds a requested priority is shown before libtorrent's value wins anyway (the request failed)
+PENDING_PRIORITY_TIMEOUT = 5.0
+
+# Rows handed to the view at a time when a huge directory is expanded
+FETCH_CHUNK = 1000
+
+# Sorts right after '/', so bisecting for prefix + name + NEXT_TO_SLASH ends a directory's range
+NEXT_TO_SLASH = chr(ord('/') + 1)
+
+
+class _Directory:
+    """A directory node: its files are the sorted positions [lo, hi)"""
+
+    __slots__ = ('parent', 'row', 'name', 'prefix', 'lo', 'hi', 'entries', 'loaded')
+
+    def __init__(self, parent, row, name, prefix, lo, hi):
+        self.parent = parent
+        self.row = row
+        self.name = name
+        self.prefix = prefix
+        self.lo = lo
+        self.hi = hi
+        self.entries = None  # Children (_Directory, or sorted position of a file), built on first expand
+        self.loaded = 0  # Rows handed to the view so far
+
+
+class FileTreeModel(QAbstractItemModel):
+    """Tree of a torrent's files that only builds the directories that are expanded.
+
+    Paths are sorted once, so every directory is a contiguous range of
+    sorted positions found by bisecting (the prefix index); directory sizes
+    are differences of a prefix sum. Check states live in one boolean mask
+    over the sorted positions: checking a directory sets a slice, a
+    directory's tri-state is a count over its slice, and selected_files()
+    is a vectorized lookup rather than a walk over the tree. Each index
+    points at its parent directory; its row is the position among the
+    parent's entries.
+    """
+
+    COLUMNS = ["File", "Size"]
+
+    def __init__(self, files, parent=None):
+        """files: [(path, size)] in file index order"""
+        super().__init__(parent)
+        paths = [path.replace('\\', '/') for path, size in files]
+        self.order = np.array(sorted(range(len(paths)), key=paths.__getitem__), dtype=np.int64)
+        self.paths = [paths[i] for i in self.order.tolist()]  # Sorted paths
+        sizes = np.fromiter((size for path, size in files), dtype=np.int64, count=len(files))
+        self.sizes = sizes[self.order]
+        self.size_sums = np.concatenate([[0], np.cumsum(self.sizes)])
+        self.checked = np.ones(len(self.paths), dtype=bool)  # By sorted position
+
+        self.root = _Directory(None, 0, '', '', 0, len(self.paths))
+        self._build_entries(self.root)
+        self._load_rows(self.root, QModelIndex())
+
+    # Tree structure
+
+    def _build_entries(self, directory):
+        """List a directory's children: one bisect per subdirectory, one step per file"""
+        entries = []
+        prefix = directory.prefix
+        start = len(prefix)
+        position = directory.lo
+        while position < directory.hi:
+            rest = self.paths[position][start:]
+            slash = rest.find('/')
+            if slash < 0:
+                entries.append(position)
+                position += 1
+                continue
+            name = rest[:slash]
+            end = bisect_left(self.paths, prefix + name + NEXT_TO_SLASH, position, directory.hi)
+            entries.append(_Directory(directory, len(entries), name, prefix + name + '/', position, end))
+            position = end
+        directory.entries = entries
+
+    def _load_rows(self, directory, parent_index):
+        """Hand the next chunk of a directory's entries to the view"""
+        if directory.entries is None:
+            self._build_entries(directory)
+        count = min(FETCH_CHUNK, len(directory.entries) - directory.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(parent_index, directory.loaded, directory.loaded + count - 1)
+        directory.loaded += count
+        self.endInsertRows()
+
+    def _directory_of(self, parent_index):
+        """The directory an index stands for (the root for an invalid index), None for files"""
+        if not parent_index.isValid():
+            return self.root
+        entry = self._entry(parent_index)
+        return entry if isinstance(entry, _Directory) else None
+
+    def _entry(self, index):
+        return index.internalPointer().entries[index.row()]
+
+    def _index_of(self, directory, column=0):
+        if directory is self.root:
+            return QModelIndex()
+        return self.createIndex(directory.row, column, directory.parent)
+
+    def index(self, row, column, parent=QModelIndex()):
+        directory = self._directory_of(parent)
+        if directory is None or directory.entries is None or not 0 <= row < directory.loaded:
+            return QModelIndex()
+        return self.createIndex(row, column, directory)
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self._index_of(index.internalPointer())
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        directory = self._directory_of(parent)
+        return directory.loaded if directory is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        return self._directory_of(parent) is not None
+
+    def canFetchMore(self, parent):
+        directory = self._directory_of(parent)
+        return directory is not None and (directory.entries is None or directory.loaded < len(directory.entries))
+
+    def fetchMore(self, parent):
+        directory = self._directory_of(parent)
+        if directory is not None:
+            self._load_rows(directory, parent)
+
+    # Data
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == 0:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._entry(index)
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                if isinstance(entry, _Directory):
+                    return entry.name
+                return self.paths[entry].rsplit('/', 1)[-1]
+            if column == 1:
+                return format_size(int(self.entry_size(entry)))
+        elif role == Qt.CheckStateRole and column == 0:
+            return self.check_state(entry)
+        elif role == Qt.TextAlignmentRole and column == 1:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def entry_size(self, entry):
+        if isinstance(entry, _Directory):
+            return self.size_sums[entry.hi] - self.size_sums[entry.lo]
+        return self.sizes[entry]
+
+    def check_state(self, entry):
+        if not isinstance(entry, _Directory):
+            return Qt.Checked if self.checked[entry] else Qt.Unchecked
+        count = int(np.count_nonzero(self.checked[entry.lo:entry.hi]))
+        if count == 0:
+            return Qt.Unchecked
+        return Qt.Checked if count == entry.hi - entry.lo else Qt.PartiallyChecked
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole or index.column() != 0:
+            return False
+        entry = self._entry(index)
+        checked = value != Qt.Unchecked
+        if isinstance(entry, _Directory):
+            self.checked[entry.lo:entry.hi] = checked
+            self._emit_loaded_descendants(entry)
+        else:
+            self.checked[entry] = checked
+
+        # The row itself and the tri-state of every directory above it
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        directory = index.internalPointer()
+        while directory is not self.root:
+            parent_index = self._index_of(directory)
+            self.dataChanged.emit(parent_index, parent_index, [Qt.CheckStateRole])
+            directory = directory.parent
+        return True
+
+    def _emit_loaded_descendants(self, directory, last_column=0, roles=(Qt.CheckStateRole,)):
+        """Repaint the check boxes (or columns up to last_column) of every loaded row below a directory"""
+        if not directory.loaded:
+            return
+        first = self.createIndex(0, 0, directory)
+        last = self.createIndex(directory.loaded - 1, last_column, directory)
+        self.dataChanged.emit(first, last, list(roles))
+        for entry in directory.entries[:directory.loaded]:
+            if isinstance(entry, _Directory):
+                self._emit_loaded_descendants(entry, last_column, roles)
+
+    # Selection
+
+    def set_all_checked(self, checked):
+        self.checked[:] = checked
+        self._emit_loaded_descendants(self.root)
+
+    def selected_files(self):
+        """File indices that are checked, ascending"""
+        return np.sort(self.order[self.checked]).tolist()
+
+    def selected_mask(self):
+        """Checked state by file index"""
+        mask = np.zeros(len(self.order), dtype=bool)
+        mask[self.order] = self.checked
+        return mask
+
+
+class TorrentFilesModel(FileTreeModel):
+    """File tree of a torrent in the session, with live progress and priorities.
+
+    Checking a file or directory downloads it at normal priority,
+    unchecking skips it. Changes are shown right away and requested with
+    priority_requested (file indices, priority); update() then brings in
+    what libtorrent reports. A requested priority stays pending until
+    libtorrent reports it (or PENDING_PRIORITY_TIMEOUT passes), so a
+    refresh that runs before the request arrives doesn't undo the edit.
+    """
+
+    COLUMNS = ["File", "Size", "Progress", "Priority"]
+
+    priority_requested = pyqtSignal(object, int)  # [file index], libtorrent priority 0-7
+
+    def __init__(self, files, parent=None):
+        super().__init__(files, parent)
+        self.progress_sums = np.zeros(len(self.paths) + 1, dtype=np.int64)
+        self.priorities = np.full(len(self.paths), PRIORITY_LEVELS['normal'], dtype=np.int64)
+        self.pending = np.full(len(self.paths), -1, dtype=np.int64)  # Requested priority, -1 if none
+        self.pending_until = np.zeros(len(self.paths), dtype=np.float64)
+
+    def update(self, progress, priorities):
+        """Take bytes downloaded and priority per file (in file index order) and repaint the loaded rows"""
+        self.progress_sums[1:] = np.cumsum(np.asarray(progress, dtype=np.int64)[self.order])
+        reported = np.asarray(priorities, dtype=np.int64)[self.order]
+        # Requests libtorrent hasn't applied yet keep showing what was asked for
+        waiting = (self.pending >= 0) & (reported != self.pending) & (self.pending_until > time.monotonic())
+        self.pending[~waiting] = -1
+        self.priorities = np.where(waiting, self.pending, reported)
+        self.checked = self.priorities > 0
+        self._emit_loaded_descendants(self.root, len(self.COLUMNS) - 1, (Qt.DisplayRole, Qt.CheckStateRole))
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.column() < 2:
+            return super().data(index, role)
+        entry = self._entry(index)
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            lo, hi = (entry.lo, entry.hi) if isinstance(entry, _Directory) else (entry, entry + 1)
+            if column == 2:
+                size = int(self.size_sums[hi] - self.size_sums[lo])
+                done = int(self.progress_sums[hi] - self.progress_sums[lo])
+                return f"{done * 100.0 / size:.1f}%" if size else "100.0%"
+            if column == 3:
+                lowest = int(self.priorities[lo:hi].min())
+                if lowest != int(self.priorities[lo:hi].max()):
+                    return "Mixed"
+                return priority_name(lowest)
+        elif role == Qt.TextAlignmentRole and column == 2:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole or index.column() != 0:
+            return False
+        priority = PRIORITY_LEVELS['skip'] if value == Qt.Unchecked else PRIORITY_LEVELS['normal']
+        self.set_priority([index], priority)
+        return True
+
+    def set_priority(self, indexes, priority):
+        """Give the files (and everything in the directories) at indexes a priority"""
+        positions = []
+        for index in indexes:
+            entry = self._entry(index)
+            if isinstance(entry, _Directory):
+                positions.append(np.arange(entry.lo, entry.hi))
+            else:
+                positions.append(np.array([entry]))
+        if not positions:
+            return
+        positions = np.unique(np.concatenate(positions))
+        self.priorities[positions] = priority
+        self.pending[positions] = priority
+        self.pending_until[positions] = time.monotonic() + PENDING_PRIORITY_TIMEOUT
+        self.checked = self.priorities > 0
+        self._emit_loaded_descendants(self.root, len(self.COLUMNS) - 1, (Qt.DisplayRole, Qt.CheckStateRole))
+        self.priority_requested.emit(np.sort(self.order[positions]).tolist(), priority)
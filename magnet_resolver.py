@@ -0,0 +1,215 @@
+"""
+Magnet Resolver - Fetches magnet link metadata in the background
+"""
+
+import time
+import heapq
+import itertools
+import threading
+import libtorrent as lt
+
+# Metadata fetch priorities: magnets added one by one (someone is waiting) go first
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 1
+
+
+def torrent_summary(torrent_info):
+    """Describe metainfo for the add dialog: {'name', 'total_size', 'files': [(path, size)]}"""
+    files = torrent_info.files()
+    return {
+        'name': torrent_info.name(),
+        'total_size': torrent_info.total_size(),
+        'files': [(files.file_path(i), files.file_size(i)) for i in range(files.num_files())]
+    }
+
+
+class MagnetResolver:
+    """Downloads the info dict of magnet links that aren't added yet.
+
+    A magnet being resolved is a hidden torrent in upload mode: it joins the
+    swarm and fetches the metadata but never writes piece data, and since
+    it isn't in TorrentCore.torrent_handles it doesn't show up anywhere.
+    The core caches the metadata when metadata_received_alert arrives and
+    calls finish(), which removes the hidden torrent again. Adding the
+    magnet meanwhile adopts the torrent, peers and all.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self._resolving = {}  # hash -> handle
+        self._lock = threading.Lock()
+
+    def is_resolving(self, torrent_hash):
+        with self._lock:
+            return torrent_hash in self._resolving
+
+    def resolve(self, params, save_path):
+        """Start resolving parsed magnet params (no-op if already resolving)"""
+        torrent_hash = str(params.info_hash)
+        # Checked and added under one lock, or two callers could both add it (duplicate torrent)
+        with self._lock:
+            if torrent_hash in self._resolving:
+                return
+            params.save_path = save_path
+            params.flags = (params.flags | lt.torrent_flags.upload_mode) & \
+                ~lt.torrent_flags.paused & ~lt.torrent_flags.auto_managed
+            self._resolving[torrent_hash] = self.session.add_torrent(params)
+
+    def adopt(self, torrent_hash):
+        """Stop tracking a torrent that is being added for real, returns its handle or None"""
+        with self._lock:
+            return self._resolving.pop(torrent_hash, None)
+
+    def finish(self, torrent_hash):
+        """Remove the hidden torrent once its metadata is cached, returns False if not resolving"""
+        return self.cancel(torrent_hash)
+
+    def cancel(self, torrent_hash):
+        """Stop resolving a magnet link, returns False if it wasn't"""
+        with self._lock:
+            handle = self._resolving.pop(torrent_hash, None)
+        if handle is None:
+            return False
+        self.session.remove_torrent(handle)
+        return True
+
+    def shutdown(self):
+        with self._lock:
+            handles = list(self._resolving.values())
+            self._resolving.clear()
+        for handle in handles:
+            self.session.remove_torrent(handle)
+
+
+class MetadataQueue:
+    """Limits how many added magnet links download metadata at once.
+
+    Magnets without metadata are added paused and not auto-managed and
+    queued here. At most max_active of them run at a time (0: no limit),
+    highest priority first and oldest first within a priority. A fetch that
+    hasn't produced metadata after FETCH_TIMEOUT seconds is paused and
+    retried after an exponential backoff (BACKOFF_BASE seconds, doubling
+    up to BACKOFF_MAX). promote() turns a torrent whose metadata arrived
+    into a normal auto-managed one and starts the next magnet. tick() must
+    be called periodically to apply timeouts and backoffs.
+    """
+
+    MAX_ACTIVE = 16
+    FETCH_TIMEOUT = 90.0
+    BACKOFF_BASE = 60.0
+    BACKOFF_MAX = 1800.0
+
+    def __init__(self, max_active=MAX_ACTIVE):
+        self.max_active = max_active
+        self._entries = {}  # hash -> {'handle', 'priority', 'seq', 'attempts', 'state'}
+        self._ready = []  # heap of (-priority, seq, hash) waiting for a slot
+        self._backoff = []  # heap of (not_before, seq, hash) waiting out a retry delay
+        self._active = {}  # hash -> monotonic time the fetch started
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._counters = {'started': 0, 'resolved': 0, 'timeouts': 0}
+
+    def add(self, torrent_hash, handle, priority=PRIORITY_NORMAL):
+        """Queue a paused magnet torrent (raising the priority if it is already queued)"""
+        with self._lock:
+            entry = self._entries.get(torrent_hash)
+            if entry is None:
+                handle.unset_flags(lt.torrent_flags.auto_managed)
+                entry = {'handle': handle, 'priority': priority, 'seq': next(self._seq),
+                         'attempts': 0, 'state': 'ready'}
+                self._entries[torrent_hash] = entry
+            elif priority > entry['priority']:
+                entry['priority'] = priority
+            else:
+                return
+            if entry['state'] == 'ready':
+                heapq.heappush(self._ready, (-entry['priority'], entry['seq'], torrent_hash))
+            self._start_ready()
+
+    def remove(self, torrent_hash):
+        """Forget a magnet (paused or removed by the user), returns False if it wasn't queued"""
+        with self._lock:
+            entry = self._entries.pop(torrent_hash, None)
+            if entry is None:
+                return False
+            if self._active.pop(torrent_hash, None) is not None:
+                self._start_ready()
+            return True
+
+    def promote(self, torrent_hash):
+        """Let a torrent whose metadata arrived download normally, returns False if it wasn't queued"""
+        with self._lock:
+            entry = self._entries.pop(torrent_hash, None)
+            if entry is None:
+                return False
+            self._active.pop(torrent_hash, None)
+            self._counters['resolved'] += 1
+            handle = entry['handle']
+            handle.set_flags(lt.torrent_flags.auto_managed)
+            handle.resume()
+            self._start_ready()
+            return True
+
+    def is_queued(self, torrent_hash):
+        with self._lock:
+            return torrent_hash in self._entries
+
+    def waiting(self):
+        """Hashes of queued magnets that aren't fetching right now"""
+        with self._lock:
+            if len(self._entries) == len(self._active):
+                return set()
+            return {torrent_hash for torrent_hash in self._entries if torrent_hash not in self._active}
+
+    def set_max_active(self, max_active):
+        with self._lock:
+            self.max_active = max_active
+            self._start_ready()
+
+    def tick(self, now=None):
+        """Pause fetches that timed out and start magnets whose backoff is over"""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            for torrent_hash, started in list(self._active.items()):
+                entry = self._entries[torrent_hash]
+                if now - started < self.FETCH_TIMEOUT:
+                    continue
+                del self._active[torrent_hash]
+                entry['handle'].pause()
+                entry['attempts'] += 1
+                entry['state'] = 'backoff'
+                delay = min(self.BACKOFF_BASE * 2 ** (entry['attempts'] - 1), self.BACKOFF_MAX)
+                heapq.heappush(self._backoff, (now + delay, entry['seq'], torrent_hash))
+                self._counters['timeouts'] += 1
+
+            while self._backoff and self._backoff[0][0] <= now:
+                not_before, seq, torrent_hash = heapq.heappop(self._backoff)
+                entry = self._entries.get(torrent_hash)
+                if entry is None or entry['state'] != 'backoff':
+                    continue
+                entry['state'] = 'ready'
+                heapq.heappush(self._ready, (-entry['priority'], entry['seq'], torrent_hash))
+            self._start_ready(now)
+
+    def stats(self):
+        """Counts of queued, fetching and backed off magnets, and totals since startup"""
+        with self._lock:
+            backoff = sum(1 for entry in self._entries.values() if entry['state'] == 'backoff')
+            return dict(self._counters, queued=len(self._entries) - len(self._active) - backoff,
+                        active=len(self._active), backoff=backoff, max_active=self.max_active)
+
+    def _start_ready(self, now=None):
+        """Start waiting magnets while there are free slots (called with the lock held)"""
+        if now is None:
+            now = time.monotonic()
+        while self._ready and (self.max_active <= 0 or len(self._active) < self.max_active):
+            negative_priority, seq, torrent_hash = heapq.heappop(self._ready)
+            entry = self._entries.get(torrent_hash)
+            # Skip stale heap items (removed, started, or re-pushed with a higher priority)
+            if entry is None or entry['state'] != 'ready' or entry['priority'] != -negative_priority:
+                continue
+            entry['state'] = 'active'
+            self._active[torrent_hash] = now
+            self._counters['started'] += 1
+            entry['handle'].resume()
@@ -6,24 +6,46 @@ Main application entry point
 
 import sys
 import os
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QIcon
-from torrent_client import TorrentClient
+import signal
+import argparse
+import threading
+import multiprocessing
+
+
+def start_rpc_server(core, args):
+    """Start the JSON-RPC control API if asked for on the command line"""
+    if not (args.rpc or args.rpc_port is not None or args.rpc_socket):
+        return None
+    from rpc_server import RpcServer, DEFAULT_PORT
+    port = args.rpc_port if args.rpc_port is not None else DEFAULT_PORT
+    server = RpcServer(core, port=port, unix_path=args.rpc_socket)
+    try:
+        server.start()
+    except OSError as e:
+        print(f"Error starting RPC server: {e}")
+        return None
+    print(f"RPC server listening on {server.address()}")
+    if server.token is not None:
+        print(f"RPC clients authenticate with the token in {server.token_path}")
+    return server
+
+
+def run_gui(args):
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import Qt
+    from torrent_client import TorrentClient
 
-def main():
     # Enable high DPI scaling
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps, True)
-    
+
     app = QApplication(sys.argv)
     app.setApplicationName("PyTorrent")
     app.setApplicationVersion("1.0.0")
     app.setOrganizationName("PyTorrent")
-    
+
     # Set application icon
     try:
-        import os
         icon_path = os.path.join(os.path.dirname(__file__), 'icon.svg')
         if os.path.exists(icon_path):
             # For SVG support, we'd need to convert to pixmap
@@ -33,13 +55,91 @@ def main():
         app.setWindowIcon(app.style().standardIcon(app.style().SP_ComputerIcon))
     except Exception:
         pass  # Fallback to no icon
-    
+
     # Create and show the main window
     client = TorrentClient()
     client.show()
-    
+
+    rpc_server = start_rpc_server(client.torrent_manager.core, args)
+    if rpc_server is not None:
+        app.aboutToQuit.connect(rpc_server.stop)
+
     # Run the application
     sys.exit(app.exec_())
 
+
+def run_headless(args):
+    """Run the torrent core without Qt until SIGINT/SIGTERM"""
+    from app_settings import headless_settings, load_preferences
+    from torrent_core import TorrentCore
+
+    core = TorrentCore()
+    core.events.subscribe('error_occurred', lambda title, message: print(f"{title}: {message}"))
+    core.events.subscribe('session_restored',
+                          lambda count, seconds: print(f"Restored {count} torrents in {seconds:.1f}s"))
+    core.events.subscribe('torrent_completed',
+                          lambda torrent_hash, info: print(f"Completed: {info.get('name', torrent_hash)}"))
+    core.events.subscribe('setting_tuned',
+                          lambda entry: print(f"Tuned {entry['setting']}: {entry['old']} -> {entry['new']} "
+                                              f"({entry['reason']})"))
+
+    # Same preferences and ~/.pytorrent state as the GUI
+    preferences = load_preferences(headless_settings())
+    core.apply_session_settings(preferences['session'])
+    core.set_download_path(preferences['download_path'])
+    core.set_checkpoint_interval(preferences['resume_interval'])
+    core.set_queue_settings(preferences['queue'])
+    core.set_bandwidth_schedule(preferences['bandwidth_schedule'])
+    try:
+        core.set_performance_settings(preferences['performance'])
+    except ValueError as e:
+        print(f"Error applying performance settings: {e}")
+    core.set_watch_folder(preferences['watch_folder'], preferences['watch_polling'])
+
+    # Nobody looks at a torrent list, so poll at the slow cadence
+    core.set_window_visible(False)
+    core.start()
+    core.restore_session()
+    rpc_server = start_rpc_server(core, args)
+
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        print(f"Received signal {signum}, shutting down")
+        stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    # Wake up regularly so signal handlers run on every platform
+    while not stop.wait(1):
+        pass
+
+    if rpc_server is not None:
+        rpc_server.stop()
+    core.shutdown()
+
+
+def main():
+    # Bulk import parses in spawned worker processes, which frozen builds must handle
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="PyTorrent - A Python Qt5 Torrent Client")
+    parser.add_argument('--headless', action='store_true',
+                        help="run without a window (daemon mode), stop with SIGINT/SIGTERM")
+    parser.add_argument('--rpc', action='store_true',
+                        help="serve the JSON-RPC control API on localhost")
+    parser.add_argument('--rpc-port', type=int,
+                        help="port for the JSON-RPC control API (default: 58846)")
+    parser.add_argument('--rpc-socket', metavar='PATH',
+                        help="serve the JSON-RPC control API on a Unix socket instead")
+    # Anything else (-style, -platform...) is left for Qt
+    args, _ = parser.parse_known_args()
+
+    if args.headless:
+        run_headless(args)
+    else:
+        run_gui(args)
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
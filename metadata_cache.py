@@ -0,0 +1,104 @@
+"""
+Metadata Cache - Resolved magnet link metainfo on disk, keyed by info hash
+"""
+
+import os
+import string
+import threading
+import libtorrent as lt
+
+
+class MetadataCache:
+    """One <info hash>.torrent file per resolved magnet link.
+
+    Lets a magnet that was resolved before (in the add dialog, or added and
+    removed again) start with its metadata instead of another DHT and
+    peer round-trip. Entries are checked against their info hash when read;
+    the least recently used ones are pruned beyond MAX_ENTRIES.
+    """
+
+    MAX_ENTRIES = 5000
+    PRUNE_EVERY = 100  # Writes between directory size checks
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _path(self, torrent_hash):
+        if not torrent_hash or any(c not in string.hexdigits for c in torrent_hash):
+            raise ValueError(f"Invalid info hash: {torrent_hash}")
+        return os.path.join(self.directory, f"{torrent_hash.lower()}.torrent")
+
+    def __contains__(self, torrent_hash):
+        return os.path.exists(self._path(torrent_hash))
+
+    def get(self, torrent_hash):
+        """Get the cached torrent_info for an info hash, or None"""
+        path = self._path(torrent_hash)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            torrent_info = lt.torrent_info(lt.bdecode(data))
+            if str(torrent_info.info_hash()) != torrent_hash.lower():
+                raise ValueError("info hash mismatch")
+        except Exception as e:
+            print(f"Error reading cached metadata for {torrent_hash}: {e}")
+            self.discard(torrent_hash)
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return torrent_info
+
+    def put(self, torrent_hash, metainfo):
+        """Store bencoded metainfo (written once, atomically)"""
+        path = self._path(torrent_hash)
+        if os.path.exists(path):
+            return
+        try:
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(metainfo)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error caching metadata for {torrent_hash}: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def discard(self, torrent_hash):
+        try:
+            os.remove(self._path(torrent_hash))
+        except OSError:
+            pass
+
+    def prune(self):
+        """Remove the least recently used entries beyond MAX_ENTRIES"""
+        try:
+            with os.scandir(self.directory) as entries:
+                files = [(entry.stat().st_mtime, entry.path) for entry in entries
+                         if entry.name.endswith('.torrent')]
+        except OSError as e:
+            print(f"Error pruning metadata cache: {e}")
+            return
+        if len(files) <= self.MAX_ENTRIES:
+            return
+        files.sort()
+        for mtime, path in files[:len(files) - self.MAX_ENTRIES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,137 @@
+"""
+Performance Profiles - Named bundles of libtorrent disk and buffer settings
+"""
+
+# disk_io_read_mode / disk_io_write_mode values (settings_pack::io_buffer_mode_t)
+ENABLE_OS_CACHE = 0
+DISABLE_OS_CACHE = 2
+
+DEFAULT_PROFILE = 'desktop'
+
+# checking_mem_usage is in 16 KiB blocks, the byte sizes are in bytes
+PROFILES = {
+    'desktop': {
+        'description': "libtorrent's defaults: a few disk threads, modest buffers",
+        'settings': {
+            'aio_threads': 10,
+            'hashing_threads': 1,
+            'max_queued_disk_bytes': 1024 * 1024,
+            'send_buffer_watermark': 500 * 1024,
+            'send_buffer_low_watermark': 10 * 1024,
+            'send_buffer_watermark_factor': 50,
+            'checking_mem_usage': 256,
+            'file_pool_size': 40,
+            'disk_io_read_mode': ENABLE_OS_CACHE,
+            'disk_io_write_mode': ENABLE_OS_CACHE,
+        }
+    },
+    'seedbox-hdd': {
+        'description': "Many torrents on spinning disks: few threads to limit seeking, deep queues and buffers",
+        'settings': {
+            'aio_threads': 4,
+            'hashing_threads': 2,
+            'max_queued_disk_bytes': 8 * 1024 * 1024,
+            'send_buffer_watermark': 3 * 1024 * 1024,
+            'send_buffer_low_watermark': 256 * 1024,
+            'send_buffer_watermark_factor': 150,
+            'checking_mem_usage': 1024,
+            'file_pool_size': 500,
+            'disk_io_read_mode': ENABLE_OS_CACHE,
+            'disk_io_write_mode': ENABLE_OS_CACHE,
+        }
+    },
+    'seedbox-nvme': {
+        'description': "Many torrents on NVMe: many parallel disk and hashing threads, large buffers",
+        'settings': {
+            'aio_threads': 32,
+            'hashing_threads': 8,
+            'max_queued_disk_bytes': 32 * 1024 * 1024,
+            'send_buffer_watermark': 8 * 1024 * 1024,
+            'send_buffer_low_watermark': 512 * 1024,
+            'send_buffer_watermark_factor': 150,
+            'checking_mem_usage': 2048,
+            'file_pool_size': 1000,
+            'disk_io_read_mode': ENABLE_OS_CACHE,
+            'disk_io_write_mode': ENABLE_OS_CACHE,
+        }
+    },
+    'low-memory': {
+        'description': "Small devices: minimal threads, buffers and open files",
+        'settings': {
+            'aio_threads': 2,
+            'hashing_threads': 1,
+            'max_queued_disk_bytes': 256 * 1024,
+            'send_buffer_watermark': 128 * 1024,
+            'send_buffer_low_watermark': 8 * 1024,
+            'send_buffer_watermark_factor': 50,
+            'checking_mem_usage': 32,
+            'file_pool_size': 10,
+            'disk_io_read_mode': ENABLE_OS_CACHE,
+            'disk_io_write_mode': ENABLE_OS_CACHE,
+        }
+    },
+}
+
+# Set from their own preferences; raw overrides must not fight them
+MANAGED_SETTINGS = {
+    'listen_interfaces', 'enable_dht', 'enable_lsd', 'enable_upnp', 'enable_natpmp',
+    'connections_limit', 'unchoke_slots_limit', 'download_rate_limit', 'upload_rate_limit',
+    'active_downloads', 'active_seeds', 'active_checking', 'active_limit', 'alert_mask'
+}
+
+
+def parse_overrides(text):
+    """Parse 'name = value' lines (# starts a comment) into {name: value string}"""
+    overrides = {}
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        name, sep, value = line.partition('=')
+        name, value = name.strip(), value.strip()
+        if not sep or not name or not value:
+            raise ValueError(f"Line {number}: expected 'name = value': {line}")
+        overrides[name] = value
+    return overrides
+
+
+def format_overrides(overrides):
+    """Turn {name: value} back into 'name = value' lines"""
+    return '\n'.join(f"{name} = {value}" for name, value in sorted(overrides.items()))
+
+
+def convert_overrides(overrides, current):
+    """Check overrides against the session's settings and give them its types.
+
+    current is the session's settings dict (every known name with a value
+    of the right type). Raises ValueError for unknown or managed settings
+    and values that don't convert.
+    """
+    converted = {}
+    for name, value in overrides.items():
+        if name in MANAGED_SETTINGS:
+            raise ValueError(f"{name} is set from its own preference")
+        if name not in current:
+            raise ValueError(f"Unknown setting: {name}")
+        kind = type(current[name])
+        if kind is bool:
+            if str(value).lower() not in ('true', 'false', '1', '0'):
+                raise ValueError(f"{name} must be true or false: {value}")
+            converted[name] = str(value).lower() in ('true', '1')
+        elif kind is int:
+            try:
+                converted[name] = int(value)
+            except ValueError:
+                raise ValueError(f"{name} must be an integer: {value}") from None
+        else:
+            converted[name] = str(value)
+    return converted
+
+
+def profile_settings(name, overrides=None):
+    """The settings of a profile with overrides on top"""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown performance profile: {name}")
+    settings = dict(PROFILES[name]['settings'])
+    settings.update(overrides or {})
+    return settings
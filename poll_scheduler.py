@@ -0,0 +1,85 @@
+"""
+Poll Scheduler - Adaptive status polling cadence
+"""
+
+# Polling intervals in milliseconds
+FAST_INTERVAL_MS = 250  # A torrent is checking or fetching metadata
+NORMAL_INTERVAL_MS = 1000  # Transfers are running
+IDLE_INTERVAL_MS = 5000  # Everything is paused, or seeding with no traffic
+HIDDEN_INTERVAL_MS = 10000  # Window hidden, only the tray tooltip needs totals
+
+# States whose progress moves quickly and is worth watching closely. 'Queued'
+# (held back by the download queue, or a magnet waiting for a metadata slot)
+# is not one of them: it can last for hours
+FAST_STATES = frozenset(['Checking queued', 'Checking', 'Downloading metadata', 'Allocating',
+                         'Checking resume data'])
+
+INTERVALS = {
+    'fast': FAST_INTERVAL_MS,
+    'normal': NORMAL_INTERVAL_MS,
+    'idle': IDLE_INTERVAL_MS,
+    'hidden': HIDDEN_INTERVAL_MS,
+    'fixed': NORMAL_INTERVAL_MS
+}
+
+
+class PollScheduler:
+    """Picks the status polling interval from what the torrents are doing.
+
+    Polls fast while something is checking or fetching metadata, at the
+    normal rate while data is moving, and slowly when everything is idle or
+    the window is hidden. It also keeps the cost of recent ticks so the
+    effect on idle CPU use can be checked.
+    """
+
+    def __init__(self, adaptive=True):
+        self.adaptive = adaptive
+        self.visible = True
+        self.mode = 'normal'
+        self.interval_ms = NORMAL_INTERVAL_MS
+        self.ticks = 0
+        self.last_tick_ms = 0.0
+        self.average_tick_ms = 0.0  # Exponential moving average
+        self.total_tick_ms = 0.0
+
+    def choose(self, state_counts, totals):
+        """Pick the mode from the per-state counts and total rates; returns True if the interval changed"""
+        if not self.adaptive:
+            mode = 'fixed'
+        elif not self.visible:
+            mode = 'hidden'
+        elif any(state_counts.get(state) for state in FAST_STATES):
+            mode = 'fast'
+        elif state_counts.get('Downloading') or totals['download_rate'] or totals['upload_rate']:
+            mode = 'normal'
+        else:
+            mode = 'idle'
+
+        self.mode = mode
+        interval_ms = INTERVALS[mode]
+        if interval_ms == self.interval_ms:
+            return False
+        self.interval_ms = interval_ms
+        return True
+
+    def record_tick(self, seconds):
+        """Record the time spent processing one status update"""
+        tick_ms = seconds * 1000
+        self.ticks += 1
+        self.last_tick_ms = tick_ms
+        if self.ticks == 1:
+            self.average_tick_ms = tick_ms
+        else:
+            self.average_tick_ms = 0.9 * self.average_tick_ms + 0.1 * tick_ms
+        self.total_tick_ms += tick_ms
+
+    def stats(self):
+        """Get the current cadence and tick cost"""
+        return {
+            'mode': self.mode,
+            'interval_ms': self.interval_ms,
+            'ticks': self.ticks,
+            'last_tick_ms': self.last_tick_ms,
+            'average_tick_ms': self.average_tick_ms,
+            'total_tick_ms': self.total_tick_ms
+        }
@@ -6,20 +6,77 @@ import os
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTabWidget,
                              QWidget, QLabel, QLineEdit, QPushButton, QSpinBox,
                              QCheckBox, QFormLayout, QGroupBox, QFileDialog,
-                             QDialogButtonBox, QSlider, QComboBox)
+                             QDialogButtonBox, QSlider, QComboBox, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QAbstractItemView,
+                             QPlainTextEdit, QMessageBox)
 from PyQt5.QtCore import Qt, QSettings
+from PyQt5.QtGui import QColor
 
-class PreferencesDialog(QDialog):
+from bandwidth_scheduler import (NORMAL, ALTERNATIVE, UNLIMITED, SLOTS_PER_DAY,
+                                 parse_schedule, format_schedule, DEFAULT_SCHEDULE)
+from performance_profiles import (PROFILES, DEFAULT_PROFILE, MANAGED_SETTINGS, profile_settings,
+                                  parse_overrides)
+
+# Cell colors of the bandwidth schedule grid
+SCHEDULE_COLORS = {
+    NORMAL: QColor(255, 255, 255),
+    ALTERNATIVE: QColor(255, 200, 120),
+    UNLIMITED: QColor(150, 220, 150)
+}
+
+
+class ScheduleGrid(QTableWidget):
+    """One cell per hour of the week, each normal, alternative or unlimited"""
+    
+    DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    
     def __init__(self, parent=None):
+        super().__init__(len(self.DAYS), SLOTS_PER_DAY, parent)
+        self.setVerticalHeaderLabels(self.DAYS)
+        self.setHorizontalHeaderLabels([str(hour) for hour in range(SLOTS_PER_DAY)])
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.horizontalHeader().setMinimumSectionSize(14)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        for row in range(len(self.DAYS)):
+            for column in range(SLOTS_PER_DAY):
+                self.setItem(row, column, QTableWidgetItem())
+        self.set_schedule(DEFAULT_SCHEDULE)
+        
+    def set_schedule(self, schedule):
+        """Show a stored schedule string"""
+        for slot, mode in enumerate(parse_schedule(schedule)):
+            self.set_slot(slot // SLOTS_PER_DAY, slot % SLOTS_PER_DAY, mode)
+            
+    def set_slot(self, row, column, mode):
+        item = self.item(row, column)
+        item.setData(Qt.UserRole, mode)
+        item.setBackground(SCHEDULE_COLORS[mode])
+        item.setToolTip(f"{self.DAYS[row]} {column:02d}:00-{column + 1:02d}:00: {mode}")
+        
+    def set_selected(self, mode):
+        """Give the selected hours a mode"""
+        for item in self.selectedItems():
+            self.set_slot(item.row(), item.column(), mode)
+        self.clearSelection()
+        
+    def schedule(self):
+        """The schedule as a stored schedule string"""
+        return format_schedule([self.item(slot // SLOTS_PER_DAY, slot % SLOTS_PER_DAY).data(Qt.UserRole)
+                                for slot in range(len(self.DAYS) * SLOTS_PER_DAY)])
+
+class PreferencesDialog(QDialog):
+    def __init__(self, parent=None, performance=None):
         super().__init__(parent)
         self.settings = QSettings("PyTorrent", "PyTorrent")
+        self.performance = performance or {}  # Active profile and settings in effect, from the core
         self.init_ui()
         self.load_settings()
         
     def init_ui(self):
         self.setWindowTitle("Preferences")
         self.setModal(True)
-        self.resize(500, 400)
+        self.resize(600, 500)
         
         layout = QVBoxLayout(self)
         
@@ -39,6 +96,9 @@ class PreferencesDialog(QDialog):
         # Bandwidth tab
         self.create_bandwidth_tab(tab_widget)
         
+        # Performance tab
+        self.create_performance_tab(tab_widget)
+        
         # Dialog buttons
         button_box = QDialogButtonBox(
             QDialogButtonBox.Ok | QDialogButtonBox.Cancel | QDialogButtonBox.Apply
@@ -100,11 +160,30 @@ class PreferencesDialog(QDialog):
         
         directory_layout.addRow("Default location:", path_layout)
         
+        layout.addWidget(directory_group)
+        
+        # Queueing group
+        queue_group = QGroupBox("Queueing")
+        queue_layout = QFormLayout(queue_group)
+        
         # Auto-management
         self.auto_manage_cb = QCheckBox("Automatically manage torrents")
-        directory_layout.addRow(self.auto_manage_cb)
+        self.auto_manage_cb.setToolTip("Only run a few torrents at once, the rest wait in the queue")
+        queue_layout.addRow(self.auto_manage_cb)
         
-        layout.addWidget(directory_group)
+        self.active_downloads_spin = self.create_queue_limit_spin()
+        self.active_seeds_spin = self.create_queue_limit_spin()
+        self.active_checking_spin = self.create_queue_limit_spin()
+        self.active_limit_spin = self.create_queue_limit_spin()
+        
+        queue_layout.addRow("Maximum active downloads:", self.active_downloads_spin)
+        queue_layout.addRow("Maximum active seeds:", self.active_seeds_spin)
+        queue_layout.addRow("Maximum checking at once:", self.active_checking_spin)
+        queue_layout.addRow("Maximum active torrents:", self.active_limit_spin)
+        
+        self.auto_manage_cb.toggled.connect(self.update_queue_limits_enabled)
+        
+        layout.addWidget(queue_group)
         
         # Completion group
         completion_group = QGroupBox("When Download Completes")
@@ -128,9 +207,59 @@ class PreferencesDialog(QDialog):
         
         layout.addWidget(completion_group)
         
+        # Resume data group
+        resume_group = QGroupBox("Resume Data")
+        resume_layout = QFormLayout(resume_group)
+        
+        self.resume_interval_spin = QSpinBox()
+        self.resume_interval_spin.setRange(1, 120)
+        self.resume_interval_spin.setValue(5)
+        self.resume_interval_spin.setSuffix(" min")
+        
+        resume_layout.addRow("Save resume data every:", self.resume_interval_spin)
+        
+        layout.addWidget(resume_group)
+        
+        # Watch folder group
+        watch_group = QGroupBox("Watch Folder")
+        watch_layout = QFormLayout(watch_group)
+        
+        self.watch_enabled_cb = QCheckBox("Automatically add .torrent and .magnet files from:")
+        
+        watch_path_layout = QHBoxLayout()
+        self.watch_path_edit = QLineEdit()
+        watch_browse_btn = QPushButton("Browse...")
+        watch_browse_btn.clicked.connect(self.browse_watch_path)
+        
+        watch_path_layout.addWidget(self.watch_path_edit)
+        watch_path_layout.addWidget(watch_browse_btn)
+        
+        self.watch_polling_cb = QCheckBox("Poll for new files (for network shares)")
+        watch_note = QLabel("Added files are moved to its done folder, unreadable ones to failed.")
+        watch_note.setWordWrap(True)
+        
+        watch_layout.addRow(self.watch_enabled_cb)
+        watch_layout.addRow("", watch_path_layout)
+        watch_layout.addRow(self.watch_polling_cb)
+        watch_layout.addRow(watch_note)
+        
+        layout.addWidget(watch_group)
+        
         layout.addStretch()
         tab_widget.addTab(widget, "Downloads")
         
+    def create_queue_limit_spin(self):
+        """Spin box for a queue limit, where -1 is unlimited"""
+        spin = QSpinBox()
+        spin.setRange(-1, 10000)
+        spin.setSpecialValueText("Unlimited")
+        return spin
+        
+    def update_queue_limits_enabled(self, enabled):
+        """Queue limits only apply while torrents are automatically managed"""
+        for spin in [self.active_downloads_spin, self.active_seeds_spin, self.active_limit_spin]:
+            spin.setEnabled(enabled)
+            
     def create_connection_tab(self, tab_widget):
         """Create connection settings tab"""
         widget = QWidget()
@@ -180,6 +309,12 @@ class PreferencesDialog(QDialog):
         connections_layout.addRow("Maximum connections:", self.max_connections_spin)
         connections_layout.addRow("Maximum uploads:", self.max_uploads_spin)
         
+        # The limits above become starting points for the auto-tuner
+        self.auto_tune_cb = QCheckBox("Tune connections and request queues automatically")
+        self.auto_tune_cb.setToolTip("Adjusts connection limits, connection speed, request queue depth and "
+                                     "unchoking from measured throughput, timeouts and disk backlog")
+        connections_layout.addRow(self.auto_tune_cb)
+        
         layout.addWidget(connections_group)
         
         layout.addStretch()
@@ -219,6 +354,10 @@ class PreferencesDialog(QDialog):
         global_layout.addRow(self.upload_limit_cb)
         global_layout.addRow("", upload_layout)
         
+        # LAN and loopback peers are in their own peer class
+        self.lan_unthrottled_cb = QCheckBox("Don't apply rate limits to LAN peers")
+        global_layout.addRow(self.lan_unthrottled_cb)
+        
         layout.addWidget(global_group)
         
         # Alternative rate limits group
@@ -253,6 +392,30 @@ class PreferencesDialog(QDialog):
         
         layout.addWidget(alt_group)
         
+        # Weekly schedule group
+        schedule_group = QGroupBox("Schedule")
+        schedule_layout = QVBoxLayout(schedule_group)
+        
+        self.schedule_enabled_cb = QCheckBox("Switch rate limits on a weekly schedule")
+        schedule_layout.addWidget(self.schedule_enabled_cb)
+        
+        self.schedule_grid = ScheduleGrid()
+        schedule_layout.addWidget(self.schedule_grid)
+        
+        # Set the selected hours to a mode; the buttons double as the legend
+        schedule_buttons_layout = QHBoxLayout()
+        for label, mode in [("Normal", NORMAL), ("Alternative", ALTERNATIVE), ("Unlimited", UNLIMITED)]:
+            mode_btn = QPushButton(label)
+            mode_btn.setStyleSheet(f"background-color: {SCHEDULE_COLORS[mode].name()};")
+            mode_btn.clicked.connect(lambda checked, mode=mode: self.schedule_grid.set_selected(mode))
+            schedule_buttons_layout.addWidget(mode_btn)
+        schedule_buttons_layout.addStretch()
+        schedule_layout.addLayout(schedule_buttons_layout)
+        
+        self.schedule_enabled_cb.toggled.connect(self.schedule_grid.setEnabled)
+        
+        layout.addWidget(schedule_group)
+        
         layout.addStretch()
         tab_widget.addTab(widget, "Bandwidth")
         
@@ -272,6 +435,83 @@ class PreferencesDialog(QDialog):
         if path:
             self.completed_path_edit.setText(path)
             
+    def browse_watch_path(self):
+        """Browse for the watch folder"""
+        path = QFileDialog.getExistingDirectory(
+            self, "Select Watch Folder", self.watch_path_edit.text()
+        )
+        if path:
+            self.watch_path_edit.setText(path)
+            
+    def create_performance_tab(self, tab_widget):
+        """Create disk and buffer performance settings tab"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        
+        # Profile group
+        profile_group = QGroupBox("Profile")
+        profile_layout = QFormLayout(profile_group)
+        
+        self.profile_combo = QComboBox()
+        for name in PROFILES:
+            self.profile_combo.addItem(name, name)
+        self.profile_combo.currentIndexChanged.connect(self.update_performance_view)
+        
+        self.profile_description = QLabel()
+        self.profile_description.setWordWrap(True)
+        
+        active = self.performance.get('profile')
+        self.active_profile_label = QLabel(f"Active: {active}" if active else "Active: unknown")
+        
+        profile_layout.addRow("Profile:", self.profile_combo)
+        profile_layout.addRow("", self.profile_description)
+        profile_layout.addRow("", self.active_profile_label)
+        
+        layout.addWidget(profile_group)
+        
+        # Raw settings group
+        advanced_group = QGroupBox("Advanced: libtorrent settings on top of the profile")
+        advanced_layout = QVBoxLayout(advanced_group)
+        
+        self.overrides_edit = QPlainTextEdit()
+        self.overrides_edit.setPlaceholderText("name = value, one per line (e.g. aio_threads = 16)")
+        self.overrides_edit.setMaximumHeight(80)
+        self.overrides_edit.textChanged.connect(self.update_performance_view)
+        advanced_layout.addWidget(self.overrides_edit)
+        
+        layout.addWidget(advanced_group)
+        
+        # Settings of the chosen profile next to those in effect now
+        self.performance_table = QTableWidget(0, 3)
+        self.performance_table.setHorizontalHeaderLabels(["Setting", "Profile", "In effect"])
+        self.performance_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.performance_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.performance_table.verticalHeader().setVisible(False)
+        layout.addWidget(self.performance_table)
+        
+        tab_widget.addTab(widget, "Performance")
+        
+    def update_performance_view(self):
+        """Show the chosen profile with the overrides typed so far"""
+        name = self.profile_combo.currentData()
+        if name is None:
+            return
+        self.profile_description.setText(PROFILES[name]['description'])
+        try:
+            overrides = parse_overrides(self.overrides_edit.toPlainText())
+        except ValueError:
+            overrides = {}
+        chosen = profile_settings(name, overrides)
+        effective = self.performance.get('effective', {})
+        
+        names = sorted(set(chosen) | set(effective))
+        self.performance_table.setRowCount(len(names))
+        for row, setting in enumerate(names):
+            in_effect = effective.get(setting)
+            self.performance_table.setItem(row, 0, QTableWidgetItem(setting))
+            self.performance_table.setItem(row, 1, QTableWidgetItem(str(chosen.get(setting, ""))))
+            self.performance_table.setItem(row, 2, QTableWidgetItem("" if in_effect is None else str(in_effect)))
+            
     def load_settings(self):
         """Load settings from QSettings"""
         # General settings
@@ -296,6 +536,19 @@ class PreferencesDialog(QDialog):
         self.auto_manage_cb.setChecked(
             self.settings.value("downloads/auto_manage", True, type=bool)
         )
+        self.active_downloads_spin.setValue(
+            self.settings.value("queue/active_downloads", 3, type=int)
+        )
+        self.active_seeds_spin.setValue(
+            self.settings.value("queue/active_seeds", 5, type=int)
+        )
+        self.active_checking_spin.setValue(
+            self.settings.value("queue/active_checking", 1, type=int)
+        )
+        self.active_limit_spin.setValue(
+            self.settings.value("queue/active_limit", 15, type=int)
+        )
+        self.update_queue_limits_enabled(self.auto_manage_cb.isChecked())
         self.seed_when_complete_cb.setChecked(
             self.settings.value("downloads/seed_when_complete", True, type=bool)
         )
@@ -305,6 +558,18 @@ class PreferencesDialog(QDialog):
         self.completed_path_edit.setText(
             self.settings.value("downloads/completed_path", default_path)
         )
+        self.resume_interval_spin.setValue(
+            self.settings.value("downloads/resume_interval", 5, type=int)
+        )
+        self.watch_enabled_cb.setChecked(
+            self.settings.value("downloads/watch_enabled", False, type=bool)
+        )
+        self.watch_path_edit.setText(
+            self.settings.value("downloads/watch_path", os.path.join(default_path, 'Watch'))
+        )
+        self.watch_polling_cb.setChecked(
+            self.settings.value("downloads/watch_polling", False, type=bool)
+        )
         
         # Connection settings
         self.port_spin.setValue(
@@ -328,6 +593,9 @@ class PreferencesDialog(QDialog):
         self.max_uploads_spin.setValue(
             self.settings.value("connection/max_uploads", 4, type=int)
         )
+        self.auto_tune_cb.setChecked(
+            self.settings.value("connection/auto_tune", False, type=bool)
+        )
         
         # Bandwidth settings
         self.download_limit_cb.setChecked(
@@ -342,6 +610,9 @@ class PreferencesDialog(QDialog):
         self.upload_limit_spin.setValue(
             self.settings.value("bandwidth/upload_limit", 100, type=int)
         )
+        self.lan_unthrottled_cb.setChecked(
+            self.settings.value("bandwidth/lan_unthrottled", True, type=bool)
+        )
         self.alt_limits_cb.setChecked(
             self.settings.value("bandwidth/alt_limits", False, type=bool)
         )
@@ -351,6 +622,23 @@ class PreferencesDialog(QDialog):
         self.alt_upload_spin.setValue(
             self.settings.value("bandwidth/alt_upload", 50, type=int)
         )
+        self.schedule_enabled_cb.setChecked(
+            self.settings.value("bandwidth/schedule_enabled", False, type=bool)
+        )
+        self.schedule_grid.setEnabled(self.schedule_enabled_cb.isChecked())
+        self.schedule_grid.set_schedule(
+            self.settings.value("bandwidth/schedule", DEFAULT_SCHEDULE)
+        )
+        
+        # Performance settings
+        profile_index = self.profile_combo.findData(
+            self.settings.value("performance/profile", DEFAULT_PROFILE)
+        )
+        self.profile_combo.setCurrentIndex(max(profile_index, 0))
+        self.overrides_edit.setPlainText(
+            self.settings.value("performance/overrides", "")
+        )
+        self.update_performance_view()
         
     def save_settings(self):
         """Save settings to QSettings"""
@@ -363,9 +651,17 @@ class PreferencesDialog(QDialog):
         # Download settings
         self.settings.setValue("downloads/default_path", self.download_path_edit.text())
         self.settings.setValue("downloads/auto_manage", self.auto_manage_cb.isChecked())
+        self.settings.setValue("queue/active_downloads", self.active_downloads_spin.value())
+        self.settings.setValue("queue/active_seeds", self.active_seeds_spin.value())
+        self.settings.setValue("queue/active_checking", self.active_checking_spin.value())
+        self.settings.setValue("queue/active_limit", self.active_limit_spin.value())
         self.settings.setValue("downloads/seed_when_complete", self.seed_when_complete_cb.isChecked())
         self.settings.setValue("downloads/move_completed", self.move_completed_cb.isChecked())
         self.settings.setValue("downloads/completed_path", self.completed_path_edit.text())
+        self.settings.setValue("downloads/resume_interval", self.resume_interval_spin.value())
+        self.settings.setValue("downloads/watch_enabled", self.watch_enabled_cb.isChecked())
+        self.settings.setValue("downloads/watch_path", self.watch_path_edit.text())
+        self.settings.setValue("downloads/watch_polling", self.watch_polling_cb.isChecked())
         
         # Connection settings
         self.settings.setValue("connection/port", self.port_spin.value())
@@ -375,21 +671,46 @@ class PreferencesDialog(QDialog):
         self.settings.setValue("connection/enable_lsd", self.enable_lsd_cb.isChecked())
         self.settings.setValue("connection/max_connections", self.max_connections_spin.value())
         self.settings.setValue("connection/max_uploads", self.max_uploads_spin.value())
+        self.settings.setValue("connection/auto_tune", self.auto_tune_cb.isChecked())
         
         # Bandwidth settings
         self.settings.setValue("bandwidth/limit_download", self.download_limit_cb.isChecked())
         self.settings.setValue("bandwidth/download_limit", self.download_limit_spin.value())
         self.settings.setValue("bandwidth/limit_upload", self.upload_limit_cb.isChecked())
         self.settings.setValue("bandwidth/upload_limit", self.upload_limit_spin.value())
+        self.settings.setValue("bandwidth/lan_unthrottled", self.lan_unthrottled_cb.isChecked())
         self.settings.setValue("bandwidth/alt_limits", self.alt_limits_cb.isChecked())
         self.settings.setValue("bandwidth/alt_download", self.alt_download_spin.value())
         self.settings.setValue("bandwidth/alt_upload", self.alt_upload_spin.value())
+        self.settings.setValue("bandwidth/schedule_enabled", self.schedule_enabled_cb.isChecked())
+        self.settings.setValue("bandwidth/schedule", self.schedule_grid.schedule())
+        
+        # Performance settings
+        self.settings.setValue("performance/profile", self.profile_combo.currentData())
+        self.settings.setValue("performance/overrides", self.overrides_edit.toPlainText())
+        
+    def validate_overrides(self):
+        """Check the raw settings can be parsed, telling the user if not"""
+        try:
+            overrides = parse_overrides(self.overrides_edit.toPlainText())
+        except ValueError as e:
+            QMessageBox.warning(self, "Performance Settings", str(e))
+            return False
+        managed = sorted(MANAGED_SETTINGS.intersection(overrides))
+        if managed:
+            QMessageBox.warning(self, "Performance Settings",
+                                f"Set these from their own preferences instead: {', '.join(managed)}")
+            return False
+        return True
         
     def apply_settings(self):
         """Apply settings without closing dialog"""
-        self.save_settings()
+        if self.validate_overrides():
+            self.save_settings()
         
     def accept(self):
         """Accept dialog and save settings"""
+        if not self.validate_overrides():
+            return
         self.save_settings()
         super().accept() 
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Queue Manager - Active torrent limits and queue positions on libtorrent's auto-manager
+"""
+
+import threading
+import libtorrent as lt
+
+# libtorrent's own defaults; -1 is unlimited
+DEFAULT_LIMITS = {
+    'active_downloads': 3,
+    'active_seeds': 5,
+    'active_checking': 1,
+    'active_limit': 15
+}
+
+QUEUE_MOVES = ('top', 'up', 'down', 'bottom')
+
+
+class QueueManager:
+    """Decides how many torrents run at once.
+
+    Torrents are added auto-managed: libtorrent starts them in queue
+    position order while there are free slots (active_downloads,
+    active_seeds, active_limit; active_checking for hash checks) and pauses
+    the rest, so a few downloads get the disk and connection slots instead
+    of hundreds competing for them. A torrent the user pauses stops being
+    auto-managed, so the queue leaves it alone. With queueing disabled
+    every limit except checking is lifted and all torrents run.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.enabled = True
+        self.limits = dict(DEFAULT_LIMITS)
+        self._lock = threading.Lock()
+
+    def configure(self, enabled=None, limits=None):
+        """Change whether queueing is on and/or its limits, and apply them"""
+        with self._lock:
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            for name, value in (limits or {}).items():
+                if name not in DEFAULT_LIMITS:
+                    raise ValueError(f"Unknown queue limit: {name}")
+                value = int(value)
+                if value < -1:
+                    raise ValueError(f"Queue limit {name} must be -1 (unlimited) or more: {value}")
+                self.limits[name] = value
+            settings = self._effective_settings()
+        self._apply(settings)
+
+    def _effective_settings(self):
+        settings = dict(self.limits)
+        if not self.enabled:
+            for name in ('active_downloads', 'active_seeds', 'active_limit'):
+                settings[name] = -1
+        return settings
+
+    def _apply(self, settings):
+        """Push only the queue settings, nothing else in the session changes"""
+        try:
+            pack = lt.settings_pack()
+            for name, value in settings.items():
+                pack[name] = value
+            self.session.apply_settings(pack)
+        except AttributeError:
+            # libtorrent 1.x
+            self.session.apply_settings(settings)
+
+    def settings(self):
+        """The configured limits, whether queueing is on and what libtorrent got"""
+        with self._lock:
+            return dict(self.limits, enabled=self.enabled, effective=self._effective_settings())
+
+    def move(self, handles, direction):
+        """Move torrents in the queue, keeping their order relative to each other.
+
+        direction is 'top', 'up', 'down' or 'bottom'. Finished torrents
+        have no queue position and are skipped.
+        """
+        if direction not in QUEUE_MOVES:
+            raise ValueError(f"Unknown queue move: {direction}")
+
+        positioned = []
+        for handle in handles:
+            position = int(handle.queue_position())
+            if position >= 0:
+                positioned.append((position, handle))
+        # Moving toward the top, the torrent nearest to it goes first (to the
+        # top, the farthest, so the nearest ends up first); vice versa for down
+        positioned.sort(key=lambda item: item[0], reverse=direction in ('top', 'down'))
+
+        for position, handle in positioned:
+            if direction == 'top':
+                handle.queue_position_top()
+            elif direction == 'up':
+                handle.queue_position_up()
+            elif direction == 'down':
+                handle.queue_position_down()
+            else:
+                handle.queue_position_bottom()
+        return len(positioned)
@@ -0,0 +1,226 @@
+"""
+Resume Checkpointer - Asynchronous, alert-driven resume data persistence
+"""
+
+import time
+import queue
+import threading
+import libtorrent as lt
+
+
+def resume_data_bytes(alert):
+    """Get bencoded resume data from a save_resume_data_alert"""
+    if hasattr(lt, 'write_resume_data_buf'):
+        return lt.write_resume_data_buf(alert.params)
+    return lt.bencode(alert.resume_data)
+
+
+def metainfo_bytes(torrent_info):
+    """Get a bencoded .torrent file from a torrent_info"""
+    return lt.bencode(lt.create_torrent(torrent_info).generate())
+
+
+class ResumeCheckpointer:
+    """Saves resume data in the background on a periodic schedule.
+
+    Checkpoints only request resume data for torrents that need it, count
+    the outstanding save_resume_data alerts instead of sleeping, and hand
+    the results to a writer thread that commits them to the session store
+    in batched transactions. Calls to request_checkpoint() made in quick
+    succession (e.g. adding 200 torrents) are coalesced into one.
+    """
+
+    # Maximum number of queued writes committed in one transaction
+    WRITE_BATCH_SIZE = 500
+
+    def __init__(self, store, snapshot, interval=300, debounce=2.0, on_error=None):
+        self.store = store
+        self.snapshot = snapshot  # callable -> [(hash, handle, info, magnet_link)]
+        self.interval = interval
+        self.debounce = debounce
+        self.on_error = on_error
+
+        self._cond = threading.Condition()
+        # One checkpoint at a time (scheduler and flush()), and discard() waits for it,
+        # so a removed torrent's delete is always queued after any write of its row
+        self._checkpoint_lock = threading.Lock()
+        self._pending = False  # A coalesced checkpoint has been requested
+        self._due = 0.0
+        self._next_periodic = time.monotonic() + interval
+        self._forced = set()  # Hashes saved even if libtorrent doesn't flag them
+        self._outstanding = 0  # Resume data requests without an alert yet
+        self._stopping = False
+        self._stored = {}  # hash -> (name, save_path) already in the store
+        self._has_metainfo = set()  # Hashes whose metainfo is already stored
+
+        self._write_queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='ResumeWriter', daemon=True)
+        self._scheduler = threading.Thread(target=self._schedule_loop, name='ResumeCheckpointer', daemon=True)
+
+    def mark_stored(self, records):
+        """Remember torrents that were loaded from the store"""
+        with self._cond:
+            for record in records:
+                self._stored[record['hash']] = (record['name'], record['save_path'])
+                if record['metainfo']:
+                    self._has_metainfo.add(record['hash'])
+
+    def start(self):
+        self._writer.start()
+        self._scheduler.start()
+
+    def set_interval(self, interval):
+        """Change the periodic checkpoint interval (seconds)"""
+        with self._cond:
+            self.interval = interval
+            self._next_periodic = time.monotonic() + interval
+            self._cond.notify()
+
+    def request_checkpoint(self, torrent_hash=None):
+        """Schedule a checkpoint soon, coalescing with other requests"""
+        self.request_checkpoints([torrent_hash] if torrent_hash is not None else [])
+
+    def request_checkpoints(self, torrent_hashes):
+        """Schedule one checkpoint that saves resume data for all of torrent_hashes"""
+        with self._cond:
+            self._forced.update(torrent_hashes)
+            if not self._pending:
+                self._pending = True
+                self._due = time.monotonic() + self.debounce
+                self._cond.notify()
+
+    def discard(self, torrent_hashes):
+        """Forget removed torrents and delete their records in one write"""
+        with self._checkpoint_lock:
+            with self._cond:
+                for torrent_hash in torrent_hashes:
+                    self._forced.discard(torrent_hash)
+                    self._stored.pop(torrent_hash, None)
+                    self._has_metainfo.discard(torrent_hash)
+            self._write_queue.put(('delete', list(torrent_hashes)))
+
+    def checkpoint(self, flags=0):
+        """Store new or changed torrents and request resume data where needed"""
+        with self._checkpoint_lock:
+            with self._cond:
+                forced = self._forced
+                self._forced = set()
+
+            for torrent_hash, handle, info, magnet_link in self.snapshot():
+                if not handle.is_valid():
+                    continue
+
+                try:
+                    # Only write torrent rows that are new or changed
+                    name = info.get('name', 'Unknown')
+                    save_path = info.get('save_path') or handle.save_path()
+                    with self._cond:
+                        stored = self._stored.get(torrent_hash)
+                        has_metainfo = torrent_hash in self._has_metainfo
+                    if stored != (name, save_path):
+                        self._write_queue.put(('torrent', torrent_hash, name, save_path, magnet_link))
+                        with self._cond:
+                            self._stored[torrent_hash] = (name, save_path)
+
+                    # Metainfo never changes, only write it once
+                    if not has_metainfo and handle.has_metadata():
+                        self._write_queue.put(('metainfo', torrent_hash, metainfo_bytes(handle.torrent_file())))
+                        with self._cond:
+                            self._has_metainfo.add(torrent_hash)
+
+                    if torrent_hash in forced or handle.need_save_resume_data():
+                        with self._cond:
+                            self._outstanding += 1
+                        handle.save_resume_data(flags)
+
+                except Exception as e:
+                    print(f"Error saving resume data for {torrent_hash}: {e}")
+                    continue
+
+    def on_save_resume_data(self, alert):
+        """Handle save_resume_data_alert (called on the alert dispatcher thread)"""
+        try:
+            torrent_hash = str(alert.handle.info_hash())
+            self._write_queue.put(('resume', torrent_hash, resume_data_bytes(alert)))
+        finally:
+            self._response_received()
+
+    def on_save_resume_data_failed(self, alert):
+        """Handle save_resume_data_failed_alert"""
+        self._response_received()
+
+    def _response_received(self):
+        with self._cond:
+            self._outstanding = max(0, self._outstanding - 1)
+            self._cond.notify_all()
+
+    def flush(self, timeout=10.0):
+        """Checkpoint now and wait until everything is on disk"""
+        flags = getattr(lt.torrent_handle, 'flush_disk_cache', 0)
+        self.checkpoint(flags)
+
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._outstanding > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"Timed out waiting for {self._outstanding} resume data alerts")
+                    break
+                self._cond.wait(remaining)
+        self._write_queue.join()
+
+    def stop(self):
+        """Stop the scheduler and writer threads"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._write_queue.put(None)
+        for thread in (self._scheduler, self._writer):
+            if thread.is_alive():
+                thread.join(5)
+
+    def _schedule_loop(self):
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+                now = time.monotonic()
+                due = min(self._due, self._next_periodic) if self._pending else self._next_periodic
+                if now < due:
+                    self._cond.wait(due - now)
+                    continue
+                self._pending = False
+                self._next_periodic = now + self.interval
+
+            try:
+                self.checkpoint()
+            except Exception as e:
+                self._report_error(f"Error saving resume data: {str(e)}")
+
+    def _write_loop(self):
+        while True:
+            # Block for the first write, then drain whatever else is queued
+            # so a burst of alerts is committed in one transaction
+            ops = [self._write_queue.get()]
+            while len(ops) < self.WRITE_BATCH_SIZE:
+                try:
+                    ops.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = None in ops
+            try:
+                self.store.apply([op for op in ops if op is not None])
+            except Exception as e:
+                self._report_error(f"Error writing session store: {str(e)}")
+            finally:
+                for _ in ops:
+                    self._write_queue.task_done()
+            if stopping:
+                return
+
+    def _report_error(self, message):
+        if self.on_error:
+            self.on_error("Save Error", message)
+        else:
+            print(message)
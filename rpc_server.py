@@ -0,0 +1,318 @@
+"""
+RPC Server - Local JSON-RPC 2.0 control API for the torrent core
+"""
+
+import os
+import hmac
+import json
+import asyncio
+import inspect
+import secrets
+import functools
+import threading
+
+from torrent_core import EVENTS
+
+DEFAULT_PORT = 58846
+
+# TCP clients authenticate with the token in this file under the state directory
+TOKEN_FILE = 'rpc_token'
+
+# Largest request line accepted (batch adds of thousands of items are big)
+MAX_LINE_BYTES = 64 * 1024 * 1024
+
+# Subscribers that fall this far behind stop receiving events until they catch up
+MAX_PENDING_EVENT_BYTES = 16 * 1024 * 1024
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+NOT_AUTHENTICATED = -32001
+
+# Core methods callable over RPC; every mutating one has a batch variant
+METHODS = [
+    'add_torrent_file', 'add_torrent_files',
+    'add_magnet_link', 'add_magnet_links',
+    'start_import', 'cancel_import',
+    'resolve_metadata', 'cancel_metadata', 'set_metadata_fetch_limit',
+    'pause_torrent', 'pause_torrents',
+    'resume_torrent', 'resume_torrents',
+    'remove_torrent', 'remove_torrents',
+    'get_files', 'get_file_progress', 'set_file_priority',
+    'move_queue_position', 'move_queue_positions', 'set_queue_settings', 'get_queue_settings',
+    'apply_session_settings', 'set_bandwidth_schedule', 'set_alt_limits', 'get_bandwidth_state',
+    'set_category', 'remove_category', 'get_categories',
+    'set_torrent_category', 'set_torrents_category', 'get_torrent_category',
+    'set_performance_settings', 'get_performance_settings',
+    'set_auto_tune', 'get_auto_tune_state', 'get_tuning_log',
+    'get_torrent_info', 'get_all_torrent_info', 'torrent_count', 'get_totals',
+    'get_selection_totals', 'get_state_counts', 'get_session_stats', 'get_poll_stats',
+    'get_metadata_queue_stats'
+]
+
+
+def _error(request_id, code, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+def load_token(path):
+    """Read the RPC token from path, creating it (readable by the current user only) if missing"""
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        os.chmod(path, 0o600)
+        with open(path) as f:
+            token = f.read().strip()
+        if token:
+            return token
+        fd = os.open(path, os.O_WRONLY | os.O_TRUNC)
+    token = secrets.token_hex(32)
+    with os.fdopen(fd, 'w') as f:
+        f.write(token + '\n')
+    return token
+
+
+class _Connection:
+    """One client connection, whether it authenticated and the events it subscribed to"""
+
+    def __init__(self, writer, authenticated):
+        self.writer = writer
+        self.authenticated = authenticated
+        self.events = set()
+        self.write_lock = asyncio.Lock()
+
+    async def send(self, message):
+        async with self.write_lock:
+            self.writer.write(json.dumps(message).encode('utf-8') + b'\n')
+            await self.writer.drain()
+
+
+class RpcServer:
+    """JSON-RPC 2.0 server for scripting the torrent core.
+
+    Messages are newline-delimited JSON: one request object, or an array
+    for a JSON-RPC batch, per line. The server only listens on localhost or
+    on a Unix socket that only the current user can open. Any local user
+    can reach the TCP port, so a TCP connection must first call
+    'authenticate' (params: [token]) with the token from the 0600 file
+    token_path (~/.pytorrent/rpc_token by default, created on first use).
+    Requests on a connection are handled concurrently; core calls run in
+    the event loop's executor so a slow add never stalls other clients.
+
+    'subscribe' (params: list of event names, default all) turns on
+    notifications for core events, e.g. torrents_updated status deltas,
+    sent as {"method": event, "params": [event arguments]}.
+    """
+
+    def __init__(self, core, port=DEFAULT_PORT, unix_path=None, host='127.0.0.1', token_path=None):
+        self.core = core
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.token_path = token_path or os.path.join(core.state_path, TOKEN_FILE)
+        self.token = None if unix_path else load_token(self.token_path)
+        self._methods = {name: getattr(core, name) for name in METHODS}
+        self._connections = set()
+        self._loop = None
+        self._stopped = None
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = None
+        self._event_callbacks = {}
+
+    def start(self):
+        """Start serving on a background thread; raises if the socket can't be opened"""
+        self._thread = threading.Thread(target=self._run, name='RpcServer', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+        # Forward core events to subscribed connections
+        for event in EVENTS:
+            callback = functools.partial(self._on_core_event, event)
+            self._event_callbacks[event] = callback
+            self.core.events.subscribe(event, callback)
+
+    def stop(self):
+        """Close every connection and stop the server thread"""
+        for event, callback in self._event_callbacks.items():
+            self.core.events.unsubscribe(event, callback)
+        self._event_callbacks = {}
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._stopped.set)
+            self._thread.join(5)
+
+    def address(self):
+        """Describe where the server listens"""
+        return self.unix_path if self.unix_path else f"{self.host}:{self.port}"
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve())
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+        finally:
+            self._loop.close()
+
+    async def _serve(self):
+        self._stopped = asyncio.Event()
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            # Created owner-only: Unix connections skip the token, so the socket must never be open to others
+            old_umask = os.umask(0o077)
+            try:
+                server = await asyncio.start_unix_server(self._handle_connection, self.unix_path,
+                                                         limit=MAX_LINE_BYTES)
+            finally:
+                os.umask(old_umask)
+            os.chmod(self.unix_path, 0o600)
+        else:
+            server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                limit=MAX_LINE_BYTES)
+            # Port 0 picks a free port
+            self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+
+        async with server:
+            await self._stopped.wait()
+        for connection in list(self._connections):
+            connection.writer.close()
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+    async def _handle_connection(self, reader, writer):
+        # Only the socket's owner can open the Unix socket, so it needs no token
+        connection = _Connection(writer, authenticated=self.token is None)
+        self._connections.add(connection)
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(self._respond(line, connection))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._connections.discard(connection)
+            self._set_subscription(connection, set())
+            writer.close()
+
+    async def _respond(self, line, connection):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            response = _error(None, PARSE_ERROR, "Parse error")
+        else:
+            if isinstance(message, list):
+                if message:
+                    responses = await asyncio.gather(*(self._handle_request(m, connection) for m in message))
+                    response = [r for r in responses if r is not None] or None
+                else:
+                    response = _error(None, INVALID_REQUEST, "Empty batch")
+            else:
+                response = await self._handle_request(message, connection)
+
+        if response is not None:
+            try:
+                await connection.send(response)
+            except ConnectionError:
+                pass
+
+    async def _handle_request(self, request, connection):
+        """Run one request; returns the response, or None for notifications"""
+        if not isinstance(request, dict) or request.get('jsonrpc') != '2.0' or \
+                not isinstance(request.get('method'), str):
+            return _error(None, INVALID_REQUEST, "Invalid request")
+
+        response = await self._call(request, connection)
+        # Notifications (no id) never get a response, not even an error
+        return response if 'id' in request else None
+
+    async def _call(self, request, connection):
+        request_id = request.get('id')
+        method = request['method']
+        params = request.get('params', [])
+        if isinstance(params, list):
+            args, kwargs = params, {}
+        elif isinstance(params, dict):
+            args, kwargs = [], params
+        else:
+            return _error(request_id, INVALID_PARAMS, "params must be an array or an object")
+
+        if method == 'authenticate':
+            token = args[0] if len(args) == 1 else kwargs.get('token')
+            # Unix socket connections are authenticated already
+            if self.token is not None and not (isinstance(token, str) and hmac.compare_digest(token, self.token)):
+                return _error(request_id, NOT_AUTHENTICATED, "Invalid token")
+            connection.authenticated = True
+            return {'jsonrpc': '2.0', 'id': request_id, 'result': True}
+        if not connection.authenticated:
+            return _error(request_id, NOT_AUTHENTICATED, "Not authenticated: call authenticate with the token first")
+
+        try:
+            if method == 'subscribe':
+                result = self._subscribe(connection, *args, **kwargs)
+            elif method == 'unsubscribe':
+                result = self._set_subscription(connection, set())
+            elif method == 'list_methods':
+                result = METHODS + ['authenticate', 'subscribe', 'unsubscribe', 'list_methods']
+            elif method in self._methods:
+                func = self._methods[method]
+                try:
+                    inspect.signature(func).bind(*args, **kwargs)
+                except TypeError as e:
+                    return _error(request_id, INVALID_PARAMS, str(e))
+                result = await self._loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+            else:
+                return _error(request_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+        except Exception as e:
+            return _error(request_id, SERVER_ERROR, str(e))
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+    def _subscribe(self, connection, events=None):
+        """Subscribe a connection to core events (all of them by default)"""
+        events = set(EVENTS) if events is None else set(events)
+        unknown = events - set(EVENTS)
+        if unknown:
+            raise ValueError(f"Unknown events: {', '.join(sorted(unknown))}")
+        return self._set_subscription(connection, connection.events | events)
+
+    def _set_subscription(self, connection, events):
+        """Set a connection's events, telling the core whether status deltas are wanted"""
+        was_watching = 'torrents_updated' in connection.events
+        connection.events = events
+        watching = 'torrents_updated' in events
+        if watching != was_watching:
+            self.core.watch_status(watching)
+        return sorted(events)
+
+    def _on_core_event(self, event, *args):
+        """Called on core threads; hands the event over to the server loop"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._broadcast, event, args)
+
+    def _broadcast(self, event, args):
+        subscribers = [c for c in self._connections if event in c.events]
+        if not subscribers:
+            return
+        data = json.dumps({'jsonrpc': '2.0', 'method': event, 'params': list(args)}).encode('utf-8') + b'\n'
+        for connection in subscribers:
+            transport = connection.writer.transport
+            if transport.is_closing() or transport.get_write_buffer_size() > MAX_PENDING_EVENT_BYTES:
+                continue
+            connection.writer.write(data)
@@ -0,0 +1,120 @@
+"""
+Session Stats - Session-wide counters and gauges from session_stats_alert
+"""
+
+import time
+import threading
+import numpy as np
+import libtorrent as lt
+
+# Metrics kept from each session_stats_alert, as (key, libtorrent metric name)
+METRICS = [
+    ('recv_bytes', 'net.recv_bytes'),
+    ('recv_payload_bytes', 'net.recv_payload_bytes'),
+    ('recv_ip_overhead_bytes', 'net.recv_ip_overhead_bytes'),
+    ('sent_bytes', 'net.sent_bytes'),
+    ('sent_payload_bytes', 'net.sent_payload_bytes'),
+    ('sent_ip_overhead_bytes', 'net.sent_ip_overhead_bytes'),
+    ('dht_bytes_in', 'dht.dht_bytes_in'),
+    ('dht_bytes_out', 'dht.dht_bytes_out'),
+    ('dht_nodes', 'dht.dht_nodes'),
+    ('num_peers_connected', 'peer.num_peers_connected'),
+    ('disk_queued_jobs', 'disk.queued_disk_jobs'),
+    ('disk_queued_write_bytes', 'disk.queued_write_bytes'),
+    ('num_peers_half_open', 'peer.num_peers_half_open'),
+    ('num_peers_up_interested', 'peer.num_peers_up_interested'),
+    ('num_peers_up_unchoked', 'peer.num_peers_up_unchoked'),
+    ('connect_timeouts', 'peer.connect_timeouts'),
+    ('timeout_peers', 'peer.timeout_peers'),
+    ('waste_piece_timed_out', 'ses.waste_piece_timed_out')
+]
+METRIC_INDEX = {key: i for i, (key, name) in enumerate(METRICS)}
+
+
+def _resolve_metrics():
+    """Look up the value index and counter/gauge type of every metric once"""
+    known = {metric.name: metric for metric in lt.session_stats_metrics()}
+    counter_type = getattr(lt, 'metric_type_t', lt.stats_metric).counter
+    indices = np.full(len(METRICS), -1, dtype=np.intp)
+    counters = np.zeros(len(METRICS), dtype=bool)
+    for i, (key, name) in enumerate(METRICS):
+        metric = known.get(name)
+        if metric is not None:
+            indices[i] = metric.value_index
+            counters[i] = metric.type == counter_type
+    return indices, counters
+
+
+class SessionStats:
+    """Session-wide totals from post_session_stats() instead of summing every torrent.
+
+    Metric indices are resolved once; each session_stats_alert fills a
+    fixed-size array, and counters are turned into per-second rates from
+    the previous sample. Reading the totals is O(1) in the torrent count,
+    and unlike summed torrent rates they include protocol overhead and DHT.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.indices, self.counters = _resolve_metrics()
+        self.names = [name for key, name in METRICS]
+        self.values = np.zeros(len(METRICS), dtype=np.int64)
+        self.current = np.zeros(len(METRICS), dtype=np.float64)  # Counters as per-second rates, gauges as-is
+        self.sampled_at = None
+        self._lock = threading.Lock()
+
+    def request(self):
+        """Ask the session to post a session_stats_alert"""
+        self.session.post_session_stats()
+
+    def process_alert(self, alert):
+        """Store the metrics of a session_stats_alert"""
+        raw = alert.values
+        if isinstance(raw, dict):
+            # Older bindings hand out a {name: value} dict
+            values = np.array([raw.get(name, 0) for name in self.names], dtype=np.int64)
+        else:
+            raw = np.asarray(raw, dtype=np.int64)
+            values = np.where(self.indices >= 0, raw[np.maximum(self.indices, 0)], 0)
+
+        now = time.monotonic()
+        with self._lock:
+            if self.sampled_at is not None and now > self.sampled_at:
+                deltas = np.maximum(values - self.values, 0)
+                self.current = np.where(self.counters, deltas / (now - self.sampled_at), values)
+            else:
+                self.current = np.where(self.counters, 0, values).astype(np.float64)
+            self.values = values
+            self.sampled_at = now
+
+    def _current(self, key):
+        return float(self.current[METRIC_INDEX[key]])
+
+    def snapshot(self):
+        """Get payload and overhead rates, peers, DHT nodes, the disk queue and timeouts"""
+        with self._lock:
+            get = self._current
+            download_payload = get('recv_payload_bytes')
+            upload_payload = get('sent_payload_bytes')
+            download_total = get('recv_bytes') + get('recv_ip_overhead_bytes') + get('dht_bytes_in')
+            upload_total = get('sent_bytes') + get('sent_ip_overhead_bytes') + get('dht_bytes_out')
+            return {
+                'download_rate': int(download_payload),
+                'upload_rate': int(upload_payload),
+                'download_overhead_rate': int(max(download_total - download_payload, 0)),
+                'upload_overhead_rate': int(max(upload_total - upload_payload, 0)),
+                'total_download_rate': int(download_total),
+                'total_upload_rate': int(upload_total),
+                'dht_download_rate': int(get('dht_bytes_in')),
+                'dht_upload_rate': int(get('dht_bytes_out')),
+                'dht_nodes': int(get('dht_nodes')),
+                'num_peers': int(get('num_peers_connected')),
+                'disk_queued_jobs': int(get('disk_queued_jobs')),
+                'disk_queued_write_bytes': int(get('disk_queued_write_bytes')),
+                'num_peers_half_open': int(get('num_peers_half_open')),
+                'num_peers_up_interested': int(get('num_peers_up_interested')),
+                'num_peers_up_unchoked': int(get('num_peers_up_unchoked')),
+                'connect_timeouts': get('connect_timeouts'),  # per second
+                'peer_timeouts': get('timeout_peers'),  # per second
+                'timed_out_waste_rate': int(get('waste_piece_timed_out'))
+            }
@@ -0,0 +1,171 @@
+"""
+Session Store - Single-file SQLite store for torrents, metainfo and resume data
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+import libtorrent as lt
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metainfo (
+    digest TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS torrents (
+    hash TEXT PRIMARY KEY,
+    name TEXT,
+    save_path TEXT,
+    magnet_link TEXT,
+    metainfo_digest TEXT REFERENCES metainfo(digest),
+    resume BLOB,
+    added_at REAL,
+    updated_at REAL
+);
+"""
+
+
+def add_params_from_record(record, default_save_path):
+    """Build add_torrent_params from a stored torrent record"""
+    if record['resume'] and hasattr(lt, 'read_resume_data'):
+        params = lt.read_resume_data(record['resume'])
+    else:
+        params = lt.add_torrent_params()
+        if record['resume']:
+            params.resume_data = record['resume']
+
+    params.save_path = record['save_path'] or default_save_path
+
+    if record['metainfo']:
+        params.ti = lt.torrent_info(lt.bdecode(record['metainfo']))
+    elif record['magnet_link']:
+        magnet_params = lt.parse_magnet_uri(record['magnet_link'])
+        params.info_hash = magnet_params.info_hash
+        params.name = magnet_params.name
+        params.trackers = magnet_params.trackers
+
+    return params
+
+
+class SessionStore:
+    """Embedded SQLite store (WAL mode) holding the whole session.
+
+    Metainfo is stored once as a write-once blob keyed by its SHA-1, and
+    torrent rows hold the incrementally updated resume data. All access
+    goes through one connection guarded by a lock.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def is_empty(self):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM torrents LIMIT 1").fetchone() is None
+
+    def apply(self, ops):
+        """Apply a batch of write operations in one transaction.
+
+        Each op is a tuple:
+            ('torrent', hash, name, save_path, magnet_link)
+            ('metainfo', hash, data)
+            ('resume', hash, data)
+            ('delete', [hash, ...])
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            for op in ops:
+                kind = op[0]
+                if kind == 'torrent':
+                    _, torrent_hash, name, save_path, magnet_link = op
+                    self._conn.execute(
+                        "INSERT INTO torrents (hash, name, save_path, magnet_link, added_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(hash) DO UPDATE SET name=excluded.name, save_path=excluded.save_path, "
+                        "magnet_link=COALESCE(excluded.magnet_link, magnet_link), updated_at=excluded.updated_at",
+                        (torrent_hash, name, save_path, magnet_link, now, now))
+                elif kind == 'metainfo':
+                    _, torrent_hash, data = op
+                    digest = hashlib.sha1(data).hexdigest()
+                    self._conn.execute("INSERT OR IGNORE INTO metainfo (digest, data) VALUES (?, ?)",
+                                       (digest, sqlite3.Binary(data)))
+                    self._conn.execute("UPDATE torrents SET metainfo_digest=? WHERE hash=?",
+                                       (digest, torrent_hash))
+                elif kind == 'resume':
+                    _, torrent_hash, data = op
+                    self._conn.execute("UPDATE torrents SET resume=?, updated_at=? WHERE hash=?",
+                                       (sqlite3.Binary(data), now, torrent_hash))
+                elif kind == 'delete':
+                    _, torrent_hashes = op
+                    for torrent_hash in torrent_hashes:
+                        row = self._conn.execute("SELECT metainfo_digest FROM torrents WHERE hash=?",
+                                                 (torrent_hash,)).fetchone()
+                        self._conn.execute("DELETE FROM torrents WHERE hash=?", (torrent_hash,))
+                        # Drop the metainfo blob once nothing references it
+                        if row and row[0]:
+                            self._conn.execute(
+                                "DELETE FROM metainfo WHERE digest=? AND NOT EXISTS "
+                                "(SELECT 1 FROM torrents WHERE metainfo_digest=?)", (row[0], row[0]))
+
+    def load_all(self):
+        """Read every torrent record in one sequential scan"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t.hash, t.name, t.save_path, t.magnet_link, t.resume, m.data "
+                "FROM torrents t LEFT JOIN metainfo m ON m.digest = t.metainfo_digest "
+                "ORDER BY t.rowid").fetchall()
+
+        return [{
+            'hash': row[0],
+            'name': row[1],
+            'save_path': row[2],
+            'magnet_link': row[3],
+            'resume': bytes(row[4]) if row[4] is not None else None,
+            'metainfo': bytes(row[5]) if row[5] is not None else None
+        } for row in rows]
+
+    def migrate_legacy(self, resume_data_path):
+        """Import session.json and the per-torrent .resume/.torrent files"""
+        session_file = os.path.join(resume_data_path, 'session.json')
+        if not os.path.exists(session_file):
+            return 0
+
+        with open(session_file, 'r') as f:
+            session_data = json.load(f)
+
+        ops = []
+        for torrent_data in session_data.get('torrents', []):
+            torrent_hash = torrent_data.get('hash')
+            if not torrent_hash:
+                continue
+
+            ops.append(('torrent', torrent_hash, torrent_data.get('name'),
+                        torrent_data.get('save_path'), torrent_data.get('magnet_link')))
+
+            torrent_file = torrent_data.get('torrent_file')
+            if torrent_file and os.path.exists(torrent_file):
+                with open(torrent_file, 'rb') as tf:
+                    ops.append(('metainfo', torrent_hash, tf.read()))
+
+            resume_file = os.path.join(resume_data_path, f"{torrent_hash}.resume")
+            if os.path.exists(resume_file):
+                with open(resume_file, 'rb') as rf:
+                    ops.append(('resume', torrent_hash, rf.read()))
+
+        self.apply(ops)
+
+        # Keep the old files around but make sure we never import them twice
+        os.replace(session_file, f"{session_file}.migrated")
+        return len(session_data.get('torrents', []))
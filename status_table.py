@@ -0,0 +1,238 @@
+"""
+Status Table - Columnar storage for torrent status with vectorized aggregates
+"""
+
+import sys
+import numpy as np
+
+# Numeric info fields, each stored in its own column
+NUMERIC_FIELDS = (
+    'total_size', 'downloaded', 'uploaded', 'download_rate', 'upload_rate',
+    'progress', 'eta', 'ratio', 'num_peers', 'num_seeds', 'queue_position'
+)
+INT_FIELDS = frozenset(['total_size', 'downloaded', 'uploaded', 'download_rate',
+                        'upload_rate', 'num_peers', 'num_seeds', 'queue_position'])
+
+# State labels are stored as small integer codes
+STATE_LABELS = [
+    'Unknown', 'Queued', 'Checking', 'Downloading metadata', 'Downloading',
+    'Finished', 'Seeding', 'Allocating', 'Checking resume data', 'Paused', 'Error',
+    'Checking queued'
+]
+STATE_CODES = {label: code for code, label in enumerate(STATE_LABELS)}
+
+# One bit per info field in the change masks returned by StatusTable.diff
+FIELDS = ('name',) + NUMERIC_FIELDS + ('state', 'save_path', 'paused')
+FIELD_BITS = {field: 1 << bit for bit, field in enumerate(FIELDS)}
+ALL_FIELDS = (1 << len(FIELDS)) - 1
+
+# Smallest change that is worth reporting, as (absolute, relative to the
+# last reported value); the larger of the two applies. Rates use a relative
+# threshold so 1 B/s of jitter is ignored, progress and ratio use the
+# precision they are displayed with, and counts report every change.
+THRESHOLDS = {
+    'total_size': (0, 0),
+    'downloaded': (16 * 1024, 0.001),
+    'uploaded': (16 * 1024, 0.001),
+    'download_rate': (1024, 0.05),
+    'upload_rate': (1024, 0.05),
+    'progress': (0.05, 0),
+    'eta': (1, 0.02),
+    'ratio': (0.005, 0),
+    'num_peers': (0, 0),
+    'num_seeds': (0, 0),
+    'queue_position': (0, 0)
+}
+
+
+class StatusTable:
+    """Status of every torrent in NumPy columns, indexed by a stable slot per info hash.
+
+    Slots of removed torrents are reused. Names and save paths are kept in
+    plain lists of interned strings; everything numeric is a column so that
+    totals and per-state counts are single vectorized reductions.
+
+    A second set of columns holds the values last reported to the UI, and
+    diff() compares the two in one pass to find significant changes.
+    """
+
+    __slots__ = ('capacity', 'columns', 'state', 'paused', 'active',
+                 'names', 'save_paths', 'hashes', 'slots', '_free',
+                 'thresholds', 'reported', 'reported_state', 'reported_paused', 'pending')
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.columns = {field: np.zeros(capacity, dtype=np.float64) for field in NUMERIC_FIELDS}
+        self.state = np.zeros(capacity, dtype=np.int8)
+        self.paused = np.zeros(capacity, dtype=bool)
+        self.active = np.zeros(capacity, dtype=bool)  # Slot holds a torrent
+        self.names = [None] * capacity
+        self.save_paths = [None] * capacity
+        self.hashes = [None] * capacity
+        self.slots = {}  # hash -> slot
+        self._free = list(range(capacity - 1, -1, -1))
+        self.thresholds = dict(THRESHOLDS)
+        self.reported = {field: np.zeros(capacity, dtype=np.float64) for field in NUMERIC_FIELDS}
+        self.reported_state = np.zeros(capacity, dtype=np.int8)
+        self.reported_paused = np.zeros(capacity, dtype=bool)
+        self.pending = np.zeros(capacity, dtype=np.uint16)  # Bits to report regardless of thresholds
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, torrent_hash):
+        return torrent_hash in self.slots
+
+    def _grow(self):
+        """Double the capacity of every column"""
+        old = self.capacity
+        new = old * 2
+        for field, column in self.columns.items():
+            self.columns[field] = np.resize(column, new)
+            self.columns[field][old:] = 0
+        for field, column in self.reported.items():
+            self.reported[field] = np.resize(column, new)
+            self.reported[field][old:] = 0
+        self.state = np.concatenate([self.state, np.zeros(old, dtype=np.int8)])
+        self.paused = np.concatenate([self.paused, np.zeros(old, dtype=bool)])
+        self.active = np.concatenate([self.active, np.zeros(old, dtype=bool)])
+        self.reported_state = np.concatenate([self.reported_state, np.zeros(old, dtype=np.int8)])
+        self.reported_paused = np.concatenate([self.reported_paused, np.zeros(old, dtype=bool)])
+        self.pending = np.concatenate([self.pending, np.zeros(old, dtype=np.uint16)])
+        self.names.extend([None] * old)
+        self.save_paths.extend([None] * old)
+        self.hashes.extend([None] * old)
+        self._free.extend(range(new - 1, old - 1, -1))
+        self.capacity = new
+
+    def slot_for(self, torrent_hash):
+        """Get the slot of a torrent, allocating one if needed"""
+        slot = self.slots.get(torrent_hash)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self.slots[torrent_hash] = slot
+            self.hashes[slot] = torrent_hash
+            self.active[slot] = True
+            self.pending[slot] = ALL_FIELDS
+        return slot
+
+    def remove(self, torrent_hash):
+        """Free the slot of a removed torrent"""
+        slot = self.slots.pop(torrent_hash, None)
+        if slot is None:
+            return
+        for column in self.columns.values():
+            column[slot] = 0
+        for column in self.reported.values():
+            column[slot] = 0
+        self.state[slot] = 0
+        self.paused[slot] = False
+        self.active[slot] = False
+        self.reported_state[slot] = 0
+        self.reported_paused[slot] = False
+        self.pending[slot] = 0
+        self.names[slot] = None
+        self.save_paths[slot] = None
+        self.hashes[slot] = None
+        self._free.append(slot)
+
+    def clear(self):
+        for torrent_hash in list(self.slots):
+            self.remove(torrent_hash)
+
+    def set_info(self, torrent_hash, info):
+        """Store an info dict in the table"""
+        slot = self.slot_for(torrent_hash)
+        for field in NUMERIC_FIELDS:
+            self.columns[field][slot] = info.get(field, 0)
+        self.state[slot] = STATE_CODES.get(info.get('state'), 0)
+        self.paused[slot] = info.get('paused', False)
+        name = sys.intern(info.get('name') or 'Unknown')
+        save_path = sys.intern(info.get('save_path') or '')
+        # Interned, so identity is equality
+        if name is not self.names[slot]:
+            self.names[slot] = name
+            self.pending[slot] |= FIELD_BITS['name']
+        if save_path is not self.save_paths[slot]:
+            self.save_paths[slot] = save_path
+            self.pending[slot] |= FIELD_BITS['save_path']
+        return slot
+
+    def diff(self, slots=None):
+        """Find significant changes since the last diff, over all torrents or the given slots.
+
+        Returns (slots, masks): the slots with at least one changed field and
+        a FIELD_BITS mask of the changed fields for each. Only the reported
+        values of changed fields move forward, so slow drifts below a
+        threshold still add up to a change eventually.
+        """
+        if slots is None:
+            slots = np.flatnonzero(self.active)
+        else:
+            slots = np.unique(np.asarray(slots, dtype=np.intp))
+        masks = self.pending[slots].copy()
+        self.pending[slots] = 0
+
+        for field in NUMERIC_FIELDS:
+            current = self.columns[field][slots]
+            reported = self.reported[field][slots]
+            absolute, relative = self.thresholds[field]
+            changed = np.abs(current - reported) > np.maximum(absolute, relative * np.abs(reported))
+            # Always report dropping to or rising from zero (stalled rate, infinite ETA)
+            changed |= (current == 0) != (reported == 0)
+            masks[changed] |= FIELD_BITS[field]
+            self.reported[field][slots[changed]] = current[changed]
+
+        changed = self.state[slots] != self.reported_state[slots]
+        masks[changed] |= FIELD_BITS['state']
+        self.reported_state[slots] = self.state[slots]
+
+        changed = self.paused[slots] != self.reported_paused[slots]
+        masks[changed] |= FIELD_BITS['paused']
+        self.reported_paused[slots] = self.paused[slots]
+
+        nonzero = masks != 0
+        return slots[nonzero], masks[nonzero]
+
+    def info(self, torrent_hash):
+        """Build an info dict for one torrent ({} if unknown)"""
+        slot = self.slots.get(torrent_hash)
+        if slot is None:
+            return {}
+        return self.info_at(slot)
+
+    def info_at(self, slot):
+        info = {
+            'name': self.names[slot],
+            'hash': self.hashes[slot],
+            'state': STATE_LABELS[self.state[slot]],
+            'save_path': self.save_paths[slot],
+            'paused': bool(self.paused[slot])
+        }
+        for field in NUMERIC_FIELDS:
+            value = self.columns[field][slot]
+            info[field] = int(value) if field in INT_FIELDS else float(value)
+        return info
+
+    def totals(self, slots=None):
+        """Sum rates and sizes over all torrents, or over the given slots"""
+        mask = self.active if slots is None else np.asarray(slots, dtype=np.intp)
+        return {
+            'count': int(np.count_nonzero(self.active)) if slots is None else len(mask),
+            'download_rate': int(self.columns['download_rate'][mask].sum()),
+            'upload_rate': int(self.columns['upload_rate'][mask].sum()),
+            'total_size': int(self.columns['total_size'][mask].sum()),
+            'downloaded': int(self.columns['downloaded'][mask].sum()),
+            'uploaded': int(self.columns['uploaded'][mask].sum())
+        }
+
+    def selection_totals(self, torrent_hashes):
+        """Sum rates and sizes over a selection of torrents"""
+        return self.totals([self.slots[h] for h in torrent_hashes if h in self.slots])
+
+    def state_counts(self):
+        """Count torrents per state label"""
+        counts = np.bincount(self.state[self.active], minlength=len(STATE_LABELS))
+        return {label: int(counts[code]) for code, label in enumerate(STATE_LABELS) if counts[code]}
@@ -6,17 +6,24 @@ import os
 import sys
 import time
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                             QTreeWidget, QTreeWidgetItem, QMenuBar, QMenu, 
+                             QTreeView, QAbstractItemView, QMenuBar, QMenu, 
                              QAction, QToolBar, QStatusBar, QFileDialog, 
                              QInputDialog, QMessageBox, QProgressBar, QLabel,
                              QSplitter, QTextEdit, QPushButton, QFrame, QStyledItemDelegate,
-                             QSystemTrayIcon, QApplication)
-from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QThread, QRect, QUrl
+                             QSystemTrayIcon, QApplication, QProgressDialog, QTabWidget,
+                             QDialog, QDialogButtonBox)
+from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QThread, QRect, QUrl, QPoint, QMetaObject, QEvent
 from PyQt5.QtGui import QIcon, QFont, QPainter, QColor, QPen, QDragEnterEvent, QDropEvent
 
 from torrent_manager import TorrentManager
 from add_torrent_dialog import AddTorrentDialog
 from preferences_dialog import PreferencesDialog
+from category_dialog import CategoryDialog
+from file_tree_model import TorrentFilesModel, EXPAND_ALL_MAX_FILES
+from file_priorities import PRIORITY_LEVELS
+from torrent_model import (TorrentTableModel, PROGRESS_COLUMN, PROGRESS_ROLE, STATE_ROLE,
+                           format_size, format_speed, format_eta)
+from app_settings import load_preferences, ORGANIZATION, APPLICATION
 from PyQt5.QtCore import QSettings
 
 class ProgressBarDelegate(QStyledItemDelegate):
@@ -26,17 +33,11 @@ class ProgressBarDelegate(QStyledItemDelegate):
         super().__init__(parent)
     
     def paint(self, painter, option, index):
-        # Only draw progress bars for the progress column (column 2)
-        if index.column() == 2:
+        # Only draw progress bars for the progress column
+        if index.column() == PROGRESS_COLUMN:
             # Get progress value and state
-            progress_text = index.data(Qt.DisplayRole)
-            torrent_state = index.data(Qt.UserRole) or 'Unknown'
-            
-            try:
-                # Extract percentage from text like "45.2%"
-                progress = float(progress_text.replace('%', '')) if progress_text and '%' in progress_text else 0
-            except (ValueError, AttributeError):
-                progress = 0
+            progress = index.data(PROGRESS_ROLE) or 0
+            torrent_state = index.data(STATE_ROLE) or 'Unknown'
             
             # Set colors based on state
             if torrent_state.lower() in ['downloading', 'checking']:
@@ -75,34 +76,116 @@ class ProgressBarDelegate(QStyledItemDelegate):
             # Use default painting for other columns
             super().paint(painter, option, index)
 
+# Minimum time between applying torrent updates to the list (one 60 Hz frame)
+UPDATE_THROTTLE_MS = 16
+
 class TorrentClient(QMainWindow):
+    # Commands for the torrent manager, delivered on its thread
+    add_torrent_file_requested = pyqtSignal(str, object, object)  # path, download path, selected files
+    add_magnet_link_requested = pyqtSignal(str, object, object)  # magnet, download path, selected files
+    import_requested = pyqtSignal(list, object)  # files and directories, download path
+    pause_requested = pyqtSignal(str)  # hash
+    resume_requested = pyqtSignal(str)  # hash
+    remove_requested = pyqtSignal(str, bool)  # hash, delete files
+    session_settings_requested = pyqtSignal(dict)
+    download_path_requested = pyqtSignal(str)
+    watch_folder_requested = pyqtSignal(object, bool)  # path or None, poll instead of inotify
+    checkpoint_interval_requested = pyqtSignal(int)  # seconds
+    window_visibility_requested = pyqtSignal(bool)  # window shown and not minimized
+    file_priority_requested = pyqtSignal(str, object, object)  # hash, file selectors, priority
+    files_requested = pyqtSignal(str, bool)  # hash, whether the file list is needed too
+    queue_settings_requested = pyqtSignal(dict)  # enabled and active torrent limits
+    bandwidth_schedule_requested = pyqtSignal(dict)  # alternative limits and weekly schedule
+    alt_limits_requested = pyqtSignal(bool)  # alternative rate limits on/off
+    queue_move_requested = pyqtSignal(list, str)  # hashes, 'top', 'up', 'down' or 'bottom'
+    category_requested = pyqtSignal(list, object)  # hashes, category name or None
+    categories_requested = pyqtSignal(dict, list)  # edited categories, removed names
+    performance_requested = pyqtSignal(dict)  # disk/buffer profile and raw overrides
+    
     def __init__(self):
         super().__init__()
+        
+        # The torrent manager runs on its own thread so slow session calls
+        # and disk I/O never block the window
+        self.manager_thread = QThread()
         self.torrent_manager = TorrentManager()
+        self.torrent_manager.moveToThread(self.manager_thread)
+        self.manager_thread.started.connect(self.torrent_manager.start)
+        
+        self.add_torrent_file_requested.connect(self.torrent_manager.add_torrent_file)
+        self.add_magnet_link_requested.connect(self.torrent_manager.add_magnet_link)
+        self.import_requested.connect(self.torrent_manager.start_import)
+        self.pause_requested.connect(self.torrent_manager.pause_torrent)
+        self.resume_requested.connect(self.torrent_manager.resume_torrent)
+        self.remove_requested.connect(self.torrent_manager.remove_torrent)
+        self.session_settings_requested.connect(self.torrent_manager.apply_session_settings)
+        self.download_path_requested.connect(self.torrent_manager.set_download_path)
+        self.watch_folder_requested.connect(self.torrent_manager.set_watch_folder)
+        self.checkpoint_interval_requested.connect(self.torrent_manager.set_checkpoint_interval)
+        self.window_visibility_requested.connect(self.torrent_manager.set_window_visible)
+        self.file_priority_requested.connect(self.torrent_manager.set_file_priority)
+        self.files_requested.connect(self.torrent_manager.fetch_files)
+        self.queue_settings_requested.connect(self.torrent_manager.set_queue_settings)
+        self.bandwidth_schedule_requested.connect(self.torrent_manager.set_bandwidth_schedule)
+        self.alt_limits_requested.connect(self.torrent_manager.set_alt_limits)
+        self.queue_move_requested.connect(self.torrent_manager.move_queue_positions)
+        self.category_requested.connect(self.torrent_manager.set_torrents_category)
+        self.categories_requested.connect(self.torrent_manager.update_categories)
+        self.performance_requested.connect(self.torrent_manager.set_performance_settings)
+        
         self.torrent_manager.torrent_added.connect(self.on_torrent_added)
-        self.torrent_manager.torrent_updated.connect(self.on_torrent_updated)
+        self.torrent_manager.torrents_added.connect(self.on_torrents_added)
+        self.torrent_manager.session_restored.connect(self.on_session_restored)
+        self.torrent_manager.torrents_updated.connect(self.on_torrents_updated)
         self.torrent_manager.torrent_removed.connect(self.on_torrent_removed)
+        self.torrent_manager.torrents_removed.connect(self.on_torrents_removed)
         self.torrent_manager.error_occurred.connect(self.on_error_occurred)
         self.torrent_manager.torrent_completed.connect(self.on_torrent_completed)
+        self.torrent_manager.poll_cadence_changed.connect(self.on_poll_cadence_changed)
+        self.torrent_manager.import_progress.connect(self.on_import_progress)
+        self.torrent_manager.import_finished.connect(self.on_import_finished)
+        self.torrent_manager.bandwidth_mode_changed.connect(self.on_bandwidth_mode_changed)
+        self.torrent_manager.setting_tuned.connect(self.on_setting_tuned)
+        self.torrent_manager.files_updated.connect(self.on_files_updated)
+        
+        # Progress of a running bulk import
+        self.import_dialog = None
+        
+        # Torrent shown in the Files tab; its file progress is only fetched while the tab is open,
+        # on the manager thread, with at most one request in flight
+        self.files_hash = None
+        self.files_model = None
+        self.files_pending = None
+        self.files_timer = QTimer(self)
+        self.files_timer.setInterval(1000)
+        self.files_timer.timeout.connect(self.request_files)
+        
+        # The manager assumes a visible window until told otherwise
+        self.window_shown = True
         
         self.init_ui()
         self.setup_timer()
         self.setup_system_tray()
         
         # Apply saved settings on startup
+        self.manager_thread.start()
         self.apply_preferences_to_manager()
         
+        # Restore saved torrents once the event loop runs, so the window is
+        # painted before the session is fully loaded
+        QTimer.singleShot(0, self.torrent_manager.restore_session)
+        
     def show_context_menu(self, position):
         """Show context menu for torrent list"""
-        item = self.torrent_list.itemAt(position)
-        if not item:
+        index = self.torrent_list.indexAt(position)
+        if not index.isValid():
             return
             
         # Create context menu
         context_menu = QMenu(self)
         
         # Get torrent info
-        torrent_hash = item.data(0, Qt.UserRole)
+        torrent_hash = self.torrent_model.hash_at(index.row())
         torrent_info = self.torrent_manager.get_torrent_info(torrent_hash) if torrent_hash else {}
         is_paused = torrent_info.get('paused', False)
         state = torrent_info.get('state', '').lower()
@@ -130,20 +213,13 @@ class TorrentClient(QMainWindow):
         
         context_menu.addSeparator()
         
-        # Priority actions (submenu)
-        priority_menu = context_menu.addMenu("⚡ Priority")
-        
-        high_priority_action = QAction("High", self)
-        high_priority_action.triggered.connect(lambda: self.set_torrent_priority('high'))
-        priority_menu.addAction(high_priority_action)
-        
-        normal_priority_action = QAction("Normal", self)
-        normal_priority_action.triggered.connect(lambda: self.set_torrent_priority('normal'))
-        priority_menu.addAction(normal_priority_action)
+        # Queue position actions (submenu)
+        queue_menu = context_menu.addMenu("⚡ Queue")
+        self.add_queue_actions(queue_menu)
         
-        low_priority_action = QAction("Low", self)
-        low_priority_action.triggered.connect(lambda: self.set_torrent_priority('low'))
-        priority_menu.addAction(low_priority_action)
+        # Category actions (submenu)
+        category_menu = context_menu.addMenu("🏷 Category")
+        self.add_category_actions(category_menu, self.torrent_manager.get_torrent_category(torrent_hash))
         
         context_menu.addSeparator()
         
@@ -178,14 +254,15 @@ class TorrentClient(QMainWindow):
         main_layout.addWidget(splitter)
         
         # Create torrent list
-        self.torrent_list = QTreeWidget()
-        self.torrent_list.setHeaderLabels([
-            "Name", "Size", "Progress", "Download Speed", 
-            "Upload Speed", "ETA", "Ratio", "Status"
-        ])
+        self.torrent_model = TorrentTableModel(self)
+        self.torrent_list = QTreeView()
+        self.torrent_list.setModel(self.torrent_model)
         self.torrent_list.setRootIsDecorated(False)
+        self.torrent_list.setUniformRowHeights(True)
         self.torrent_list.setAlternatingRowColors(True)
-        self.torrent_list.itemSelectionChanged.connect(self.on_selection_changed)
+        self.torrent_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.torrent_list.selectionModel().currentChanged.connect(self.on_selection_changed)
+        self.torrent_list.selectionModel().selectionChanged.connect(self.update_selection_totals)
         
         # Enable custom context menu
         self.torrent_list.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -193,21 +270,27 @@ class TorrentClient(QMainWindow):
         
         # Set custom delegate for progress bars
         self.progress_delegate = ProgressBarDelegate()
-        self.torrent_list.setItemDelegateForColumn(2, self.progress_delegate)
+        self.torrent_list.setItemDelegateForColumn(PROGRESS_COLUMN, self.progress_delegate)
         
         splitter.addWidget(self.torrent_list)
         
         # Create details panel
-        details_frame = QFrame()
-        details_layout = QVBoxLayout(details_frame)
+        self.details_tabs = QTabWidget()
         
         self.details_text = QTextEdit()
         self.details_text.setReadOnly(True)
-        self.details_text.setMaximumHeight(200)
-        details_layout.addWidget(QLabel("Torrent Details:"))
-        details_layout.addWidget(self.details_text)
-        
-        splitter.addWidget(details_frame)
+        self.details_tabs.addTab(self.details_text, "Details")
+        
+        # Files of the current torrent with live progress and priorities
+        self.files_view = QTreeView()
+        self.files_view.setUniformRowHeights(True)
+        self.files_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.files_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.files_view.customContextMenuRequested.connect(self.show_files_context_menu)
+        self.details_tabs.addTab(self.files_view, "Files")
+        self.details_tabs.currentChanged.connect(self.update_files_view)
+        
+        splitter.addWidget(self.details_tabs)
         splitter.setSizes([600, 200])
         
         # Create menu bar
@@ -235,6 +318,15 @@ class TorrentClient(QMainWindow):
         add_magnet_action.triggered.connect(self.add_magnet_link)
         file_menu.addAction(add_magnet_action)
         
+        import_files_action = QAction("Import Torrent Files...", self)
+        import_files_action.setShortcut("Ctrl+I")
+        import_files_action.triggered.connect(self.import_torrent_files)
+        file_menu.addAction(import_files_action)
+        
+        import_folder_action = QAction("Import Torrent Folder...", self)
+        import_folder_action.triggered.connect(self.import_torrent_folder)
+        file_menu.addAction(import_folder_action)
+        
         file_menu.addSeparator()
         
         exit_action = QAction("Exit", self)
@@ -260,6 +352,9 @@ class TorrentClient(QMainWindow):
         self.remove_action.setEnabled(False)
         torrent_menu.addAction(self.remove_action)
         
+        torrent_menu.addSeparator()
+        self.add_queue_actions(torrent_menu.addMenu("Queue"))
+        
         # Tools menu
         tools_menu = menubar.addMenu("Tools")
         
@@ -267,6 +362,14 @@ class TorrentClient(QMainWindow):
         preferences_action.triggered.connect(self.show_preferences)
         tools_menu.addAction(preferences_action)
         
+        categories_action = QAction("Categories...", self)
+        categories_action.triggered.connect(self.show_categories)
+        tools_menu.addAction(categories_action)
+        
+        tuning_log_action = QAction("Auto-Tuning Log...", self)
+        tuning_log_action.triggered.connect(self.show_tuning_log)
+        tools_menu.addAction(tuning_log_action)
+        
     def create_toolbar(self):
         toolbar = QToolBar()
         self.addToolBar(toolbar)
@@ -303,10 +406,20 @@ class TorrentClient(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         
-        # Add download/upload speed indicators
+        # Add selection totals and download/upload speed indicators
+        self.selection_label = QLabel("")
         self.download_speed_label = QLabel("⬇ 0 KB/s")
         self.upload_speed_label = QLabel("⬆ 0 KB/s")
         
+        # One-click switch to the alternative rate limits
+        self.alt_limits_btn = QPushButton("🐢")
+        self.alt_limits_btn.setCheckable(True)
+        self.alt_limits_btn.setFlat(True)
+        self.alt_limits_btn.setToolTip("Alternative rate limits: off")
+        self.alt_limits_btn.clicked.connect(self.toggle_alt_limits)
+        
+        self.status_bar.addPermanentWidget(self.selection_label)
+        self.status_bar.addPermanentWidget(self.alt_limits_btn)
         self.status_bar.addPermanentWidget(self.download_speed_label)
         self.status_bar.addPermanentWidget(self.upload_speed_label)
         
@@ -314,7 +427,13 @@ class TorrentClient(QMainWindow):
         """Setup timer for updating torrent information"""
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_torrents)
-        self.update_timer.start(1000)  # Update every second
+        self.update_timer.start(self.torrent_manager.get_poll_stats()['interval_ms'])
+        
+        # Coalesces torrent updates to at most one model update per frame
+        self.pending_updates = {}
+        self.apply_updates_timer = QTimer()
+        self.apply_updates_timer.setSingleShot(True)
+        self.apply_updates_timer.timeout.connect(self.apply_pending_updates)
         
     def setup_system_tray(self):
         """Setup system tray icon and menu"""
@@ -394,23 +513,27 @@ class TorrentClient(QMainWindow):
     def update_tray_tooltip(self):
         """Update system tray tooltip with current stats"""
         if hasattr(self, 'tray_icon'):
-            active_torrents = len(self.torrent_manager.torrent_handles)
-            total_download = sum(info.get('download_rate', 0) 
-                               for info in self.torrent_manager.get_all_torrent_info().values())
-            total_upload = sum(info.get('upload_rate', 0) 
-                             for info in self.torrent_manager.get_all_torrent_info().values())
-            
-            tooltip = f"PyTorrent - {active_torrents} torrents\n"
-            tooltip += f"⬇ {self.format_speed(total_download)} | ⬆ {self.format_speed(total_upload)}"
+            stats = self.torrent_manager.get_session_stats()
+            
+            tooltip = f"PyTorrent - {self.torrent_manager.torrent_count()} torrents\n"
+            tooltip += f"⬇ {self.format_speed(stats['download_rate'])} | ⬆ {self.format_speed(stats['upload_rate'])}"
             self.tray_icon.setToolTip(tooltip)
             
     def quit_application(self):
         """Properly quit the application"""
         if hasattr(self, 'tray_icon'):
             self.tray_icon.hide()
-        self.torrent_manager.shutdown()
+        self.shutdown_manager()
         QApplication.quit()
         
+    def shutdown_manager(self):
+        """Shut the torrent manager down on its thread and stop the thread"""
+        if not self.manager_thread.isRunning():
+            return
+        QMetaObject.invokeMethod(self.torrent_manager, 'shutdown', Qt.BlockingQueuedConnection)
+        self.manager_thread.quit()
+        self.manager_thread.wait()
+        
     def add_torrent_file(self):
         """Add torrent from file"""
         file_path, _ = QFileDialog.getOpenFileName(
@@ -421,7 +544,7 @@ class TorrentClient(QMainWindow):
             if dialog.exec_():
                 download_path = dialog.get_download_path()
                 selected_files = dialog.get_selected_files()
-                self.torrent_manager.add_torrent_file(file_path, download_path, selected_files)
+                self.add_torrent_file_requested.emit(file_path, download_path, selected_files)
                 
     def add_magnet_link(self):
         """Add torrent from magnet link"""
@@ -429,58 +552,122 @@ class TorrentClient(QMainWindow):
             self, "Add Magnet Link", "Enter magnet link:"
         )
         if ok and magnet_link:
-            dialog = AddTorrentDialog(magnet_link, self)
+            dialog = AddTorrentDialog(magnet_link, self, self.torrent_manager)
             if dialog.exec_():
                 download_path = dialog.get_download_path()
-                self.torrent_manager.add_magnet_link(magnet_link, download_path)
+                selected_files = dialog.get_selected_files()
+                self.add_magnet_link_requested.emit(magnet_link, download_path, selected_files)
                 
+    def import_torrent_files(self):
+        """Bulk import torrent files without the add dialog"""
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Import Torrent Files", "", "Torrent files (*.torrent)"
+        )
+        if file_paths:
+            self.start_import(file_paths)
+            
+    def import_torrent_folder(self):
+        """Bulk import every torrent file in a folder and its subfolders"""
+        folder = QFileDialog.getExistingDirectory(self, "Import Torrent Folder")
+        if folder:
+            self.start_import([folder])
+            
+    def start_import(self, paths):
+        """Start a bulk import into the default download folder"""
+        if self.import_dialog is not None:
+            QMessageBox.information(self, "Import Torrents", "An import is already running.")
+            return
+        self.import_dialog = QProgressDialog("Looking for torrent files...", "Cancel", 0, 0, self)
+        self.import_dialog.setWindowTitle("Import Torrents")
+        self.import_dialog.setMinimumDuration(500)
+        self.import_dialog.setAutoClose(False)
+        self.import_dialog.setAutoReset(False)
+        self.import_dialog.canceled.connect(self.on_import_canceled)
+        self.import_requested.emit(paths, None)
+        
+    def on_import_progress(self, processed, total, rate):
+        """Handle bulk import progress"""
+        if self.import_dialog is None:
+            return
+        self.import_dialog.setMaximum(total)
+        self.import_dialog.setValue(processed)
+        self.import_dialog.setLabelText(f"Imported {processed} of {total} files ({rate:.0f} torrents/s)")
+        
+    def on_import_canceled(self):
+        """Stop the running bulk import"""
+        if self.import_dialog is not None:
+            self.torrent_manager.cancel_import()
+            
+    def on_import_finished(self, summary):
+        """Handle bulk import completion"""
+        if self.import_dialog is not None:
+            # Closing a progress dialog emits canceled, so forget it first
+            dialog = self.import_dialog
+            self.import_dialog = None
+            dialog.close()
+            
+        message = (f"Imported {summary['added']} torrents in {summary['seconds']:.1f}s "
+                   f"({summary['rate']:.0f} torrents/s), {summary['skipped']} already added, "
+                   f"{len(summary['failed'])} failed")
+        if summary['cancelled']:
+            message += " (cancelled)"
+        self.status_bar.showMessage(message, 10000)
+        
+        if summary['failed']:
+            failures = "\n".join(f"{os.path.basename(path)}: {error}" for path, error in summary['failed'][:20])
+            if len(summary['failed']) > 20:
+                failures += f"\n... and {len(summary['failed']) - 20} more"
+            QMessageBox.warning(self, "Import Torrents", f"{message}.\n\n{failures}")
+            
+    def current_torrent_hash(self):
+        """Get the info hash of the current torrent, or None"""
+        index = self.torrent_list.currentIndex()
+        if not index.isValid():
+            return None
+        return self.torrent_model.hash_at(index.row())
+        
     def pause_torrent(self):
         """Pause selected torrent"""
-        current_item = self.torrent_list.currentItem()
-        if current_item:
-            torrent_hash = current_item.data(0, Qt.UserRole)
-            self.torrent_manager.pause_torrent(torrent_hash)
+        torrent_hash = self.current_torrent_hash()
+        if torrent_hash:
+            self.pause_requested.emit(torrent_hash)
             
     def resume_torrent(self):
         """Resume selected torrent"""
-        current_item = self.torrent_list.currentItem()
-        if current_item:
-            torrent_hash = current_item.data(0, Qt.UserRole)
-            self.torrent_manager.resume_torrent(torrent_hash)
+        torrent_hash = self.current_torrent_hash()
+        if torrent_hash:
+            self.resume_requested.emit(torrent_hash)
             
     def remove_torrent(self):
         """Remove selected torrent"""
-        current_item = self.torrent_list.currentItem()
-        if current_item:
-            torrent_name = current_item.text(0)
+        torrent_hash = self.current_torrent_hash()
+        if torrent_hash:
+            torrent_name = self.torrent_model.info(torrent_hash).get('name', 'Unknown')
             reply = QMessageBox.question(
                 self, "Remove Torrent", 
                 f"Are you sure you want to remove '{torrent_name}'?",
                 QMessageBox.Yes | QMessageBox.No
             )
             if reply == QMessageBox.Yes:
-                torrent_hash = current_item.data(0, Qt.UserRole)
-                self.torrent_manager.remove_torrent(torrent_hash)
+                self.remove_requested.emit(torrent_hash, False)
                 
     def remove_torrent_and_data(self):
         """Remove selected torrent and delete files"""
-        current_item = self.torrent_list.currentItem()
-        if current_item:
-            torrent_name = current_item.text(0)
+        torrent_hash = self.current_torrent_hash()
+        if torrent_hash:
+            torrent_name = self.torrent_model.info(torrent_hash).get('name', 'Unknown')
             reply = QMessageBox.question(
                 self, "Remove Torrent + Data", 
                 f"Are you sure you want to remove '{torrent_name}' AND DELETE ALL FILES?",
                 QMessageBox.Yes | QMessageBox.No
             )
             if reply == QMessageBox.Yes:
-                torrent_hash = current_item.data(0, Qt.UserRole)
-                self.torrent_manager.remove_torrent(torrent_hash, delete_files=True)
+                self.remove_requested.emit(torrent_hash, True)
                 
     def open_download_folder(self):
         """Open download folder for selected torrent"""
-        current_item = self.torrent_list.currentItem()
-        if current_item:
-            torrent_hash = current_item.data(0, Qt.UserRole)
+        torrent_hash = self.current_torrent_hash()
+        if torrent_hash:
             torrent_info = self.torrent_manager.get_torrent_info(torrent_hash)
             if torrent_info and 'save_path' in torrent_info:
                 import subprocess
@@ -499,64 +686,138 @@ class TorrentClient(QMainWindow):
                     
     def copy_magnet_link(self):
         """Copy magnet link for selected torrent"""
-        current_item = self.torrent_list.currentItem()
-        if current_item:
-            torrent_hash = current_item.data(0, Qt.UserRole)
+        torrent_hash = self.current_torrent_hash()
+        if torrent_hash:
             # For now, just show a placeholder message
             # In a real implementation, we'd need to store the original magnet link
             # or generate one from the torrent info
             QApplication.clipboard().setText(f"magnet:?xt=urn:btih:{torrent_hash}")
             self.status_bar.showMessage("Magnet link copied to clipboard", 2000)
             
-    def set_torrent_priority(self, priority):
-        """Set priority for selected torrent"""
-        current_item = self.torrent_list.currentItem()
-        if current_item:
-            torrent_hash = current_item.data(0, Qt.UserRole)
-            # This would need to be implemented in torrent_manager
-            self.status_bar.showMessage(f"Priority set to {priority}", 2000)
+    def add_queue_actions(self, menu):
+        """Add the queue position moves for the selected torrents to a menu"""
+        moves = [("Move to Top", 'top', "Ctrl+Shift+Up"), ("Move Up", 'up', "Ctrl+Up"),
+                 ("Move Down", 'down', "Ctrl+Down"), ("Move to Bottom", 'bottom', "Ctrl+Shift+Down")]
+        for label, direction, shortcut in moves:
+            action = QAction(label, self)
+            action.setShortcut(shortcut)
+            action.triggered.connect(lambda checked, direction=direction: self.move_queue(direction))
+            menu.addAction(action)
+            
+    def move_queue(self, direction):
+        """Move the selected torrents in the download queue"""
+        torrent_hashes = self.selected_torrent_hashes()
+        if torrent_hashes:
+            self.queue_move_requested.emit(torrent_hashes, direction)
                 
+    def add_category_actions(self, menu, current):
+        """Add a choice of category for the selected torrents to a menu"""
+        names = [None] + sorted(self.torrent_manager.get_categories())
+        for name in names:
+            action = QAction(name if name is not None else "None", self)
+            action.setCheckable(True)
+            action.setChecked(name == current)
+            action.triggered.connect(lambda checked, name=name: self.set_category(name))
+            menu.addAction(action)
+            
+        menu.addSeparator()
+        manage_action = QAction("Manage Categories...", self)
+        manage_action.triggered.connect(self.show_categories)
+        menu.addAction(manage_action)
+        
+    def set_category(self, name):
+        """Put the selected torrents in a category (moving them to its save path)"""
+        torrent_hashes = self.selected_torrent_hashes()
+        if torrent_hashes:
+            self.category_requested.emit(torrent_hashes, name)
+            
+    def show_categories(self):
+        """Show the category editor"""
+        dialog = CategoryDialog(self.torrent_manager.get_categories(), self)
+        if dialog.exec_():
+            self.categories_requested.emit(dialog.categories(), dialog.removed())
+            
+    def on_setting_tuned(self, entry):
+        """Tell the user what the auto-tuner changed and why"""
+        self.status_bar.showMessage(
+            f"Auto-tuned {entry['setting']}: {entry['old']} → {entry['new']} ({entry['reason']})", 5000)
+        
+    def show_tuning_log(self):
+        """Show the auto-tuner's changes with their reasons"""
+        state = self.torrent_manager.get_auto_tune_state()
+        lines = [f"Auto-tuning is {'on' if state['enabled'] else 'off'}", ""]
+        for entry in self.torrent_manager.get_tuning_log():
+            when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['time']))
+            lines.append(f"{when}  {entry['setting']}: {entry['old']} → {entry['new']}  ({entry['reason']})")
+        if state['enabled']:
+            lines.append("")
+            lines.extend(f"{name} = {value}" for name, value in sorted(state['values'].items()))
+            
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Auto-Tuning Log")
+        dialog.resize(800, 400)
+        layout = QVBoxLayout(dialog)
+        log_text = QTextEdit()
+        log_text.setReadOnly(True)
+        log_text.setPlainText("\n".join(lines))
+        layout.addWidget(log_text)
+        button_box = QDialogButtonBox(QDialogButtonBox.Close)
+        button_box.rejected.connect(dialog.reject)
+        layout.addWidget(button_box)
+        dialog.exec_()
+        
     def show_preferences(self):
         """Show preferences dialog"""
-        dialog = PreferencesDialog(self)
+        settings = QSettings(ORGANIZATION, APPLICATION)
+        alt_limits = settings.value("bandwidth/alt_limits", False, type=bool)
+        dialog = PreferencesDialog(self, self.torrent_manager.get_performance_settings())
         if dialog.exec_():
             # Apply settings to torrent manager
             self.apply_preferences_to_manager()
+            # The schedule ignores the stored toggle, so a change made in the dialog is sent as a toggle
+            if settings.value("bandwidth/alt_limits", False, type=bool) != alt_limits:
+                self.alt_limits_requested.emit(not alt_limits)
             
     def apply_preferences_to_manager(self):
         """Apply settings from preferences to torrent manager"""
-        settings = QSettings("PyTorrent", "PyTorrent")
-        
-        # Collect all settings into a dictionary
-        settings_dict = {
-            # Connection settings
-            'port': settings.value("connection/port", 6881, type=int),
-            'enable_dht': settings.value("connection/enable_dht", True, type=bool),
-            'enable_lsd': settings.value("connection/enable_lsd", True, type=bool),
-            'enable_upnp': settings.value("connection/upnp", True, type=bool),
-            'enable_natpmp': settings.value("connection/upnp", True, type=bool),  # Use same setting as UPnP
-            'max_connections': settings.value("connection/max_connections", 200, type=int),
-            'max_uploads': settings.value("connection/max_uploads", 4, type=int),
-            
-            # Bandwidth settings
-            'limit_download': settings.value("bandwidth/limit_download", False, type=bool),
-            'download_limit': settings.value("bandwidth/download_limit", 1000, type=int),
-            'limit_upload': settings.value("bandwidth/limit_upload", False, type=bool),
-            'upload_limit': settings.value("bandwidth/upload_limit", 100, type=int),
-        }
+        preferences = load_preferences(QSettings(ORGANIZATION, APPLICATION))
         
         # Apply to torrent manager
-        self.torrent_manager.apply_session_settings(settings_dict)
+        self.session_settings_requested.emit(preferences['session'])
         
         # Update default download path
-        download_path = settings.value("downloads/default_path", 
-                                     os.path.join(os.path.expanduser('~'), 'Downloads', 'PyTorrent'))
-        self.torrent_manager.set_download_path(download_path)
+        self.download_path_requested.emit(preferences['download_path'])
+        
+        # Resume data checkpoint interval
+        self.checkpoint_interval_requested.emit(preferences['resume_interval'])
+        
+        # How many torrents run at once
+        self.queue_settings_requested.emit(preferences['queue'])
+        
+        # Alternative rate limits and when they apply
+        self.bandwidth_schedule_requested.emit(preferences['bandwidth_schedule'])
+        
+        # Disk and buffer performance profile
+        self.performance_requested.emit(preferences['performance'])
+        
+        # Watch folder
+        self.watch_folder_requested.emit(preferences['watch_folder'], preferences['watch_polling'])
+        
+    def toggle_alt_limits(self, checked):
+        """Switch alternative rate limits on or off from the status bar"""
+        QSettings(ORGANIZATION, APPLICATION).setValue("bandwidth/alt_limits", checked)
+        self.alt_limits_requested.emit(checked)
+        
+    def on_bandwidth_mode_changed(self, mode, alternative):
+        """Show which rate limits are in force (the schedule may switch them)"""
+        QSettings(ORGANIZATION, APPLICATION).setValue("bandwidth/alt_limits", alternative)
+        self.alt_limits_btn.setChecked(alternative)
+        self.alt_limits_btn.setToolTip(f"Alternative rate limits: {'on' if alternative else 'off'} ({mode})")
         
     def on_selection_changed(self):
         """Handle torrent selection change"""
-        current_item = self.torrent_list.currentItem()
-        has_selection = current_item is not None
+        torrent_hash = self.current_torrent_hash()
+        has_selection = torrent_hash is not None
         
         # Enable/disable actions based on selection
         self.pause_action.setEnabled(has_selection)
@@ -567,14 +828,30 @@ class TorrentClient(QMainWindow):
         self.remove_btn.setEnabled(has_selection)
         
         # Update details panel
-        if current_item:
-            torrent_hash = current_item.data(0, Qt.UserRole)
+        if torrent_hash:
             torrent_info = self.torrent_manager.get_torrent_info(torrent_hash)
             if torrent_info:
                 self.update_details_panel(torrent_info)
         else:
             self.details_text.clear()
+        self.update_files_view()
             
+    def selected_torrent_hashes(self):
+        """Get the info hashes of all selected rows"""
+        return [self.torrent_model.hash_at(index.row())
+                for index in self.torrent_list.selectionModel().selectedRows()]
+        
+    def update_selection_totals(self):
+        """Show totals for the selection when more than one torrent is selected"""
+        selected = self.selected_torrent_hashes()
+        if len(selected) < 2:
+            self.selection_label.clear()
+            return
+        totals = self.torrent_manager.get_selection_totals(selected)
+        self.selection_label.setText(
+            f"{totals['count']} selected: {self.format_size(totals['total_size'])} | "
+            f"⬇ {self.format_speed(totals['download_rate'])} | ⬆ {self.format_speed(totals['upload_rate'])}")
+        
     def update_details_panel(self, torrent_info):
         """Update the details panel with torrent information"""
         details = f"""
@@ -587,39 +864,139 @@ Ratio: {torrent_info.get('ratio', 0):.2f}
 Peers: {torrent_info.get('num_peers', 0)}
 Seeds: {torrent_info.get('num_seeds', 0)}
 Save Path: {torrent_info.get('save_path', 'N/A')}
+Category: {self.torrent_manager.get_torrent_category(torrent_info.get('hash')) or 'None'}
 """
         self.details_text.setPlainText(details.strip())
         
+    def update_files_view(self):
+        """Show the current torrent's files, refreshed while the Files tab can be seen"""
+        if not self.window_shown or self.details_tabs.currentWidget() is not self.files_view:
+            self.files_timer.stop()
+            return
+            
+        torrent_hash = self.current_torrent_hash()
+        if torrent_hash != self.files_hash:
+            self.files_hash = torrent_hash
+            self.load_files_view(None)
+        self.request_files()
+        self.files_timer.start()
+        
+    def load_files_view(self, files):
+        """Build the file tree from [(path, size)], or empty it for None"""
+        old_model = self.files_model
+        self.files_model = TorrentFilesModel(files, self) if files else None
+        self.files_view.setModel(self.files_model)
+        if old_model is not None:
+            old_model.deleteLater()
+        if self.files_model is None:
+            return
+            
+        self.files_model.priority_requested.connect(self.on_file_priority_requested)
+        self.files_view.setColumnWidth(0, 400)
+        if len(files) <= EXPAND_ALL_MAX_FILES:
+            self.files_view.expandAll()
+            
+    def request_files(self):
+        """Ask the manager for per-file progress and priorities of the torrent in the Files tab"""
+        if self.files_hash is None or self.files_pending == self.files_hash:
+            return
+        self.files_pending = self.files_hash
+        # Without a tree yet (new torrent, or a magnet link whose metadata may have arrived) the file list too
+        self.files_requested.emit(self.files_hash, self.files_model is None)
+        
+    def on_files_updated(self, torrent_hash, files, file_progress):
+        """Show files and progress fetched on the manager thread"""
+        if torrent_hash == self.files_pending:
+            self.files_pending = None
+        if torrent_hash != self.files_hash:
+            return
+        if files and self.files_model is None:
+            self.load_files_view(files)
+        if file_progress is not None and self.files_model is not None:
+            self.files_model.update(file_progress['progress'], file_progress['priorities'])
+            
+    def on_file_priority_requested(self, files, priority):
+        """Apply priorities changed in the Files tab"""
+        if self.files_hash is not None:
+            self.file_priority_requested.emit(self.files_hash, files, priority)
+            
+    def show_files_context_menu(self, position):
+        """Set the priority of the selected files and folders"""
+        if self.files_model is None:
+            return
+        indexes = self.files_view.selectionModel().selectedRows()
+        if not indexes:
+            return
+            
+        context_menu = QMenu(self)
+        priority_menu = context_menu.addMenu("⚡ Priority")
+        for label, level in [("High", 'high'), ("Normal", 'normal'), ("Low", 'low'), ("Skip", 'skip')]:
+            action = QAction(label, self)
+            action.triggered.connect(
+                lambda checked, level=level: self.files_model.set_priority(indexes, PRIORITY_LEVELS[level]))
+            priority_menu.addAction(action)
+        context_menu.exec_(self.files_view.viewport().mapToGlobal(position))
+        
     def on_torrent_added(self, torrent_hash, torrent_info):
         """Handle torrent added signal"""
-        item = QTreeWidgetItem()
-        item.setData(0, Qt.UserRole, torrent_hash)
-        self.update_torrent_item(item, torrent_info)
-        self.torrent_list.addTopLevelItem(item)
+        self.torrent_model.add_torrent(torrent_hash, torrent_info)
         self.status_bar.showMessage(f"Added torrent: {torrent_info.get('name', 'Unknown')}")
         
-    def on_torrent_updated(self, torrent_hash, torrent_info):
-        """Handle torrent updated signal"""
-        # Find the item with this hash
-        for i in range(self.torrent_list.topLevelItemCount()):
-            item = self.torrent_list.topLevelItem(i)
-            if item.data(0, Qt.UserRole) == torrent_hash:
-                self.update_torrent_item(item, torrent_info)
-                break
-                
-        # Update details panel if this torrent is selected
-        current_item = self.torrent_list.currentItem()
-        if current_item and current_item.data(0, Qt.UserRole) == torrent_hash:
-            self.update_details_panel(torrent_info)
+    def on_torrents_added(self, torrents):
+        """Handle a batch of restored or batch-added torrents"""
+        # Insert the whole batch with one layout pass
+        self.torrent_model.add_torrents(torrents)
+        self.status_bar.showMessage(f"Loaded {len(torrents)} torrents ({self.torrent_model.rowCount()} total)")
+        
+    def on_session_restored(self, count, seconds):
+        """Handle session restore completion"""
+        self.status_bar.showMessage(f"Restored {count} torrents in {seconds:.1f}s", 5000)
+        
+    def on_torrents_updated(self, changes):
+        """Handle the batched torrents updated signal"""
+        # Keep the newest info, but the fields changed in any tick since the last apply
+        for torrent_hash, (torrent_info, mask) in changes.items():
+            pending = self.pending_updates.get(torrent_hash)
+            if pending is not None:
+                mask |= pending[1]
+            self.pending_updates[torrent_hash] = (torrent_info, mask)
+        if not self.apply_updates_timer.isActive():
+            self.apply_updates_timer.start(UPDATE_THROTTLE_MS)
+            
+    def apply_pending_updates(self):
+        """Apply coalesced updates, repainting only rows in the viewport"""
+        changes = self.pending_updates
+        self.pending_updates = {}
+        
+        first_row, last_row = self.visible_rows()
+        self.torrent_model.update_torrents(changes, first_row, last_row)
+        
+        # Update details panel if the selected torrent changed
+        torrent_hash = self.current_torrent_hash()
+        if torrent_hash in changes:
+            self.update_details_panel(changes[torrent_hash][0])
             
+    def visible_rows(self):
+        """Get the (first, last) rows in the viewport, (-1, -1) if none"""
+        if not self.isVisible():
+            return -1, -1
+            
+        viewport = self.torrent_list.viewport()
+        first = self.torrent_list.indexAt(QPoint(0, 0)).row()
+        if first < 0:
+            return -1, -1
+        last = self.torrent_list.indexAt(QPoint(0, viewport.height() - 1)).row()
+        if last < 0:
+            last = self.torrent_model.rowCount() - 1
+        return first, last
+        
     def on_torrent_removed(self, torrent_hash):
         """Handle torrent removed signal"""
-        # Find and remove the item with this hash
-        for i in range(self.torrent_list.topLevelItemCount()):
-            item = self.torrent_list.topLevelItem(i)
-            if item.data(0, Qt.UserRole) == torrent_hash:
-                self.torrent_list.takeTopLevelItem(i)
-                break
+        self.torrent_model.remove_torrent(torrent_hash)
+        
+    def on_torrents_removed(self, torrent_hashes):
+        """Handle a batch of removed torrents"""
+        self.torrent_model.remove_torrents(torrent_hashes)
                 
     def on_error_occurred(self, title, message):
         """Handle error signal from torrent manager"""
@@ -663,68 +1040,77 @@ Save Path: {torrent_info.get('save_path', 'N/A')}
         # Auto-close after 5 seconds
         QTimer.singleShot(5000, msg.close)
                 
-    def update_torrent_item(self, item, torrent_info):
-        """Update a torrent item in the list"""
-        item.setText(0, torrent_info.get('name', 'Unknown'))
-        item.setText(1, self.format_size(torrent_info.get('total_size', 0)))
-        item.setText(2, f"{torrent_info.get('progress', 0):.1f}%")
-        item.setText(3, f"{self.format_speed(torrent_info.get('download_rate', 0))}")
-        item.setText(4, f"{self.format_speed(torrent_info.get('upload_rate', 0))}")
-        item.setText(5, self.format_eta(torrent_info.get('eta', 0)))
-        item.setText(6, f"{torrent_info.get('ratio', 0):.2f}")
-        item.setText(7, torrent_info.get('state', 'Unknown'))
-        
-        # Store state in progress column for custom delegate
-        item.setData(2, Qt.UserRole, torrent_info.get('state', 'Unknown'))
-        
     def update_torrents(self):
-        """Update all torrent information"""
-        self.torrent_manager.update_torrents()
-        
+        """Update global statistics (the manager polls torrents on its own thread)"""
+        # Only the tray tooltip is visible while the window is hidden
+        if not self.window_shown:
+            self.update_tray_tooltip()
+            return
+            
         # Update global download/upload speeds
-        total_download = sum(info.get('download_rate', 0) 
-                           for info in self.torrent_manager.get_all_torrent_info().values())
-        total_upload = sum(info.get('upload_rate', 0) 
-                         for info in self.torrent_manager.get_all_torrent_info().values())
-        
-        self.download_speed_label.setText(f"⬇ {self.format_speed(total_download)}")
-        self.upload_speed_label.setText(f"⬆ {self.format_speed(total_upload)}")
+        stats = self.torrent_manager.get_session_stats()
+        self.download_speed_label.setText(f"⬇ {self.format_speed(stats['download_rate'])}")
+        self.upload_speed_label.setText(f"⬆ {self.format_speed(stats['upload_rate'])}")
+        
+        # Overhead, DHT and disk details, plus the polling cadence and cost
+        # for checking idle CPU use
+        poll_stats = self.torrent_manager.get_poll_stats()
+        tooltip = (
+            f"Overhead: ⬇ {self.format_speed(stats['download_overhead_rate'])} | "
+            f"⬆ {self.format_speed(stats['upload_overhead_rate'])}\n"
+            f"DHT: {stats['dht_nodes']} nodes, ⬇ {self.format_speed(stats['dht_download_rate'])} | "
+            f"⬆ {self.format_speed(stats['dht_upload_rate'])}\n"
+            f"Peers: {stats['num_peers']}\n"
+            f"Disk queue: {stats['disk_queued_jobs']} jobs, {self.format_size(stats['disk_queued_write_bytes'])}\n"
+            f"Polling every {poll_stats['interval_ms']} ms ({poll_stats['mode']}), "
+            f"last tick {poll_stats['last_tick_ms']:.2f} ms, average {poll_stats['average_tick_ms']:.2f} ms")
+        self.download_speed_label.setToolTip(tooltip)
+        self.upload_speed_label.setToolTip(tooltip)
+        
+        self.update_selection_totals()
         
         # Update tray tooltip
         self.update_tray_tooltip()
         
+    def on_poll_cadence_changed(self, mode, interval_ms):
+        """Refresh the global statistics at the manager's polling cadence"""
+        self.update_timer.setInterval(interval_ms)
+        
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.on_window_visibility_changed()
+        
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.on_window_visibility_changed()
+        
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.on_window_visibility_changed()
+            
+    def on_window_visibility_changed(self):
+        """Tell the manager whether the torrent list can be seen"""
+        shown = self.isVisible() and not self.isMinimized()
+        if shown == self.window_shown:
+            return
+        self.window_shown = shown
+        self.window_visibility_requested.emit(shown)
+        self.update_files_view()
+        if shown:
+            self.update_torrents()
+        
     def format_size(self, size_bytes):
         """Format file size in human readable format"""
-        if size_bytes == 0:
-            return "0 B"
-        
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} PB"
+        return format_size(size_bytes)
         
     def format_speed(self, speed_bytes):
         """Format speed in human readable format"""
-        return f"{self.format_size(speed_bytes)}/s"
+        return format_speed(speed_bytes)
         
     def format_eta(self, eta_seconds):
         """Format ETA in human readable format"""
-        if eta_seconds <= 0:
-            return "∞"
-        
-        if eta_seconds < 60:
-            return f"{int(eta_seconds)}s"
-        elif eta_seconds < 3600:
-            return f"{int(eta_seconds // 60)}m {int(eta_seconds % 60)}s"
-        elif eta_seconds < 86400:
-            hours = int(eta_seconds // 3600)
-            minutes = int((eta_seconds % 3600) // 60)
-            return f"{hours}h {minutes}m"
-        else:
-            days = int(eta_seconds // 86400)
-            hours = int((eta_seconds % 86400) // 3600)
-            return f"{days}d {hours}h"
+        return format_eta(eta_seconds)
             
     def closeEvent(self, event):
         """Handle application close"""
@@ -744,7 +1130,7 @@ Save Path: {torrent_info.get('save_path', 'N/A')}
             event.ignore()
         else:
             # No system tray, actually exit
-            self.torrent_manager.shutdown()
+            self.shutdown_manager()
             event.accept()
             
     def dragEnterEvent(self, event: QDragEnterEvent):
@@ -782,12 +1168,14 @@ Save Path: {torrent_info.get('save_path', 'N/A')}
         """Handle drop events"""
         if event.mimeData().hasUrls():
             urls = event.mimeData().urls()
-            for url in urls:
-                if url.isLocalFile():
-                    file_path = url.toLocalFile()
-                    if file_path.lower().endswith('.torrent'):
-                        # Process torrent file
-                        self.process_dropped_torrent(file_path)
+            file_paths = [url.toLocalFile() for url in urls
+                          if url.isLocalFile() and url.toLocalFile().lower().endswith('.torrent')]
+            if len(file_paths) == 1:
+                # Process torrent file
+                self.process_dropped_torrent(file_paths[0])
+            elif file_paths:
+                # Many files at once skip the add dialog
+                self.start_import(file_paths)
                         
         elif event.mimeData().hasText():
             text = event.mimeData().text().strip()
@@ -804,7 +1192,7 @@ Save Path: {torrent_info.get('save_path', 'N/A')}
             if dialog.exec_():
                 download_path = dialog.get_download_path()
                 selected_files = dialog.get_selected_files()
-                self.torrent_manager.add_torrent_file(file_path, download_path, selected_files)
+                self.add_torrent_file_requested.emit(file_path, download_path, selected_files)
                 self.status_bar.showMessage(f"Added torrent: {os.path.basename(file_path)}", 3000)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to add torrent: {str(e)}")
@@ -812,10 +1200,11 @@ Save Path: {torrent_info.get('save_path', 'N/A')}
     def process_dropped_magnet(self, magnet_link):
         """Process a dropped magnet link"""
         try:
-            dialog = AddTorrentDialog(magnet_link, self)
+            dialog = AddTorrentDialog(magnet_link, self, self.torrent_manager)
             if dialog.exec_():
                 download_path = dialog.get_download_path()
-                self.torrent_manager.add_magnet_link(magnet_link, download_path)
+                selected_files = dialog.get_selected_files()
+                self.add_magnet_link_requested.emit(magnet_link, download_path, selected_files)
                 self.status_bar.showMessage("Added magnet link", 3000)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to add magnet link: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,1381 @@
+"""
+Torrent Core - Handles all torrent operations using libtorrent, without Qt
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import libtorrent as lt
+import numpy as np
+
+from event_bus import EventBus
+from status_engine import StatusEngine, placeholder_info
+from status_table import StatusTable, STATE_CODES
+from poll_scheduler import PollScheduler
+from session_stats import SessionStats
+from alert_dispatcher import AlertDispatcher
+from resume_checkpointer import ResumeCheckpointer, metainfo_bytes
+from session_store import SessionStore, add_params_from_record
+from bulk_import import find_torrent_files, parse_torrent_files, IMPORT_BATCH_SIZE
+from watch_folder import WatchFolder
+from metadata_cache import MetadataCache
+from magnet_resolver import MagnetResolver, MetadataQueue, torrent_summary, PRIORITY_NORMAL, PRIORITY_HIGH
+from file_priorities import PRIORITY_LEVELS, parse_priority, select_files
+from queue_manager import QueueManager
+from bandwidth_scheduler import BandwidthScheduler
+from categories import CategoryManager
+from performance_profiles import (PROFILES, DEFAULT_PROFILE, profile_settings,
+                                  parse_overrides, convert_overrides)
+from auto_tuner import AutoTuner, TUNED_SETTINGS
+
+# Number of torrents handed to async_add_torrent / the GUI at a time during restore
+RESTORE_BATCH_SIZE = 500
+
+# Alert categories the dispatcher needs (completion, metadata, errors, resume data)
+ALERT_MASK = (lt.alert.category_t.status_notification |
+              lt.alert.category_t.error_notification |
+              lt.alert.category_t.storage_notification)
+
+# Torrents in these states move data and get a share of their category's bandwidth
+TRANSFERRING_STATES = [STATE_CODES[state] for state in ('Downloading metadata', 'Downloading', 'Finished', 'Seeding')]
+
+# Least time between two rebalances of the per-torrent category limits
+CATEGORY_REBALANCE_INTERVAL = 1.0
+
+# Events published on TorrentCore.events, with their arguments
+EVENTS = {
+    'torrent_added': (str, dict),  # hash, info
+    'torrents_added': (list,),  # [(hash, info)] restored in one batch
+    'session_restored': (int, float),  # torrent count, seconds
+    'torrents_updated': (dict,),  # {hash: (info, FIELD_BITS mask)} for every torrent changed this tick
+    'torrent_removed': (str,),  # hash
+    'torrents_removed': (list,),  # [hash] removed in one batch
+    'error_occurred': (str, str),  # title, message
+    'torrent_completed': (str, dict),  # hash, info
+    'poll_cadence_changed': (str, int),  # mode, interval ms
+    'import_progress': (int, int, float),  # files processed, total, files per second
+    'import_finished': (dict,),  # bulk import summary, see _import_torrents
+    'metadata_resolved': (str, dict),  # hash, {'name', 'total_size', 'files': [(path, size)]}
+    'bandwidth_mode_changed': (str, bool),  # 'normal', 'alternative' or 'unlimited', alternative limits on
+    'setting_tuned': (dict,)  # auto-tuner log entry: 'time', 'setting', 'old', 'new', 'reason'
+}
+
+
+class TorrentCore:
+    """The torrent engine: session, status polling, persistence and restore.
+
+    It has no Qt dependency; everything it has to report is published on
+    self.events (see EVENTS), from whichever thread produced it. The GUI
+    wraps it in TorrentManager, the headless daemon uses it directly.
+    """
+    
+    def __init__(self):
+        self.events = EventBus()
+        
+        # Initialize libtorrent session
+        self.session = lt.session()
+        self.session.listen_on(6881, 6891)
+        self._listen_port = 6881
+        
+        # Set session settings (compatible with both old and new libtorrent versions)
+        try:
+            # Try new API first (libtorrent 2.0+)
+            settings = lt.settings_pack()
+            settings['user_agent'] = 'PyTorrent/1.0.0'
+            settings['enable_dht'] = True
+            settings['enable_lsd'] = True
+            settings['enable_upnp'] = True
+            settings['enable_natpmp'] = True
+            settings['alert_mask'] = ALERT_MASK
+            self.session.apply_settings(settings)
+        except AttributeError:
+            # Fall back to old API (libtorrent 1.x)
+            settings = self.session.get_settings()
+            settings['user_agent'] = 'PyTorrent/1.0.0'
+            settings['enable_dht'] = True
+            settings['enable_lsd'] = True
+            settings['enable_upnp'] = True
+            settings['enable_natpmp'] = True
+            self.session.set_alert_mask(ALERT_MASK)
+            self.session.apply_settings(settings)
+        
+        # Start DHT
+        self.session.start_dht()
+        
+        # Add DHT routers
+        self.session.add_dht_router('router.bittorrent.com', 6881)
+        self.session.add_dht_router('dht.transmissionbt.com', 6881)
+        
+        # How many torrents run at once (libtorrent's auto-managed queue)
+        self.queue_manager = QueueManager(self.session)
+        self.queue_manager.configure()
+        
+        # Disk and buffer settings: a named profile plus raw overrides
+        self.performance_profile = DEFAULT_PROFILE
+        self.performance_overrides = {}
+        self._apply_settings_pack(profile_settings(DEFAULT_PROFILE))
+        
+        # Connection, request queue and choking settings tuned from session counters (off until enabled)
+        self.auto_tuner = AutoTuner(self._apply_settings_pack,
+                                    on_change=lambda entry: self.events.emit('setting_tuned', entry))
+        current_settings = self.session.get_settings()
+        self.auto_tuner.set_base({name: current_settings[name] for name in TUNED_SETTINGS if name in current_settings})
+        
+        # Which rate limits are in force (normal, alternative or none) by time of week
+        self.bandwidth_scheduler = BandwidthScheduler(
+            self._apply_rate_limits,
+            on_change=lambda mode, alternative: self.events.emit('bandwidth_mode_changed', mode, alternative))
+        
+        # Torrent handles storage
+        self.torrent_handles = {}  # hash -> handle
+        self.status_table = StatusTable()  # Columnar status of every torrent
+        self.pending_file_priorities = {}  # hash -> selected_files (for magnets)
+        self.magnet_links = {}  # hash -> magnet link (for torrents added from magnets)
+        self.completed_torrents = set()  # Track which torrents have already been marked complete
+        self._restoring = {}  # hash -> record, waiting for add_torrent_alert
+        self._restored_batch = []  # [(hash, info)] not yet emitted
+        self._restore_done = threading.Event()
+        self._session_loaded = threading.Event()  # Cleared while restore_session runs
+        self._session_loaded.set()
+        self._restore_submitting = False
+        self._restore_started = 0.0
+        self._restore_count = 0
+        
+        # Shared state is touched from both the GUI and the alert dispatcher thread
+        self._lock = threading.RLock()
+        
+        # Batched status polling
+        self.status_engine = StatusEngine(self.session)
+        
+        # Default download directory
+        self.default_download_path = os.path.join(os.path.expanduser('~'), 'Downloads', 'PyTorrent')
+        os.makedirs(self.default_download_path, exist_ok=True)
+        
+        # Session store (legacy resume data directory is only read for migration)
+        self.state_path = os.path.join(os.path.expanduser('~'), '.pytorrent')
+        self.resume_data_path = os.path.join(self.state_path, 'resume_data')
+        os.makedirs(self.state_path, exist_ok=True)
+        self.session_store = SessionStore(os.path.join(self.state_path, 'session.db'))
+        
+        # Magnet metadata is fetched in the background and kept by info hash
+        self.metadata_cache = MetadataCache(os.path.join(self.state_path, 'metadata'))
+        self.magnet_resolver = MagnetResolver(self.session)
+        self.metadata_queue = MetadataQueue()  # Caps concurrent metadata downloads of added magnets
+        
+        # Categories (labels) with save paths, rate caps and weights; LAN peers skip the rate limits
+        self.categories = CategoryManager(self.session, os.path.join(self.state_path, 'categories.json'))
+        self.categories.setup_peer_classes()
+        self._categories_rebalanced = 0.0
+        
+        # Route alerts to handlers on a background thread
+        self.alert_dispatcher = AlertDispatcher(self.session)
+        self.alert_dispatcher.register(lt.state_update_alert, self._on_state_update)
+        self.alert_dispatcher.register(lt.torrent_finished_alert, self._on_torrent_finished)
+        self.alert_dispatcher.register(lt.metadata_received_alert, self._on_metadata_received)
+        self.alert_dispatcher.register(lt.torrent_error_alert, self._on_torrent_error)
+        self.alert_dispatcher.register(lt.add_torrent_alert, self._on_add_torrent)
+        
+        # Session-wide rates, peers, DHT and disk queue from session_stats_alert
+        self.session_stats = SessionStats(self.session)
+        self.alert_dispatcher.register(lt.session_stats_alert, self.session_stats.process_alert)
+        
+        # Persist resume data in the background
+        self.checkpointer = ResumeCheckpointer(self.session_store, self._checkpoint_snapshot,
+                                               on_error=self._report_error)
+        self.alert_dispatcher.register(lt.save_resume_data_alert, self.checkpointer.on_save_resume_data)
+        self.alert_dispatcher.register(lt.save_resume_data_failed_alert,
+                                       self.checkpointer.on_save_resume_data_failed)
+        self.alert_dispatcher.start()
+        self.checkpointer.start()
+        
+        # Polling interval follows torrent activity and window visibility
+        self.poll_scheduler = PollScheduler()
+        self._window_visible = True
+        self._status_watchers = 0
+        
+        # Started in start()
+        self._poll_thread = None
+        self._polling = False
+        self._poll_wakeup = threading.Event()
+        
+        # Bulk import (one at a time)
+        self._import_thread = None
+        self._import_cancel = threading.Event()
+        
+        # Spool directory for .torrent/.magnet files (see set_watch_folder)
+        self.watch_folder = None
+        
+    def start(self):
+        """Start polling on a background thread"""
+        self._polling = True
+        self._poll_thread = threading.Thread(target=self._poll_loop, name='StatusPoller', daemon=True)
+        self._poll_thread.start()
+        self.bandwidth_scheduler.start()
+        
+    def _poll_loop(self):
+        """Poll at the scheduler's current interval; set _poll_wakeup to poll right away"""
+        while self._polling:
+            self.update_torrents()
+            self._poll_wakeup.wait(self.poll_scheduler.interval_ms / 1000.0)
+            self._poll_wakeup.clear()
+            
+    def _report_error(self, title, message):
+        self.events.emit('error_occurred', title, message)
+        
+    def restore_session(self):
+        """Restore saved torrents in the background.
+        
+        Torrents appear progressively through torrents_added, and
+        session_restored is emitted once the last one is in the session.
+        """
+        self._restore_done.clear()
+        self._session_loaded.clear()
+        threading.Thread(target=self.load_resume_data, name='SessionRestore', daemon=True).start()
+        
+    def load_resume_data(self):
+        """Load torrents from the session store"""
+        self._restore_started = time.perf_counter()
+        self._restore_count = 0
+        try:
+            # One-time import of the old session.json + .resume/.torrent layout
+            if self.session_store.is_empty():
+                migrated = self.session_store.migrate_legacy(self.resume_data_path)
+                if migrated:
+                    print(f"Migrated {migrated} torrents to the session store")
+                    
+            records = self.session_store.load_all()
+            self.checkpointer.mark_stored(records)
+            with self._lock:
+                self._restore_submitting = True
+            
+            # Parse resume data and metainfo in a worker pool, then add the
+            # torrents asynchronously; _on_add_torrent picks up the results
+            with ThreadPoolExecutor() as pool:
+                results = pool.map(self._restore_params, records, chunksize=64)
+                submitted = 0
+                for record, params in zip(records, results):
+                    if params is None:
+                        continue
+                    with self._lock:
+                        self._restoring[record['hash']] = record
+                    self.session.async_add_torrent(params)
+                    submitted += 1
+                    
+                    # Let the GUI show what has been added so far
+                    if submitted % RESTORE_BATCH_SIZE == 0:
+                        self._flush_restored()
+                        
+            with self._lock:
+                self._restore_submitting = False
+                if not self._restoring:
+                    self._restore_done.set()
+            self._restore_done.wait(60)
+            self._flush_restored()
+            
+        except Exception as e:
+            print(f"Error loading resume data: {e}")
+            with self._lock:
+                self._restore_submitting = False
+            
+        self._session_loaded.set()
+        self.events.emit('session_restored', self._restore_count, time.perf_counter() - self._restore_started)
+        
+    def _restore_params(self, record):
+        """Build add_torrent_params for a stored record (runs in the worker pool)"""
+        try:
+            params = add_params_from_record(record, self.default_download_path)
+            
+            # A magnet saved before its metadata arrived may have it cached by now
+            if params.ti is None and record['magnet_link']:
+                torrent_info = self.metadata_cache.get(record['hash'])
+                if torrent_info is not None:
+                    params.ti = torrent_info
+                    
+            # Magnets still without metadata wait for a slot in the metadata queue
+            if params.ti is None and record['magnet_link'] and not params.flags & lt.torrent_flags.paused:
+                params.flags = (params.flags | lt.torrent_flags.paused) & ~lt.torrent_flags.auto_managed
+                record['queue_metadata'] = True
+            return params
+        except Exception as e:
+            print(f"Error loading torrent {record.get('hash', 'unknown')}: {e}")
+            return None
+            
+    def _on_add_torrent(self, alert):
+        """Register a torrent restored with async_add_torrent"""
+        if alert.error.value():
+            torrent_hash = str(alert.params.info_hash)
+        else:
+            torrent_hash = str(alert.handle.info_hash())
+            
+        with self._lock:
+            # Torrents added interactively also post add_torrent_alert
+            record = self._restoring.pop(torrent_hash, None)
+            if record is None:
+                return
+                
+            if alert.error.value():
+                print(f"Error loading torrent {torrent_hash}: {alert.error.message()}")
+            else:
+                name = record['name'] or alert.params.name or 'Loading...'
+                info = placeholder_info(torrent_hash, name=name, save_path=alert.params.save_path)
+                self.torrent_handles[torrent_hash] = alert.handle
+                self.status_table.set_info(torrent_hash, info)
+                if record['magnet_link']:
+                    self.magnet_links[torrent_hash] = record['magnet_link']
+                if record.get('queue_metadata'):
+                    self.metadata_queue.add(torrent_hash, alert.handle)
+                self._restored_batch.append((torrent_hash, info))
+                self._restore_count += 1
+                
+            batch_full = len(self._restored_batch) >= RESTORE_BATCH_SIZE
+            finished = not self._restoring and not self._restore_submitting
+            
+        if batch_full or finished:
+            self._flush_restored()
+        if finished:
+            self._restore_done.set()
+            
+    def _flush_restored(self):
+        """Emit the torrents restored since the last flush in one signal"""
+        with self._lock:
+            batch = self._restored_batch
+            self._restored_batch = []
+        if batch:
+            self.events.emit('torrents_added', batch)
+            
+    def save_resume_data(self, torrent_hash=None):
+        """Schedule a resume data checkpoint (coalesced, runs in the background)"""
+        self.checkpointer.request_checkpoint(torrent_hash)
+        
+    def set_checkpoint_interval(self, seconds):
+        """Set how often resume data is checkpointed"""
+        self.checkpointer.set_interval(seconds)
+        
+    def _checkpoint_snapshot(self):
+        """Get (hash, handle, info, magnet_link) for every torrent for the checkpointer"""
+        with self._lock:
+            return [(torrent_hash, handle, self.status_table.info(torrent_hash),
+                     self.magnet_links.get(torrent_hash))
+                    for torrent_hash, handle in self.torrent_handles.items()]
+        
+    def add_torrent_file(self, torrent_file_path, download_path=None, selected_files=None):
+        """Add a torrent from file"""
+        try:
+            torrent_hash, info = self._add_torrent_file(torrent_file_path, download_path, selected_files)
+        except Exception as e:
+            error_msg = f"Failed to add torrent file: {str(e)}"
+            self.events.emit('error_occurred', "Add Torrent Error", error_msg)
+            return None
+            
+        self.events.emit('torrent_added', torrent_hash, info)
+        
+        # Save resume data for persistence
+        self.save_resume_data(torrent_hash)
+        return torrent_hash
+        
+    def add_torrent_files(self, items):
+        """Add many torrent files with one torrents_added event and one checkpoint.
+        
+        Each item is a path or [path, download_path, selected_files]; returns
+        the info hashes in order, None where adding failed.
+        """
+        return self._add_batch(self._add_torrent_file, items, "Add Torrent Error", "Failed to add torrent file")
+        
+    def _add_torrent_file(self, torrent_file_path, download_path=None, selected_files=None):
+        """Add a torrent file to the session and the status table, returns (hash, info)"""
+        # Load torrent info
+        return self._add_torrent_info(lt.torrent_info(torrent_file_path), download_path, selected_files)
+        
+    def _add_torrent_info(self, torrent_info, download_path=None, selected_files=None):
+        """Add parsed metainfo to the session and the status table, returns (hash, info)"""
+        if download_path is None:
+            download_path = self.default_download_path
+            
+        # Don't end up with the hidden torrent of a magnet link being resolved
+        self.magnet_resolver.cancel(str(torrent_info.info_hash()))
+        
+        # Create add_torrent_params
+        params = lt.add_torrent_params()
+        params.ti = torrent_info
+        params.save_path = download_path
+        params.storage_mode = lt.storage_mode_t.storage_mode_sparse
+        
+        # Joins the back of the queue, which starts it when a slot is free
+        params.flags |= lt.torrent_flags.auto_managed
+        
+        # Add torrent to session
+        handle = self.session.add_torrent(params)
+        torrent_hash = str(handle.info_hash())
+        
+        # Set file priorities if specified
+        if selected_files is not None and handle.has_metadata():
+            self.set_file_priorities(handle, selected_files)
+        
+        # Get initial info and store handle
+        info = self._get_torrent_status(handle)
+        with self._lock:
+            self.torrent_handles[torrent_hash] = handle
+            self.status_table.set_info(torrent_hash, info)
+        return torrent_hash, info
+            
+    def add_magnet_link(self, magnet_link, download_path=None, selected_files=None):
+        """Add a torrent from magnet link"""
+        try:
+            torrent_hash, info = self._add_magnet_link(magnet_link, download_path, selected_files, PRIORITY_HIGH)
+        except Exception as e:
+            error_msg = f"Failed to add magnet link: {str(e)}"
+            self.events.emit('error_occurred', "Add Magnet Error", error_msg)
+            return None
+            
+        self.events.emit('torrent_added', torrent_hash, info)
+        
+        # Save resume data for persistence
+        self.save_resume_data(torrent_hash)
+        return torrent_hash
+        
+    def add_magnet_links(self, items):
+        """Add many magnet links with one torrents_added event and one checkpoint.
+        
+        Each item is a magnet link or [magnet_link, download_path, selected_files];
+        returns the info hashes in order, None where adding failed.
+        """
+        return self._add_batch(self._add_magnet_link, items, "Add Magnet Error", "Failed to add magnet link")
+        
+    def _add_magnet_link(self, magnet_link, download_path=None, selected_files=None, priority=PRIORITY_NORMAL):
+        """Add a magnet link to the session and the status table, returns (hash, info)"""
+        if download_path is None:
+            download_path = self.default_download_path
+            
+        # Parse magnet link
+        params = lt.parse_magnet_uri(magnet_link)
+        torrent_hash = str(params.info_hash)
+        
+        queue_metadata = False
+        handle = self.magnet_resolver.adopt(torrent_hash)
+        if handle is not None:
+            # Being resolved (e.g. for the add dialog): keep its peers and download for real
+            if handle.save_path() != download_path:
+                handle.move_storage(download_path)
+            handle.unset_flags(lt.torrent_flags.upload_mode)
+            handle.set_flags(lt.torrent_flags.auto_managed)
+        else:
+            # Skip the metadata download if it was resolved before
+            torrent_info = self.metadata_cache.get(torrent_hash)
+            if torrent_info is not None:
+                params.ti = torrent_info
+                params.flags |= lt.torrent_flags.auto_managed
+            else:
+                # Start paused, the metadata queue decides when it fetches metadata
+                params.flags = (params.flags | lt.torrent_flags.paused) & ~lt.torrent_flags.auto_managed
+                queue_metadata = True
+            params.save_path = download_path
+            params.storage_mode = lt.storage_mode_t.storage_mode_sparse
+            
+            # Add torrent to session
+            handle = self.session.add_torrent(params)
+        torrent_hash = str(handle.info_hash())
+        
+        # Get initial info and store handle
+        info = self._get_torrent_status(handle)
+        with self._lock:
+            self.torrent_handles[torrent_hash] = handle
+            self.status_table.set_info(torrent_hash, info)
+            self.magnet_links[torrent_hash] = magnet_link
+            
+            # Store file priorities for when metadata becomes available
+            if selected_files is not None:
+                self.pending_file_priorities[torrent_hash] = selected_files
+                
+        if queue_metadata:
+            self.metadata_queue.add(torrent_hash, handle, priority)
+            
+        # Metadata may already have arrived (e.g. from a peer) before we stored them
+        if selected_files is not None and handle.has_metadata():
+            with self._lock:
+                selected_files = self.pending_file_priorities.pop(torrent_hash, None)
+            if selected_files is not None:
+                self.set_file_priorities(handle, selected_files)
+        return torrent_hash, info
+            
+    def resolve_metadata(self, magnet_link):
+        """Fetch a magnet link's metadata without adding it.
+        
+        Returns (hash, summary), where summary is None until the metadata is
+        known; metadata_resolved is emitted when it arrives. Cached metadata
+        and torrents already in the session answer right away.
+        """
+        params = lt.parse_magnet_uri(magnet_link)
+        torrent_hash = str(params.info_hash)
+        
+        with self._lock:
+            handle = self.torrent_handles.get(torrent_hash)
+        if handle is not None:
+            # Already added, metadata_resolved follows if it is still downloading metadata
+            return torrent_hash, torrent_summary(handle.torrent_file()) if handle.has_metadata() else None
+            
+        torrent_info = self.metadata_cache.get(torrent_hash)
+        if torrent_info is not None:
+            return torrent_hash, torrent_summary(torrent_info)
+            
+        self.magnet_resolver.resolve(params, self.default_download_path)
+        return torrent_hash, None
+        
+    def set_metadata_fetch_limit(self, max_active):
+        """Set how many added magnets download metadata at once (0: no limit)"""
+        self.metadata_queue.set_max_active(max_active)
+        
+    def get_metadata_queue_stats(self):
+        """Get the metadata queue's counts (queued, active, backoff...)"""
+        return self.metadata_queue.stats()
+        
+    def cancel_metadata(self, torrent_hash):
+        """Stop resolving a magnet link that wasn't added after all"""
+        self.magnet_resolver.cancel(torrent_hash)
+        
+    def _add_batch(self, add, items, error_title, error_prefix):
+        """Run add(*args) for every batch item, then report and checkpoint them together"""
+        hashes = []
+        added = []
+        for item in items:
+            # A bare string is the only argument, a list holds all of them
+            args = (item,) if isinstance(item, str) else tuple(item)
+            try:
+                torrent_hash, info = add(*args)
+            except Exception as e:
+                self.events.emit('error_occurred', error_title, f"{error_prefix}: {str(e)}")
+                hashes.append(None)
+                continue
+            hashes.append(torrent_hash)
+            added.append((torrent_hash, info))
+            
+        if added:
+            self.events.emit('torrents_added', added)
+            self.checkpointer.request_checkpoints([torrent_hash for torrent_hash, info in added])
+        return hashes
+        
+    def start_import(self, paths, download_path=None):
+        """Run a bulk import (see _import_torrents) in the background, returns False if one is already running"""
+        if self._import_thread is not None and self._import_thread.is_alive():
+            return False
+        self._import_cancel.clear()
+        self._import_thread = threading.Thread(target=self._import_torrents, args=(paths, download_path),
+                                               name='BulkImport', daemon=True)
+        self._import_thread.start()
+        return True
+        
+    def cancel_import(self):
+        """Stop a running bulk import after the current file"""
+        self._import_cancel.set()
+        
+    def _import_torrents(self, paths, download_path=None):
+        """Add every .torrent file in paths (files or directories, recursively).
+        
+        Metainfo is parsed and validated in a process pool. Torrents already
+        in the session, or found twice, are skipped; the rest are added in
+        batches of IMPORT_BATCH_SIZE with one torrents_added event each, and
+        checkpointed together at the end. Failures don't raise error_occurred,
+        they are listed in the summary: {'total', 'added', 'skipped',
+        'failed': [(path, error)], 'cancelled', 'seconds', 'rate'}, where rate
+        is files processed per second. The summary is also emitted as
+        import_finished.
+        """
+        started = time.perf_counter()
+        files = find_torrent_files(paths)
+        total = len(files)
+        processed = 0
+        added_hashes = []
+        seen = set()
+        skipped = 0
+        failed = []
+        batch = []
+        
+        def flush():
+            if batch:
+                self.events.emit('torrents_added', list(batch))
+                batch.clear()
+            elapsed = time.perf_counter() - started
+            self.events.emit('import_progress', processed, total, processed / elapsed if elapsed > 0 else 0.0)
+            
+        self.events.emit('import_progress', 0, total, 0.0)
+        try:
+            for path, torrent_hash, data, error in parse_torrent_files(files):
+                if self._import_cancel.is_set():
+                    break
+                processed += 1
+                
+                if error is not None:
+                    failed.append((path, error))
+                else:
+                    if self._has_torrent(torrent_hash) or torrent_hash in seen:
+                        skipped += 1
+                    else:
+                        seen.add(torrent_hash)
+                        try:
+                            torrent_hash, info = self._add_torrent_info(lt.torrent_info(lt.bdecode(data)),
+                                                                        download_path)
+                            batch.append((torrent_hash, info))
+                            added_hashes.append(torrent_hash)
+                        except Exception as e:
+                            failed.append((path, str(e)))
+                            
+                if processed % IMPORT_BATCH_SIZE == 0:
+                    flush()
+        except Exception as e:
+            print(f"Error importing torrents: {e}")
+        flush()
+        
+        # Persist once for the whole import
+        if added_hashes:
+            self.checkpointer.request_checkpoints(added_hashes)
+            
+        seconds = time.perf_counter() - started
+        summary = {
+            'total': total,
+            'added': len(added_hashes),
+            'skipped': skipped,
+            'failed': failed,
+            'cancelled': processed < total,
+            'seconds': seconds,
+            'rate': processed / seconds if seconds > 0 else 0.0
+        }
+        self.events.emit('import_finished', summary)
+        return summary
+        
+    def set_watch_folder(self, path, use_polling=False):
+        """Add .torrent and .magnet files dropped into path (None stops watching)"""
+        if self.watch_folder is not None:
+            if path and os.path.abspath(path) == self.watch_folder.path and \
+                    use_polling == self.watch_folder.use_polling:
+                return
+            self.watch_folder.stop()
+            self.watch_folder = None
+            
+        if path:
+            watch_folder = WatchFolder(path, self.ingest_files, use_polling)
+            try:
+                watch_folder.start()
+            except OSError as e:
+                error_msg = f"Failed to watch {path}: {str(e)}"
+                self.events.emit('error_occurred', "Watch Folder Error", error_msg)
+                return
+            self.watch_folder = watch_folder
+            
+    def ingest_files(self, paths, download_path=None):
+        """Add .torrent files and .magnet files (one link per line) without dialogs.
+        
+        Torrents already in the session count as added. Everything added is
+        reported in one torrents_added event and checkpointed once; failures
+        are returned rather than emitted as error_occurred. Returns
+        {path: None if added, else the error message}.
+        """
+        # Saved torrents come first, so a spooled copy isn't added twice
+        self._session_loaded.wait()
+        
+        results = {}
+        added = []
+        for path in paths:
+            try:
+                if path.lower().endswith('.magnet'):
+                    self._ingest_magnet_file(path, download_path, added)
+                else:
+                    self._ingest_torrent_file(path, download_path, added)
+                results[path] = None
+            except Exception as e:
+                results[path] = str(e) or "Invalid file"
+                
+        if added:
+            self.events.emit('torrents_added', added)
+            self.checkpointer.request_checkpoints([torrent_hash for torrent_hash, info in added])
+        return results
+        
+    def _ingest_torrent_file(self, path, download_path, added):
+        torrent_info = lt.torrent_info(path)
+        if not self._has_torrent(str(torrent_info.info_hash())):
+            added.append(self._add_torrent_info(torrent_info, download_path))
+            
+    def _ingest_magnet_file(self, path, download_path, added):
+        with open(path, 'r', encoding='utf-8') as f:
+            magnet_links = [line.strip() for line in f if line.strip().startswith('magnet:')]
+        if not magnet_links:
+            raise ValueError("No magnet links in file")
+        for magnet_link in magnet_links:
+            if not self._has_torrent(str(lt.parse_magnet_uri(magnet_link).info_hash)):
+                added.append(self._add_magnet_link(magnet_link, download_path))
+                
+    def _has_torrent(self, torrent_hash):
+        with self._lock:
+            return torrent_hash in self.torrent_handles
+            
+    def pause_torrent(self, torrent_hash):
+        """Pause a torrent"""
+        with self._lock:
+            handle = self.torrent_handles.get(torrent_hash)
+        if handle is None:
+            return
+        # A paused magnet stays paused instead of getting its turn in the metadata queue
+        self.metadata_queue.remove(torrent_hash)
+        # Taken out of the queue too, or libtorrent would start it again
+        handle.unset_flags(lt.torrent_flags.auto_managed)
+        handle.pause()
+            
+    def resume_torrent(self, torrent_hash):
+        """Resume a torrent"""
+        with self._lock:
+            handle = self.torrent_handles.get(torrent_hash)
+        if handle is None:
+            return
+        if handle.has_metadata():
+            # Back in the queue, it starts once its position gets a slot
+            handle.set_flags(lt.torrent_flags.auto_managed)
+            handle.resume()
+        else:
+            self.metadata_queue.add(torrent_hash, handle, PRIORITY_HIGH)
+            
+    def pause_torrents(self, torrent_hashes):
+        """Pause many torrents"""
+        for torrent_hash in torrent_hashes:
+            self.pause_torrent(torrent_hash)
+            
+    def resume_torrents(self, torrent_hashes):
+        """Resume many torrents"""
+        for torrent_hash in torrent_hashes:
+            self.resume_torrent(torrent_hash)
+            
+    def set_queue_settings(self, settings):
+        """Turn queueing on or off and set its limits.
+        
+        settings may hold 'enabled' and any of 'active_downloads',
+        'active_seeds', 'active_checking' and 'active_limit' (-1: unlimited).
+        """
+        settings = dict(settings)
+        enabled = settings.pop('enabled', None)
+        self.queue_manager.configure(enabled, settings)
+        
+    def get_queue_settings(self):
+        """Get the queue limits, whether queueing is on and the settings libtorrent got"""
+        return self.queue_manager.settings()
+        
+    def move_queue_position(self, torrent_hash, direction):
+        """Move a torrent 'top', 'up', 'down' or 'bottom' in the queue"""
+        return self.move_queue_positions([torrent_hash], direction)
+        
+    def move_queue_positions(self, torrent_hashes, direction):
+        """Move torrents in the queue together, returns how many had a queue position"""
+        with self._lock:
+            handles = [self.torrent_handles[torrent_hash] for torrent_hash in torrent_hashes
+                       if torrent_hash in self.torrent_handles]
+        moved = self.queue_manager.move(handles, direction)
+        if moved:
+            # Queue positions of other torrents shift too, show them without waiting for a tick
+            self._poll_wakeup.set()
+        return moved
+        
+    def set_category(self, name, settings):
+        """Create or change a category.
+        
+        settings may hold 'save_path' (default save path of its torrents),
+        'download_limit' and 'upload_limit' (KB/s over all its torrents, 0
+        for unlimited) and 'weight' (1-100, its share of the global limits
+        relative to other categories; uncategorized torrents weigh 1).
+        """
+        settings = dict(settings)
+        for key in ('download_limit', 'upload_limit'):
+            settings[key] = int(settings.get(key, 0)) * 1024  # KB/s to B/s
+        self.categories.set_category(name, settings)
+        self._categories_rebalanced = 0.0
+        
+    def remove_category(self, name):
+        """Delete a category, its torrents become uncategorized"""
+        removed = self.categories.remove_category(name)
+        self._categories_rebalanced = 0.0
+        return removed
+        
+    def get_categories(self):
+        """Get the categories with their settings (limits in KB/s) and torrent counts"""
+        categories = self.categories.get_categories()
+        counts = self.categories.member_counts()
+        for name, category in categories.items():
+            category['download_limit'] //= 1024
+            category['upload_limit'] //= 1024
+            category['torrents'] = counts.get(name, 0)
+        return categories
+        
+    def get_torrent_category(self, torrent_hash):
+        """Get the category of a torrent (None if it has none)"""
+        return self.categories.category_of(torrent_hash)
+        
+    def set_torrent_category(self, torrent_hash, name, move_storage=True):
+        """Put a torrent in a category (None: no category)"""
+        return self.set_torrents_category([torrent_hash], name, move_storage)
+        
+    def set_torrents_category(self, torrent_hashes, name, move_storage=True):
+        """Put torrents in a category (None: no category).
+        
+        With move_storage, torrents are moved to the category's save path
+        if it has one. Returns how many torrents were assigned.
+        """
+        with self._lock:
+            handles = {torrent_hash: self.torrent_handles[torrent_hash] for torrent_hash in torrent_hashes
+                       if torrent_hash in self.torrent_handles}
+        self.categories.assign(list(handles), name)
+        self._categories_rebalanced = 0.0
+        
+        category = self.categories.get(name) if name is not None else None
+        if move_storage and category and category['save_path']:
+            save_path = category['save_path']
+            os.makedirs(save_path, exist_ok=True)
+            for handle in handles.values():
+                if os.path.normpath(handle.status().save_path) != os.path.normpath(save_path):
+                    handle.move_storage(save_path)
+        return len(handles)
+        
+    def set_lan_unthrottled(self, enabled):
+        """Exempt LAN and loopback peers from the global rate limits (or not)"""
+        self.categories.setup_peer_classes(enabled)
+        
+    def remove_torrent(self, torrent_hash, delete_files=False):
+        """Remove a torrent"""
+        if self._remove_torrent(torrent_hash, delete_files):
+            self.events.emit('torrent_removed', torrent_hash)
+            
+            # Delete its record from the session store
+            self.checkpointer.discard([torrent_hash])
+            
+    def remove_torrents(self, torrent_hashes, delete_files=False):
+        """Remove many torrents with one torrents_removed event and one store write"""
+        removed = [torrent_hash for torrent_hash in torrent_hashes
+                   if self._remove_torrent(torrent_hash, delete_files)]
+        if removed:
+            self.events.emit('torrents_removed', removed)
+            self.checkpointer.discard(removed)
+        return removed
+            
+    def _remove_torrent(self, torrent_hash, delete_files):
+        """Remove a torrent from the session and our storage, returns False if unknown"""
+        with self._lock:
+            handle = self.torrent_handles.get(torrent_hash)
+        if handle is None:
+            return False
+            
+        self.metadata_queue.remove(torrent_hash)
+        self.categories.forget([torrent_hash])
+        
+        # Remove from session
+        if delete_files:
+            self.session.remove_torrent(handle, lt.session.delete_files)
+        else:
+            self.session.remove_torrent(handle)
+            
+        # Remove from our storage
+        with self._lock:
+            del self.torrent_handles[torrent_hash]
+            self.status_table.remove(torrent_hash)
+            if torrent_hash in self.pending_file_priorities:
+                del self.pending_file_priorities[torrent_hash]
+            self.magnet_links.pop(torrent_hash, None)
+            if torrent_hash in self.completed_torrents:
+                self.completed_torrents.remove(torrent_hash)
+        return True
+            
+    def set_file_priorities(self, handle, selected_files):
+        """Set file priorities based on selected files"""
+        try:
+            if not handle.has_metadata():
+                return
+                
+            torrent_info = handle.torrent_file()
+            if not torrent_info:
+                return
+                
+            num_files = torrent_info.num_files()
+            if selected_files is None:
+                handle.prioritize_files([PRIORITY_LEVELS['normal']] * num_files)
+                return
+                
+            # Selected files at normal priority, everything else not downloaded
+            priorities = np.full(num_files, PRIORITY_LEVELS['skip'], dtype=np.int64)
+            selected = np.fromiter(selected_files, dtype=np.int64)
+            priorities[selected[(selected >= 0) & (selected < num_files)]] = PRIORITY_LEVELS['normal']
+            handle.prioritize_files(priorities.tolist())
+            
+        except Exception as e:
+            error_msg = f"Failed to set file priorities: {str(e)}"
+            self.events.emit('error_occurred', "File Priority Error", error_msg)
+            
+    def _handle_with_metadata(self, torrent_hash):
+        """The handle of a torrent whose metadata is known, or None"""
+        with self._lock:
+            handle = self.torrent_handles.get(torrent_hash)
+        if handle is None or not handle.has_metadata():
+            return None
+        return handle
+        
+    def get_files(self, torrent_hash):
+        """Get a torrent's files as [(path, size)] in file index order, or None without metadata"""
+        handle = self._handle_with_metadata(torrent_hash)
+        if handle is None:
+            return None
+        return torrent_summary(handle.torrent_file())['files']
+        
+    def get_file_progress(self, torrent_hash):
+        """Get bytes downloaded and priority per file, or None without metadata.
+        
+        Returns {'progress': [bytes], 'priorities': [0-7]} in file index
+        order. Progress counts whole pieces only (piece granularity), which
+        is much cheaper than the byte-exact figure.
+        """
+        handle = self._handle_with_metadata(torrent_hash)
+        if handle is None:
+            return None
+        return {
+            'progress': list(handle.file_progress(lt.torrent_handle.piece_granularity)),
+            'priorities': list(handle.get_file_priorities())
+        }
+        
+    def set_file_priority(self, torrent_hash, files, priority):
+        """Set the priority of some of a torrent's files, returns how many changed.
+        
+        files selects them (None for all; file indices, 'first-last' ranges
+        and glob patterns, see file_priorities.select_files) and priority is
+        'skip', 'low', 'normal', 'high' or 0-7. All changes go to libtorrent
+        in a single prioritize_files call.
+        """
+        priority = parse_priority(priority)
+        handle = self._handle_with_metadata(torrent_hash)
+        if handle is None:
+            raise ValueError(f"No metadata for torrent {torrent_hash}")
+            
+        priorities = np.array(handle.get_file_priorities(), dtype=np.int64)
+        selected = select_files(files, len(priorities),
+                             lambda: [path for path, size in torrent_summary(handle.torrent_file())['files']])
+        changed = selected & (priorities != priority)
+        count = int(np.count_nonzero(changed))
+        if count:
+            priorities[changed] = priority
+            handle.prioritize_files(priorities.tolist())
+            self.checkpointer.request_checkpoint(torrent_hash)
+        return count
+        
+    def get_torrent_info(self, torrent_hash):
+        """Get information about a specific torrent"""
+        with self._lock:
+            return self.status_table.info(torrent_hash)
+        
+    def torrent_count(self):
+        """Get the number of torrents in the session"""
+        with self._lock:
+            return len(self.torrent_handles)
+        
+    def get_all_torrent_info(self):
+        """Get information about all torrents"""
+        with self._lock:
+            return {torrent_hash: self.status_table.info_at(slot)
+                    for torrent_hash, slot in self.status_table.slots.items()}
+            
+    def get_totals(self):
+        """Get total rates and sizes over all torrents"""
+        with self._lock:
+            return self.status_table.totals()
+            
+    def get_selection_totals(self, torrent_hashes):
+        """Get total rates and sizes over a selection of torrents"""
+        with self._lock:
+            return self.status_table.selection_totals(torrent_hashes)
+            
+    def get_session_stats(self):
+        """Get session-wide rates including overhead, peers, DHT nodes and the disk queue"""
+        return self.session_stats.snapshot()
+            
+    def get_poll_stats(self):
+        """Get the current polling cadence and per-tick cost"""
+        with self._lock:
+            return self.poll_scheduler.stats()
+            
+    def set_window_visible(self, visible):
+        """Report per-torrent changes only while the window is visible (or someone watches)"""
+        with self._lock:
+            self._window_visible = visible
+        self._update_watched()
+        
+    def watch_status(self, watching):
+        """Count a status delta subscriber (e.g. an RPC client) in or out"""
+        with self._lock:
+            self._status_watchers += 1 if watching else -1
+        self._update_watched()
+        
+    def _update_watched(self):
+        """Diff and report per-torrent changes only while the window or a subscriber is watching"""
+        changes = {}
+        with self._lock:
+            visible = self._window_visible or self._status_watchers > 0
+            was_visible = self.poll_scheduler.visible
+            self.poll_scheduler.visible = visible
+            if visible and not was_visible:
+                # Everything that changed while hidden, in one batch
+                slots, masks = self.status_table.diff()
+                changes = {self.status_table.hashes[slot]: (self.status_table.info_at(slot), mask)
+                           for slot, mask in zip(slots.tolist(), masks.tolist())}
+        if changes:
+            self.events.emit('torrents_updated', changes)
+            
+        # Pick the new cadence right away instead of at the next (slow) tick
+        if visible != was_visible:
+            self._poll_wakeup.set()
+            
+    def get_state_counts(self):
+        """Get the number of torrents in each state"""
+        with self._lock:
+            return self.status_table.state_counts()
+        
+    def update_torrents(self):
+        """Request a status update for torrents whose status changed"""
+        try:
+            # Adapt the polling interval to what the torrents are doing now
+            with self._lock:
+                cadence_changed = self.poll_scheduler.choose(self.status_table.state_counts(),
+                                                             self.status_table.totals())
+                mode = self.poll_scheduler.mode
+                interval_ms = self.poll_scheduler.interval_ms
+            if cadence_changed:
+                self.events.emit('poll_cadence_changed', mode, interval_ms)
+                
+            # Time out stalled metadata downloads, retry backed off ones
+            self.metadata_queue.tick()
+            
+            # Share category caps and weights out between the torrents moving data
+            self._rebalance_categories()
+            
+            # The state_update_alert is handled by _on_state_update and the
+            # session_stats_alert by session_stats
+            self.status_engine.request_updates()
+            self.session_stats.request()
+            
+            # Feed the auto-tuner the last session counters
+            self._tune()
+        except Exception as e:
+            error_msg = f"Error updating torrents: {str(e)}"
+            self.events.emit('error_occurred', "Update Error", error_msg)
+            
+    def _rebalance_categories(self):
+        """Recompute per-torrent limits from the last polled rates (at most once per interval)"""
+        now = time.monotonic()
+        if now - self._categories_rebalanced < CATEGORY_REBALANCE_INTERVAL or not self.categories.needs_rebalance():
+            return
+        self._categories_rebalanced = now
+        
+        with self._lock:
+            table = self.status_table
+            transferring = np.isin(table.state, TRANSFERRING_STATES) & ~table.paused
+            download_rates = table.columns['download_rate']
+            upload_rates = table.columns['upload_rate']
+            torrents = {}
+            for torrent_hash, slot in table.slots.items():
+                handle = self.torrent_handles.get(torrent_hash)
+                if handle is not None:
+                    torrents[torrent_hash] = (handle, download_rates[slot], upload_rates[slot],
+                                              bool(transferring[slot]))
+        state = self.bandwidth_scheduler.state()
+        self.categories.rebalance(torrents, (state['download_limit'], state['upload_limit']))
+        
+    def _tune(self):
+        """Let the auto-tuner see the session counters and the limits in force"""
+        if not self.auto_tuner.enabled:
+            return
+        rates = self.bandwidth_scheduler.state()
+        with self._lock:
+            performance = profile_settings(self.performance_profile, self.performance_overrides)
+        self.auto_tuner.observe(self.session_stats.snapshot(), {
+            'download_limit': rates['download_limit'],
+            'upload_limit': rates['upload_limit'],
+            'max_queued_disk_bytes': performance.get('max_queued_disk_bytes', 0)
+        })
+        
+    def _on_state_update(self, alert):
+        """Merge status deltas from a state_update_alert into the status table"""
+        start = time.perf_counter()
+        updates = self.status_engine.process_alert(alert)
+        waiting = self.metadata_queue.waiting()
+        infos = {}  # slot -> info
+        changes = {}
+        with self._lock:
+            for torrent_hash, (info, status) in updates.items():
+                # Ignore updates for torrents removed since the request was posted
+                if torrent_hash not in self.torrent_handles:
+                    continue
+                # Magnets waiting in the metadata queue are paused, but not by the user
+                if torrent_hash in waiting:
+                    info['state'] = 'Queued'
+                    info['paused'] = False
+                infos[self.status_table.set_info(torrent_hash, info)] = info
+                
+            # Diff the updated rows against what was last reported in one pass.
+            # While the window is hidden only the table (and so the tray totals)
+            # is kept current; set_window_visible catches the list up.
+            if self.poll_scheduler.visible:
+                slots, masks = self.status_table.diff(list(infos))
+                changes = {self.status_table.hashes[slot]: (infos[slot], mask)
+                           for slot, mask in zip(slots.tolist(), masks.tolist())}
+            self.poll_scheduler.record_tick(time.perf_counter() - start)
+                    
+        # One signal per tick for all changed torrents
+        if changes:
+            self.events.emit('torrents_updated', changes)
+                
+    def _on_torrent_finished(self, alert):
+        """Handle torrent_finished_alert"""
+        torrent_hash = str(alert.handle.info_hash())
+        with self._lock:
+            if torrent_hash not in self.torrent_handles or torrent_hash in self.completed_torrents:
+                return
+            self.completed_torrents.add(torrent_hash)
+            
+        info = self._get_torrent_status(alert.handle)
+        with self._lock:
+            self.status_table.set_info(torrent_hash, info)
+        self.events.emit('torrent_completed', torrent_hash, info)
+        
+    def _on_metadata_received(self, alert):
+        """Cache a magnet link's metadata and apply its pending file priorities"""
+        torrent_hash = str(alert.handle.info_hash())
+        torrent_info = alert.handle.torrent_file()
+        self.metadata_cache.put(torrent_hash, metainfo_bytes(torrent_info))
+        
+        # Torrents that were only resolving are done, queued ones download normally now
+        self.magnet_resolver.finish(torrent_hash)
+        self.metadata_queue.promote(torrent_hash)
+        
+        with self._lock:
+            selected_files = self.pending_file_priorities.pop(torrent_hash, None)
+        if selected_files is not None:
+            self.set_file_priorities(alert.handle, selected_files)
+            
+        self.events.emit('metadata_resolved', torrent_hash, torrent_summary(torrent_info))
+            
+    def _on_torrent_error(self, alert):
+        """Report torrent errors (disk full, permission denied...)"""
+        if self.magnet_resolver.is_resolving(str(alert.handle.info_hash())):
+            print(f"Error resolving metadata: {alert.error.message()}")
+            return
+        name = alert.torrent_name or str(alert.handle.info_hash())
+        error_msg = f"{name}: {alert.error.message()}"
+        self.events.emit('error_occurred', "Torrent Error", error_msg)
+        
+    def _get_torrent_status(self, handle):
+        """Get status information from a torrent handle"""
+        try:
+            return self.status_engine.query(handle)
+            
+        except Exception as e:
+            # Return error state without reporting an error (called frequently)
+            return placeholder_info(str(handle.info_hash()), name='Error', state='Error')
+            
+    def set_download_path(self, path):
+        """Set default download path"""
+        self.default_download_path = path
+        os.makedirs(path, exist_ok=True)
+        
+    def apply_session_settings(self, settings_dict):
+        """Apply new settings to the session"""
+        try:
+            # Connection settings (rebinding the listen socket drops every connection, so only on a change)
+            if 'port' in settings_dict and settings_dict['port'] != self._listen_port:
+                self.session.listen_on(settings_dict['port'], settings_dict['port'] + 10)
+                self._listen_port = settings_dict['port']
+            
+            # Try new API first (libtorrent 2.0+)
+            try:
+                settings = lt.settings_pack()
+                
+                if 'enable_dht' in settings_dict:
+                    settings['enable_dht'] = settings_dict['enable_dht']
+                if 'enable_lsd' in settings_dict:
+                    settings['enable_lsd'] = settings_dict['enable_lsd']
+                if 'enable_upnp' in settings_dict:
+                    settings['enable_upnp'] = settings_dict['enable_upnp']
+                if 'enable_natpmp' in settings_dict:
+                    settings['enable_natpmp'] = settings_dict['enable_natpmp']
+                if 'max_connections' in settings_dict:
+                    settings['connections_limit'] = settings_dict['max_connections']
+                if 'max_uploads' in settings_dict:
+                    settings['unchoke_slots_limit'] = settings_dict['max_uploads']
+                    
+                # Apply settings
+                self.session.apply_settings(settings)
+                
+            except AttributeError:
+                # Fall back to old API (libtorrent 1.x)
+                settings = self.session.get_settings()
+                
+                if 'enable_dht' in settings_dict:
+                    settings['enable_dht'] = settings_dict['enable_dht']
+                if 'enable_lsd' in settings_dict:
+                    settings['enable_lsd'] = settings_dict['enable_lsd']
+                if 'enable_upnp' in settings_dict:
+                    settings['enable_upnp'] = settings_dict['enable_upnp']
+                if 'enable_natpmp' in settings_dict:
+                    settings['enable_natpmp'] = settings_dict['enable_natpmp']
+                if 'max_connections' in settings_dict:
+                    settings['connections_limit'] = settings_dict['max_connections']
+                if 'max_uploads' in settings_dict:
+                    settings['unchoke_slots_limit'] = settings_dict['max_uploads']
+                    
+                # Apply settings using old API
+                self.session.apply_settings(settings)
+                
+            # Configured connection limits are where the auto-tuner starts and what it restores
+            tuned_base = {}
+            if 'max_connections' in settings_dict:
+                tuned_base['connections_limit'] = settings_dict['max_connections']
+            if 'max_uploads' in settings_dict:
+                tuned_base['unchoke_slots_limit'] = settings_dict['max_uploads']
+            self.auto_tuner.set_base(tuned_base)
+            if 'auto_tune' in settings_dict:
+                self.auto_tuner.set_enabled(settings_dict['auto_tune'])
+                
+            if 'lan_unthrottled' in settings_dict and settings_dict['lan_unthrottled'] != self.categories.lan_unthrottled:
+                self.set_lan_unthrottled(settings_dict['lan_unthrottled'])
+                
+            # Normal rate limits, in force unless the bandwidth schedule says otherwise
+            if any(key in settings_dict for key in ('limit_download', 'download_limit', 'limit_upload', 'upload_limit')):
+                download_limit = settings_dict.get('download_limit', 0) if settings_dict.get('limit_download') else 0
+                upload_limit = settings_dict.get('upload_limit', 0) if settings_dict.get('limit_upload') else 0
+                self.bandwidth_scheduler.set_limits(normal=(download_limit * 1024, upload_limit * 1024))  # KB/s to B/s
+            
+        except Exception as e:
+            error_msg = f"Failed to apply settings: {str(e)}"
+            self.events.emit('error_occurred', "Settings Error", error_msg)
+            
+    def _apply_settings_pack(self, values):
+        """Change only the given session settings"""
+        try:
+            settings = lt.settings_pack()
+            for name, value in values.items():
+                settings[name] = value
+        except AttributeError:
+            settings = values  # libtorrent 1.x
+        self.session.apply_settings(settings)
+        
+    def _apply_rate_limits(self, download_limit, upload_limit):
+        """Change the global rate limits (B/s, 0 for unlimited) and nothing else"""
+        self._apply_settings_pack({'download_rate_limit': int(download_limit), 'upload_rate_limit': int(upload_limit)})
+        
+    def set_performance_settings(self, settings):
+        """Switch the disk and buffer performance profile and/or its raw overrides.
+        
+        settings may hold 'profile' (desktop, seedbox-hdd, seedbox-nvme or
+        low-memory) and 'overrides', libtorrent settings applied on top of
+        the profile as {name: value} or 'name = value' lines. Raises
+        ValueError for unknown profiles or settings, and nothing is applied.
+        """
+        with self._lock:
+            profile = settings.get('profile', self.performance_profile)
+            overrides = settings.get('overrides', self.performance_overrides)
+            if isinstance(overrides, str):
+                overrides = parse_overrides(overrides)
+            current = self.session.get_settings()
+            overrides = convert_overrides(overrides, current)
+            values = profile_settings(profile, overrides)
+            
+            # Settings only the previous overrides touched go back to their defaults
+            defaults = lt.default_settings() if hasattr(lt, 'default_settings') else {}
+            for name in self.performance_overrides:
+                if name not in values and name in defaults:
+                    values[name] = defaults[name]
+                    
+            self._apply_settings_pack(values)
+            self.performance_profile = profile
+            self.performance_overrides = overrides
+        self.auto_tuner.set_base({name: values[name] for name in TUNED_SETTINGS if name in values})
+            
+    def get_performance_settings(self):
+        """Get the active profile, its overrides, the available profiles and the settings in effect"""
+        with self._lock:
+            profile = self.performance_profile
+            overrides = dict(self.performance_overrides)
+        current = self.session.get_settings()
+        names = sorted(set(profile_settings(profile)) | set(overrides))
+        return {
+            'profile': profile,
+            'overrides': overrides,
+            'profiles': {name: PROFILES[name]['description'] for name in PROFILES},
+            'effective': {name: current.get(name) for name in names}
+        }
+        
+    def set_bandwidth_schedule(self, settings):
+        """Configure alternative limits and the weekly schedule.
+        
+        settings may hold 'alt_download' and 'alt_upload' (KB/s, 0 for
+        unlimited), 'alt_limits' (the alternative limits toggle, only used
+        while the schedule is off; see set_alt_limits), 'schedule_enabled'
+        and 'schedule' (one of n/a/u for normal, alternative or unlimited
+        per hour of the week, Monday 00:00 first).
+        """
+        if 'alt_download' in settings or 'alt_upload' in settings:
+            current = self.bandwidth_scheduler.alternative_limits
+            self.bandwidth_scheduler.set_limits(alternative=(
+                settings['alt_download'] * 1024 if 'alt_download' in settings else current[0],
+                settings['alt_upload'] * 1024 if 'alt_upload' in settings else current[1]))
+        if 'schedule_enabled' in settings or 'schedule' in settings:
+            self.bandwidth_scheduler.set_schedule(
+                settings.get('schedule_enabled', self.bandwidth_scheduler.schedule_enabled), settings.get('schedule'))
+        # With a schedule the stored toggle is just the last mode in force; replaying it would override the schedule
+        if 'alt_limits' in settings and not self.bandwidth_scheduler.schedule_enabled:
+            self.set_alt_limits(settings['alt_limits'])
+            
+    def set_alt_limits(self, enabled):
+        """Switch alternative rate limits on or off (until the schedule next changes mode)"""
+        self.bandwidth_scheduler.set_alternative(enabled)
+        
+    def set_auto_tune(self, enabled):
+        """Turn the connection and request queue auto-tuner on, or off (restoring the configured values)"""
+        self.auto_tuner.set_enabled(enabled)
+        
+    def get_auto_tune_state(self):
+        """Get whether the auto-tuner is on, its values, the configured ones and its averaged counters"""
+        return self.auto_tuner.state()
+        
+    def get_tuning_log(self, limit=None):
+        """Get the auto-tuner's most recent changes with their reasons, oldest first"""
+        return self.auto_tuner.get_log(limit)
+        
+    def get_bandwidth_state(self):
+        """Get the rate limit mode in force, its limits and the schedule"""
+        return self.bandwidth_scheduler.state()
+        
+    def shutdown(self):
+        """Shutdown the torrent core"""
+        try:
+            # Stop taking in new torrents
+            self.cancel_import()
+            self.set_watch_folder(None)
+            self.magnet_resolver.shutdown()
+            
+            # Stop polling
+            self.bandwidth_scheduler.stop()
+            self._polling = False
+            self._poll_wakeup.set()
+            if self._poll_thread is not None:
+                self._poll_thread.join(2)
+                
+            # Save resume data before shutdown and wait for it to reach the disk
+            self.checkpointer.flush()
+            self.checkpointer.stop()
+            self.session_store.close()
+            
+            # Pause all torrents
+            for handle in self.torrent_handles.values():
+                if handle.is_valid():
+                    handle.pause()
+            
+            # Stop dispatching alerts
+            self.alert_dispatcher.stop()
+            
+            # Clear handles
+            with self._lock:
+                self.torrent_handles.clear()
+                self.status_table.clear()
+            
+        except Exception as e:
+            error_msg = f"Error during shutdown: {str(e)}"
+            self.events.emit('error_occurred', "Shutdown Error", error_msg) 
\ No newline at end of file
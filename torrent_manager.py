@@ -1,552 +1,177 @@
 """
-Torrent Manager - Handles all torrent operations using libtorrent
+Torrent Manager - Qt adapter exposing the torrent core to the GUI
 """
 
-import os
-import time
-import threading
-import pickle
-import json
-from PyQt5.QtCore import QObject, pyqtSignal
-import libtorrent as lt
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from torrent_core import TorrentCore, EVENTS
+
 
 class TorrentManager(QObject):
-    # Signals for GUI updates
+    """Thin QObject wrapper around TorrentCore.
+
+    Every core event is re-emitted as the Qt signal of the same name, which
+    queues it to the receiver's thread. Commands are slots so the window can
+    deliver them on the manager thread; anything else (get_totals,
+    torrent_count...) is looked up on the core.
+    """
+
+    # Signals for GUI updates, one per core event (see torrent_core.EVENTS)
     torrent_added = pyqtSignal(str, dict)  # hash, info
-    torrent_updated = pyqtSignal(str, dict)  # hash, info
+    torrents_added = pyqtSignal(list)  # [(hash, info)] restored in one batch
+    session_restored = pyqtSignal(int, float)  # torrent count, seconds
+    torrents_updated = pyqtSignal(dict)  # {hash: (info, FIELD_BITS mask)} for every torrent changed this tick
     torrent_removed = pyqtSignal(str)  # hash
+    torrents_removed = pyqtSignal(list)  # [hash] removed in one batch
     error_occurred = pyqtSignal(str, str)  # title, message
     torrent_completed = pyqtSignal(str, dict)  # hash, info
-    
-    def __init__(self):
+    poll_cadence_changed = pyqtSignal(str, int)  # mode, interval ms
+    import_progress = pyqtSignal(int, int, float)  # files processed, total, files per second
+    import_finished = pyqtSignal(dict)  # bulk import summary
+    metadata_resolved = pyqtSignal(str, dict)  # hash, {'name', 'total_size', 'files'}
+    bandwidth_mode_changed = pyqtSignal(str, bool)  # 'normal', 'alternative' or 'unlimited', alternative limits on
+    setting_tuned = pyqtSignal(dict)  # auto-tuner log entry
+    files_updated = pyqtSignal(str, object, object)  # hash, [(path, size)] or None, file progress or None
+    metadata_looked_up = pyqtSignal(str, object)  # hash, summary if already known (else metadata_resolved follows)
+
+    def __init__(self, core=None):
         super().__init__()
-        
-        # Initialize libtorrent session
-        self.session = lt.session()
-        self.session.listen_on(6881, 6891)
-        
-        # Set session settings (compatible with both old and new libtorrent versions)
-        try:
-            # Try new API first (libtorrent 2.0+)
-            settings = lt.settings_pack()
-            settings['user_agent'] = 'PyTorrent/1.0.0'
-            settings['enable_dht'] = True
-            settings['enable_lsd'] = True
-            settings['enable_upnp'] = True
-            settings['enable_natpmp'] = True
-            self.session.apply_settings(settings)
-        except AttributeError:
-            # Fall back to old API (libtorrent 1.x)
-            settings = self.session.get_settings()
-            settings['user_agent'] = 'PyTorrent/1.0.0'
-            settings['enable_dht'] = True
-            settings['enable_lsd'] = True
-            settings['enable_upnp'] = True
-            settings['enable_natpmp'] = True
-            self.session.apply_settings(settings)
-        
-        # Start DHT
-        self.session.start_dht()
-        
-        # Add DHT routers
-        self.session.add_dht_router('router.bittorrent.com', 6881)
-        self.session.add_dht_router('dht.transmissionbt.com', 6881)
-        
-        # Torrent handles storage
-        self.torrent_handles = {}  # hash -> handle
-        self.torrent_info_cache = {}  # hash -> info dict
-        self.pending_file_priorities = {}  # hash -> selected_files (for magnets)
-        self.completed_torrents = set()  # Track which torrents have already been marked complete
-        
-        # Default download directory
-        self.default_download_path = os.path.join(os.path.expanduser('~'), 'Downloads', 'PyTorrent')
-        os.makedirs(self.default_download_path, exist_ok=True)
-        
-        # Resume data directory
-        self.resume_data_path = os.path.join(os.path.expanduser('~'), '.pytorrent', 'resume_data')
-        os.makedirs(self.resume_data_path, exist_ok=True)
-        
-        # Load existing torrents from resume data
-        self.load_resume_data()
-        
-    def load_resume_data(self):
-        """Load torrents from saved resume data"""
+        self.core = core if core is not None else TorrentCore()
+        for event in EVENTS:
+            self.core.events.subscribe(event, getattr(self, event).emit)
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the adapter itself
+        core = self.__dict__.get('core')
+        if core is None:
+            raise AttributeError(name)
+        return getattr(core, name)
+
+    @pyqtSlot()
+    def start(self):
+        """Start polling; called on the manager thread once it is running"""
+        self.core.start()
+
+    @pyqtSlot()
+    def restore_session(self):
+        self.core.restore_session()
+
+    @pyqtSlot(str, object, object)
+    def add_torrent_file(self, torrent_file_path, download_path=None, selected_files=None):
+        return self.core.add_torrent_file(torrent_file_path, download_path, selected_files)
+
+    @pyqtSlot(str, object, object)
+    def add_magnet_link(self, magnet_link, download_path=None, selected_files=None):
+        return self.core.add_magnet_link(magnet_link, download_path, selected_files)
+
+    @pyqtSlot(str)
+    def resolve_metadata(self, magnet_link):
         try:
-            session_file = os.path.join(self.resume_data_path, 'session.json')
-            if not os.path.exists(session_file):
-                return
-                
-            with open(session_file, 'r') as f:
-                session_data = json.load(f)
-                
-            for torrent_data in session_data.get('torrents', []):
-                try:
-                    torrent_hash = torrent_data['hash']
-                    resume_file = os.path.join(self.resume_data_path, f"{torrent_hash}.resume")
-                    
-                    if os.path.exists(resume_file):
-                        # Create add_torrent_params
-                        params = lt.add_torrent_params()
-                        
-                        # Load resume data
-                        with open(resume_file, 'rb') as rf:
-                            params.resume_data = rf.read()
-                            
-                        params.save_path = torrent_data.get('save_path', self.default_download_path)
-                        
-                        # Add torrent file if available
-                        if 'torrent_file' in torrent_data and os.path.exists(torrent_data['torrent_file']):
-                            params.ti = lt.torrent_info(torrent_data['torrent_file'])
-                        elif 'magnet_link' in torrent_data:
-                            # Parse magnet link
-                            magnet_params = lt.parse_magnet_uri(torrent_data['magnet_link'])
-                            params.info_hash = magnet_params.info_hash
-                            params.name = magnet_params.name
-                            
-                        # Add to session
-                        handle = self.session.add_torrent(params)
-                        self.torrent_handles[torrent_hash] = handle
-                        
-                        # Get initial info and emit signal
-                        info = self._get_torrent_status(handle)
-                        self.torrent_info_cache[torrent_hash] = info
-                        self.torrent_added.emit(torrent_hash, info)
-                        
-                except Exception as e:
-                    print(f"Error loading torrent {torrent_data.get('hash', 'unknown')}: {e}")
-                    continue
-                    
+            torrent_hash, metadata = self.core.resolve_metadata(magnet_link)
         except Exception as e:
-            print(f"Error loading resume data: {e}")
-            
-    def save_resume_data(self):
-        """Save current session and resume data"""
+            self.error_occurred.emit("Magnet Link Error", f"Failed to fetch metadata: {str(e)}")
+            return
+        self.metadata_looked_up.emit(torrent_hash, metadata)
+
+    @pyqtSlot(str)
+    def cancel_metadata(self, torrent_hash):
+        self.core.cancel_metadata(torrent_hash)
+
+    @pyqtSlot(list, object)
+    def start_import(self, paths, download_path=None):
+        self.core.start_import(paths, download_path)
+        
+    @pyqtSlot(str)
+    def pause_torrent(self, torrent_hash):
+        self.core.pause_torrent(torrent_hash)
+
+    @pyqtSlot(str)
+    def resume_torrent(self, torrent_hash):
+        self.core.resume_torrent(torrent_hash)
+
+    @pyqtSlot(str, bool)
+    def remove_torrent(self, torrent_hash, delete_files=False):
+        self.core.remove_torrent(torrent_hash, delete_files)
+
+    @pyqtSlot(str, object, object)
+    def set_file_priority(self, torrent_hash, files, priority):
         try:
-            session_data = {'torrents': []}
-            
-            for torrent_hash, handle in self.torrent_handles.items():
-                if not handle.is_valid():
-                    continue
-                    
-                try:
-                    # Request resume data
-                    handle.save_resume_data()
-                    
-                    # Collect torrent info
-                    torrent_data = {
-                        'hash': torrent_hash,
-                        'save_path': handle.save_path(),
-                        'name': handle.name() if handle.has_metadata() else 'Unknown'
-                    }
-                    
-                    # Store torrent file path if available
-                    if handle.torrent_file():
-                        torrent_file_path = os.path.join(self.resume_data_path, f"{torrent_hash}.torrent")
-                        with open(torrent_file_path, 'wb') as f:
-                            f.write(lt.bencode(handle.torrent_file().to_dict()))
-                        torrent_data['torrent_file'] = torrent_file_path
-                        
-                    session_data['torrents'].append(torrent_data)
-                    
-                except Exception as e:
-                    print(f"Error saving resume data for {torrent_hash}: {e}")
-                    continue
-            
-            # Save session data
-            session_file = os.path.join(self.resume_data_path, 'session.json')
-            with open(session_file, 'w') as f:
-                json.dump(session_data, f, indent=2)
-                
-            # Wait for resume data to be generated
-            time.sleep(1)
-            
-            # Save resume data files
-            alerts = self.session.pop_alerts()
-            for alert in alerts:
-                if isinstance(alert, lt.save_resume_data_alert):
-                    resume_file = os.path.join(self.resume_data_path, f"{str(alert.handle.info_hash())}.resume")
-                    with open(resume_file, 'wb') as f:
-                        f.write(lt.bencode(alert.resume_data))
-                        
+            self.core.set_file_priority(torrent_hash, files, priority)
         except Exception as e:
-            error_msg = f"Error saving resume data: {str(e)}"
-            self.error_occurred.emit("Save Error", error_msg)
-        
-    def add_torrent_file(self, torrent_file_path, download_path=None, selected_files=None):
-        """Add a torrent from file"""
+            self.error_occurred.emit("File Priority Error", f"Failed to set file priorities: {str(e)}")
+
+    @pyqtSlot(str, bool)
+    def fetch_files(self, torrent_hash, include_files):
+        """Read a torrent's file list (if asked for) and per-file progress off the GUI thread"""
+        files = file_progress = None
         try:
-            if download_path is None:
-                download_path = self.default_download_path
-                
-            # Load torrent info
-            torrent_info = lt.torrent_info(torrent_file_path)
-            
-            # Create add_torrent_params
-            params = lt.add_torrent_params()
-            params.ti = torrent_info
-            params.save_path = download_path
-            params.storage_mode = lt.storage_mode_t.storage_mode_sparse
-            
-            # Add torrent to session
-            handle = self.session.add_torrent(params)
-            torrent_hash = str(handle.info_hash())
-            
-            # Store handle
-            self.torrent_handles[torrent_hash] = handle
-            
-            # Set file priorities if specified
-            if selected_files is not None and handle.has_metadata():
-                self.set_file_priorities(handle, selected_files)
-            
-            # Get initial info
-            info = self._get_torrent_status(handle)
-            self.torrent_info_cache[torrent_hash] = info
-            
-            # Emit signal
-            self.torrent_added.emit(torrent_hash, info)
-            
-            # Save resume data for persistence
-            self.save_resume_data()
-            
-            return torrent_hash
-            
+            if include_files:
+                files = self.core.get_files(torrent_hash)
+            file_progress = self.core.get_file_progress(torrent_hash)
         except Exception as e:
-            error_msg = f"Failed to add torrent file: {str(e)}"
-            self.error_occurred.emit("Add Torrent Error", error_msg)
-            return None
-            
-    def add_magnet_link(self, magnet_link, download_path=None, selected_files=None):
-        """Add a torrent from magnet link"""
+            print(f"Error fetching files: {e}")
+        self.files_updated.emit(torrent_hash, files, file_progress)
+
+    @pyqtSlot(dict)
+    def set_bandwidth_schedule(self, settings):
+        self.core.set_bandwidth_schedule(settings)
+
+    @pyqtSlot(bool)
+    def set_alt_limits(self, enabled):
+        self.core.set_alt_limits(enabled)
+
+    @pyqtSlot(dict)
+    def set_queue_settings(self, settings):
+        self.core.set_queue_settings(settings)
+
+    @pyqtSlot(list, str)
+    def move_queue_positions(self, torrent_hashes, direction):
+        self.core.move_queue_positions(torrent_hashes, direction)
+
+    @pyqtSlot(list, object)
+    def set_torrents_category(self, torrent_hashes, name):
         try:
-            if download_path is None:
-                download_path = self.default_download_path
-                
-            # Parse magnet link
-            params = lt.parse_magnet_uri(magnet_link)
-            params.save_path = download_path
-            params.storage_mode = lt.storage_mode_t.storage_mode_sparse
-            
-            # Add torrent to session
-            handle = self.session.add_torrent(params)
-            torrent_hash = str(handle.info_hash())
-            
-            # Store handle
-            self.torrent_handles[torrent_hash] = handle
-            
-            # Store file priorities for when metadata becomes available
-            if selected_files is not None:
-                self.pending_file_priorities[torrent_hash] = selected_files
-            
-            # Get initial info
-            info = self._get_torrent_status(handle)
-            self.torrent_info_cache[torrent_hash] = info
-            
-            # Emit signal
-            self.torrent_added.emit(torrent_hash, info)
-            
-            # Save resume data for persistence
-            self.save_resume_data()
-            
-            return torrent_hash
-            
+            self.core.set_torrents_category(torrent_hashes, name)
         except Exception as e:
-            error_msg = f"Failed to add magnet link: {str(e)}"
-            self.error_occurred.emit("Add Magnet Error", error_msg)
-            return None
-            
-    def pause_torrent(self, torrent_hash):
-        """Pause a torrent"""
-        if torrent_hash in self.torrent_handles:
-            handle = self.torrent_handles[torrent_hash]
-            handle.pause()
-            
-    def resume_torrent(self, torrent_hash):
-        """Resume a torrent"""
-        if torrent_hash in self.torrent_handles:
-            handle = self.torrent_handles[torrent_hash]
-            handle.resume()
-            
-    def remove_torrent(self, torrent_hash, delete_files=False):
-        """Remove a torrent"""
-        if torrent_hash in self.torrent_handles:
-            handle = self.torrent_handles[torrent_hash]
-            
-            # Remove from session
-            if delete_files:
-                self.session.remove_torrent(handle, lt.session.delete_files)
-            else:
-                self.session.remove_torrent(handle)
-                
-            # Remove from our storage
-            del self.torrent_handles[torrent_hash]
-            if torrent_hash in self.torrent_info_cache:
-                del self.torrent_info_cache[torrent_hash]
-            if torrent_hash in self.pending_file_priorities:
-                del self.pending_file_priorities[torrent_hash]
-            if torrent_hash in self.completed_torrents:
-                self.completed_torrents.remove(torrent_hash)
-                
-            # Emit signal
-            self.torrent_removed.emit(torrent_hash)
-            
-            # Save resume data to reflect removal
-            self.save_resume_data()
-            
-    def set_file_priorities(self, handle, selected_files):
-        """Set file priorities based on selected files"""
+            self.error_occurred.emit("Category Error", f"Failed to set category: {str(e)}")
+
+    @pyqtSlot(dict, list)
+    def update_categories(self, categories, removed):
         try:
-            if not handle.has_metadata():
-                return
-                
-            torrent_info = handle.torrent_file()
-            if not torrent_info:
-                return
-                
-            num_files = torrent_info.num_files()
-            priorities = []
-            
-            for i in range(num_files):
-                if selected_files is None or i in selected_files:
-                    priorities.append(4)  # Normal priority
-                else:
-                    priorities.append(0)  # Don't download
-                    
-            handle.prioritize_files(priorities)
-            
+            for name in removed:
+                self.core.remove_category(name)
+            for name, settings in categories.items():
+                self.core.set_category(name, settings)
         except Exception as e:
-            error_msg = f"Failed to set file priorities: {str(e)}"
-            self.error_occurred.emit("File Priority Error", error_msg)
-            
-    def get_torrent_info(self, torrent_hash):
-        """Get information about a specific torrent"""
-        return self.torrent_info_cache.get(torrent_hash, {})
-        
-    def get_all_torrent_info(self):
-        """Get information about all torrents"""
-        return self.torrent_info_cache.copy()
-        
-    def update_torrents(self):
-        """Update information for all torrents"""
-        for torrent_hash, handle in self.torrent_handles.items():
-            try:
-                info = self._get_torrent_status(handle)
-                
-                # Check for pending file priorities (magnet links getting metadata)
-                if torrent_hash in self.pending_file_priorities and handle.has_metadata():
-                    selected_files = self.pending_file_priorities.pop(torrent_hash)
-                    self.set_file_priorities(handle, selected_files)
-                
-                # Check for completion
-                if (info.get('progress', 0) >= 100.0 and 
-                    torrent_hash not in self.completed_torrents and
-                    info.get('state', '').lower() in ['finished', 'seeding']):
-                    self.completed_torrents.add(torrent_hash)
-                    self.torrent_completed.emit(torrent_hash, info)
-                
-                # Check if info changed significantly
-                old_info = self.torrent_info_cache.get(torrent_hash, {})
-                if self._info_changed(old_info, info):
-                    self.torrent_info_cache[torrent_hash] = info
-                    self.torrent_updated.emit(torrent_hash, info)
-                else:
-                    # Still update cache even if no signal emitted
-                    self.torrent_info_cache[torrent_hash] = info
-                    
-            except Exception as e:
-                # Only emit error for critical failures, not routine update issues
-                if "invalid handle" not in str(e).lower():
-                    error_msg = f"Error updating torrent: {str(e)}"
-                    self.error_occurred.emit("Update Error", error_msg)
-                
-    def _get_torrent_status(self, handle):
-        """Get status information from a torrent handle"""
+            self.error_occurred.emit("Category Error", f"Failed to save categories: {str(e)}")
+
+    @pyqtSlot(dict)
+    def set_performance_settings(self, settings):
         try:
-            status = handle.status()
-            
-            # Calculate progress
-            progress = 0
-            if status.total_wanted > 0:
-                progress = (status.total_wanted_done / status.total_wanted) * 100
-                
-            # Calculate ETA
-            eta = 0
-            if status.download_rate > 0 and status.total_wanted > status.total_wanted_done:
-                eta = (status.total_wanted - status.total_wanted_done) / status.download_rate
-                
-            # Get state string
-            state_names = {
-                lt.torrent_status.queued_for_checking: 'Queued',
-                lt.torrent_status.checking_files: 'Checking',
-                lt.torrent_status.downloading_metadata: 'Downloading metadata',
-                lt.torrent_status.downloading: 'Downloading',
-                lt.torrent_status.finished: 'Finished',
-                lt.torrent_status.seeding: 'Seeding',
-                lt.torrent_status.allocating: 'Allocating',
-                lt.torrent_status.checking_resume_data: 'Checking resume data'
-            }
-            
-            state = state_names.get(status.state, 'Unknown')
-            if status.paused:
-                state = 'Paused'
-                
-            # Get ratio
-            ratio = 0
-            if status.total_done > 0:
-                ratio = status.all_time_upload / status.total_done
-                
-            return {
-                'name': handle.name() if handle.has_metadata() else 'Loading...',
-                'hash': str(handle.info_hash()),
-                'total_size': status.total_wanted,
-                'downloaded': status.total_wanted_done,
-                'uploaded': status.all_time_upload,
-                'download_rate': status.download_rate,
-                'upload_rate': status.upload_rate,
-                'progress': progress,
-                'eta': eta,
-                'ratio': ratio,
-                'state': state,
-                'num_peers': status.num_peers,
-                'num_seeds': status.num_seeds,
-                'save_path': handle.save_path(),
-                'paused': status.paused
-            }
-            
+            self.core.set_performance_settings(settings)
         except Exception as e:
-            # Return error state without emitting signal (called frequently)
-            return {
-                'name': 'Error',
-                'hash': str(handle.info_hash()),
-                'total_size': 0,
-                'downloaded': 0,
-                'uploaded': 0,
-                'download_rate': 0,
-                'upload_rate': 0,
-                'progress': 0,
-                'eta': 0,
-                'ratio': 0,
-                'state': 'Error',
-                'num_peers': 0,
-                'num_seeds': 0,
-                'save_path': '',
-                'paused': False
-            }
-            
-    def _info_changed(self, old_info, new_info):
-        """Check if torrent info has changed significantly"""
-        if not old_info:
-            return True
-            
-        # Check for significant changes
-        significant_keys = ['progress', 'download_rate', 'upload_rate', 'state', 'num_peers']
-        
-        for key in significant_keys:
-            old_val = old_info.get(key, 0)
-            new_val = new_info.get(key, 0)
-            
-            # For numeric values, check if change is significant
-            if isinstance(old_val, (int, float)) and isinstance(new_val, (int, float)):
-                if abs(old_val - new_val) > 0.1:  # Threshold for change
-                    return True
-            else:
-                if old_val != new_val:
-                    return True
-                    
-        return False
-        
+            self.error_occurred.emit("Performance Settings Error", f"Failed to apply performance settings: {str(e)}")
+
+    @pyqtSlot(int)
+    def set_checkpoint_interval(self, seconds):
+        self.core.set_checkpoint_interval(seconds)
+
+    @pyqtSlot(bool)
+    def set_window_visible(self, visible):
+        self.core.set_window_visible(visible)
+
+    @pyqtSlot(str)
     def set_download_path(self, path):
-        """Set default download path"""
-        self.default_download_path = path
-        os.makedirs(path, exist_ok=True)
+        self.core.set_download_path(path)
         
+    @pyqtSlot(object, bool)
+    def set_watch_folder(self, path, use_polling=False):
+        self.core.set_watch_folder(path, use_polling)
+
+    @pyqtSlot(dict)
     def apply_session_settings(self, settings_dict):
-        """Apply new settings to the session"""
-        try:
-            # Connection settings
-            if 'port' in settings_dict:
-                self.session.listen_on(settings_dict['port'], settings_dict['port'] + 10)
-            
-            # Try new API first (libtorrent 2.0+)
-            try:
-                settings = lt.settings_pack()
-                
-                if 'enable_dht' in settings_dict:
-                    settings['enable_dht'] = settings_dict['enable_dht']
-                if 'enable_lsd' in settings_dict:
-                    settings['enable_lsd'] = settings_dict['enable_lsd']
-                if 'enable_upnp' in settings_dict:
-                    settings['enable_upnp'] = settings_dict['enable_upnp']
-                if 'enable_natpmp' in settings_dict:
-                    settings['enable_natpmp'] = settings_dict['enable_natpmp']
-                if 'max_connections' in settings_dict:
-                    settings['connections_limit'] = settings_dict['max_connections']
-                if 'max_uploads' in settings_dict:
-                    settings['unchoke_slots_limit'] = settings_dict['max_uploads']
-                    
-                # Bandwidth settings
-                if 'download_limit' in settings_dict and settings_dict.get('limit_download', False):
-                    settings['download_rate_limit'] = settings_dict['download_limit'] * 1024  # Convert KB/s to B/s
-                else:
-                    settings['download_rate_limit'] = 0  # Unlimited
-                    
-                if 'upload_limit' in settings_dict and settings_dict.get('limit_upload', False):
-                    settings['upload_rate_limit'] = settings_dict['upload_limit'] * 1024  # Convert KB/s to B/s
-                else:
-                    settings['upload_rate_limit'] = 0  # Unlimited
-                    
-                # Apply settings
-                self.session.apply_settings(settings)
-                
-            except AttributeError:
-                # Fall back to old API (libtorrent 1.x)
-                settings = self.session.get_settings()
-                
-                if 'enable_dht' in settings_dict:
-                    settings['enable_dht'] = settings_dict['enable_dht']
-                if 'enable_lsd' in settings_dict:
-                    settings['enable_lsd'] = settings_dict['enable_lsd']
-                if 'enable_upnp' in settings_dict:
-                    settings['enable_upnp'] = settings_dict['enable_upnp']
-                if 'enable_natpmp' in settings_dict:
-                    settings['enable_natpmp'] = settings_dict['enable_natpmp']
-                if 'max_connections' in settings_dict:
-                    settings['connections_limit'] = settings_dict['max_connections']
-                if 'max_uploads' in settings_dict:
-                    settings['unchoke_slots_limit'] = settings_dict['max_uploads']
-                    
-                # Bandwidth settings (old API uses different names)
-                if 'download_limit' in settings_dict and settings_dict.get('limit_download', False):
-                    settings['download_rate_limit'] = settings_dict['download_limit'] * 1024
-                else:
-                    settings['download_rate_limit'] = 0
-                    
-                if 'upload_limit' in settings_dict and settings_dict.get('limit_upload', False):
-                    settings['upload_rate_limit'] = settings_dict['upload_limit'] * 1024
-                else:
-                    settings['upload_rate_limit'] = 0
-                    
-                # Apply settings using old API
-                self.session.apply_settings(settings)
-            
-        except Exception as e:
-            error_msg = f"Failed to apply settings: {str(e)}"
-            self.error_occurred.emit("Settings Error", error_msg)
-        
+        self.core.apply_session_settings(settings_dict)
+
+    @pyqtSlot()
     def shutdown(self):
-        """Shutdown the torrent manager"""
-        try:
-            # Save resume data before shutdown
-            self.save_resume_data()
-            
-            # Pause all torrents
-            for handle in self.torrent_handles.values():
-                if handle.is_valid():
-                    handle.pause()
-            
-            # Clear handles
-            self.torrent_handles.clear()
-            self.torrent_info_cache.clear()
-            
-        except Exception as e:
-            error_msg = f"Error during shutdown: {str(e)}"
-            self.error_occurred.emit("Shutdown Error", error_msg) 
\ No newline at end of file
+        self.core.shutdown()
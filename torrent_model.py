@@ -0,0 +1,244 @@
+"""
+Torrent Model - Table model backing the torrent list view
+"""
+
+from bisect import bisect_left
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from status_table import FIELD_BITS, ALL_FIELDS
+
+COLUMNS = [
+    "Name", "Size", "Progress", "Download Speed",
+    "Upload Speed", "ETA", "Ratio", "Status", "#"
+]
+PROGRESS_COLUMN = 2
+
+# Custom data roles
+STATE_ROLE = Qt.UserRole  # Torrent state, read by the progress delegate
+PROGRESS_ROLE = Qt.UserRole + 1  # Numeric progress (0-100)
+HASH_ROLE = Qt.UserRole + 2  # Info hash of the row
+
+
+def format_size(size_bytes):
+    """Format file size in human readable format"""
+    if size_bytes == 0:
+        return "0 B"
+
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size_bytes < 1024.0:
+            return f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1024.0
+    return f"{size_bytes:.1f} PB"
+
+
+def format_speed(speed_bytes):
+    """Format speed in human readable format"""
+    return f"{format_size(speed_bytes)}/s"
+
+
+def format_eta(eta_seconds):
+    """Format ETA in human readable format"""
+    if eta_seconds <= 0:
+        return "∞"
+
+    if eta_seconds < 60:
+        return f"{int(eta_seconds)}s"
+    elif eta_seconds < 3600:
+        return f"{int(eta_seconds // 60)}m {int(eta_seconds % 60)}s"
+    elif eta_seconds < 86400:
+        hours = int(eta_seconds // 3600)
+        minutes = int((eta_seconds % 3600) // 60)
+        return f"{hours}h {minutes}m"
+    else:
+        days = int(eta_seconds // 86400)
+        hours = int((eta_seconds % 86400) // 3600)
+        return f"{days}d {hours}h"
+
+
+# Display text of each column, and the info fields it depends on
+CELL_FORMATTERS = [
+    lambda info: info.get('name', 'Unknown'),
+    lambda info: format_size(info.get('total_size', 0)),
+    lambda info: f"{info.get('progress', 0):.1f}%",
+    lambda info: format_speed(info.get('download_rate', 0)),
+    lambda info: format_speed(info.get('upload_rate', 0)),
+    lambda info: format_eta(info.get('eta', 0)),
+    lambda info: f"{info.get('ratio', 0):.2f}",
+    lambda info: info.get('state', 'Unknown'),
+    lambda info: str(info['queue_position'] + 1) if info.get('queue_position', -1) >= 0 else ""
+]
+COLUMN_FIELDS = [
+    FIELD_BITS['name'],
+    FIELD_BITS['total_size'],
+    FIELD_BITS['progress'] | FIELD_BITS['state'],  # The progress bar is colored by state
+    FIELD_BITS['download_rate'],
+    FIELD_BITS['upload_rate'],
+    FIELD_BITS['eta'],
+    FIELD_BITS['ratio'],
+    FIELD_BITS['state'],
+    FIELD_BITS['queue_position']
+]
+
+
+def format_cells(torrent_info):
+    """Get the display text of every column for a torrent"""
+    return [formatter(torrent_info) for formatter in CELL_FORMATTERS]
+
+
+class TorrentTableModel(QAbstractTableModel):
+    """Torrent list model with an O(1) hash -> row index.
+
+    Updates carry a FIELD_BITS mask of the fields that changed, and only the
+    cells depending on those fields are formatted and get dataChanged.
+    Rows outside the viewport are only marked dirty and formatted when the
+    view asks for them again.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._hashes = []  # row -> hash
+        self._rows = {}  # hash -> row
+        self._infos = []  # row -> info dict
+        self._cells = []  # row -> formatted column strings
+        self._dirty = set()  # Rows whose cells are stale
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._hashes)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        if role == Qt.DisplayRole:
+            if row in self._dirty:
+                # Row scrolled into view since it was last updated
+                self._dirty.discard(row)
+                self._cells[row] = format_cells(self._infos[row])
+            return self._cells[row][index.column()]
+        elif role == PROGRESS_ROLE:
+            return self._infos[row].get('progress', 0)
+        elif role == STATE_ROLE:
+            return self._infos[row].get('state', 'Unknown')
+        elif role == HASH_ROLE:
+            return self._hashes[row]
+        return None
+
+    def hash_at(self, row):
+        """Get the info hash of a row"""
+        if 0 <= row < len(self._hashes):
+            return self._hashes[row]
+        return None
+
+    def row_of(self, torrent_hash):
+        """Get the row of an info hash, or -1"""
+        return self._rows.get(torrent_hash, -1)
+
+    def info(self, torrent_hash):
+        """Get the last info dict shown for a torrent"""
+        row = self._rows.get(torrent_hash)
+        return self._infos[row] if row is not None else {}
+
+    def add_torrents(self, torrents):
+        """Append [(hash, info)] in one insertion"""
+        torrents = [(h, i) for h, i in torrents if h not in self._rows]
+        if not torrents:
+            return
+
+        first = len(self._hashes)
+        self.beginInsertRows(QModelIndex(), first, first + len(torrents) - 1)
+        for torrent_hash, torrent_info in torrents:
+            self._rows[torrent_hash] = len(self._hashes)
+            self._hashes.append(torrent_hash)
+            self._infos.append(torrent_info)
+            self._cells.append(format_cells(torrent_info))
+        self.endInsertRows()
+
+    def add_torrent(self, torrent_hash, torrent_info):
+        self.add_torrents([(torrent_hash, torrent_info)])
+
+    def update_torrents(self, changes, first_visible, last_visible):
+        """Apply {hash: (info, mask)}; rows outside [first_visible, last_visible] are only marked dirty"""
+        for torrent_hash, (torrent_info, mask) in changes.items():
+            row = self._rows.get(torrent_hash)
+            if row is None:
+                continue
+            if first_visible <= row <= last_visible:
+                self.update_torrent(torrent_hash, torrent_info, mask)
+            else:
+                self._infos[row] = torrent_info
+                self._dirty.add(row)
+
+    def update_torrent(self, torrent_hash, torrent_info, mask=ALL_FIELDS):
+        """Update a row, emitting dataChanged only for cells depending on the fields in mask"""
+        row = self._rows.get(torrent_hash)
+        if row is None:
+            return
+
+        if row in self._dirty:
+            # Fields changed while the row was off screen, recheck every cell
+            self._dirty.discard(row)
+            mask = ALL_FIELDS
+
+        cells = self._cells[row]
+        self._infos[row] = torrent_info
+        for column, fields in enumerate(COLUMN_FIELDS):
+            if not mask & fields:
+                continue
+            text = CELL_FORMATTERS[column](torrent_info)
+            # The progress bar also changes when the text doesn't (state color)
+            if text != cells[column] or column == PROGRESS_COLUMN:
+                cells[column] = text
+                index = self.index(row, column)
+                self.dataChanged.emit(index, index)
+
+    def remove_torrents(self, torrent_hashes):
+        """Remove many rows, one contiguous range at a time, and reindex once"""
+        rows = sorted((self._rows.pop(h) for h in torrent_hashes if h in self._rows), reverse=True)
+        if not rows:
+            return
+
+        removed = set(rows)
+        # Walk ranges bottom-up so earlier row numbers stay valid
+        i = 0
+        while i < len(rows):
+            last = first = rows[i]
+            while i + 1 < len(rows) and rows[i + 1] == first - 1:
+                i += 1
+                first = rows[i]
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._hashes[first:last + 1]
+            del self._infos[first:last + 1]
+            del self._cells[first:last + 1]
+            self.endRemoveRows()
+            i += 1
+
+        for row, torrent_hash in enumerate(self._hashes):
+            self._rows[torrent_hash] = row
+        # Shift dirty rows down by the number of removed rows above them
+        rows.reverse()
+        self._dirty = {r - bisect_left(rows, r) for r in self._dirty if r not in removed}
+
+    def remove_torrent(self, torrent_hash):
+        """Remove a row and reindex the rows after it"""
+        row = self._rows.pop(torrent_hash, None)
+        if row is None:
+            return
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._hashes[row]
+        del self._infos[row]
+        del self._cells[row]
+        for i in range(row, len(self._hashes)):
+            self._rows[self._hashes[i]] = i
+        self._dirty = {r if r < row else r - 1 for r in self._dirty if r != row}
+        self.endRemoveRows()
@@ -0,0 +1,269 @@
+"""
+Watch Folder - Picks up .torrent and .magnet files dropped into a spool directory
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+
+# Files picked up from the watched directory
+WATCH_EXTENSIONS = ('.torrent', '.magnet')
+
+# Where processed files are moved, inside the watched directory
+DONE_DIR = 'done'
+FAILED_DIR = 'failed'
+
+# inotify constants (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# struct inotify_event: wd, mask, cookie, len, then len bytes of name
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class Inotify:
+    """Minimal ctypes binding for inotify on a single directory"""
+
+    def __init__(self, path, mask):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        if libc.inotify_add_watch(self.fd, os.fsencode(path), ctypes.c_uint32(mask)) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, os.strerror(error), path)
+        # poll() rather than select(): the session's sockets push fd numbers past FD_SETSIZE
+        self._poller = select.poll()
+        self._poller.register(self.fd, select.POLLIN)
+
+    def read(self, timeout):
+        """Wait up to timeout seconds for events, returns [(mask, name)]"""
+        if not self._poller.poll(max(timeout, 0) * 1000):
+            return []
+
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 256 * 1024)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EINTR):
+                    break
+                raise
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                events.append((mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class WatchFolder:
+    """Watches a spool directory and hands finished files to ingest in batches.
+
+    On Linux, inotify reports a file as soon as its writer closes it or it
+    is renamed into the directory. Elsewhere, or with use_polling (network
+    shares don't deliver inotify events), the directory is scanned every
+    POLL_INTERVAL seconds and a file counts as finished once its size and
+    mtime stayed the same for SETTLE_SECONDS. Dot files are ignored, so
+    writers can use a hidden temporary name and rename it when done.
+
+    Finished files are grouped until none arrived for BATCH_QUIET_SECONDS,
+    MAX_BATCH are waiting or the oldest waited BATCH_MAX_DELAY seconds.
+    ingest(paths) returns {path: error or None}, and each file is then
+    moved to done/ or failed/ inside the watched directory.
+    """
+
+    POLL_INTERVAL = 2.0
+    SETTLE_SECONDS = 2.0
+    BATCH_QUIET_SECONDS = 0.25
+    BATCH_MAX_DELAY = 2.0
+    MAX_BATCH = 1000
+
+    def __init__(self, path, ingest, use_polling=False):
+        self.path = os.path.abspath(path)
+        self.ingest = ingest
+        self.use_polling = use_polling
+        self.mode = None  # 'inotify' or 'polling' once running
+        self.stats = {'batches': 0, 'done': 0, 'failed': 0}
+
+        self._ready = {}  # path -> monotonic time it became ready, oldest first
+        self._last_ready = 0.0
+        self._unsettled = {}  # path -> ((size, mtime_ns), monotonic time first seen like that)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='WatchFolder', daemon=True)
+
+    def start(self):
+        """Create the directories and start watching; raises OSError if that fails"""
+        for directory in (self.path, os.path.join(self.path, DONE_DIR), os.path.join(self.path, FAILED_DIR)):
+            os.makedirs(directory, exist_ok=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching; a batch being ingested is finished first"""
+        self._stopping.set()
+        self._thread.join(10)
+
+    def _run(self):
+        inotify = None
+        if not self.use_polling and sys.platform.startswith('linux'):
+            try:
+                inotify = Inotify(self.path, IN_CLOSE_WRITE | IN_MOVED_TO)
+            except (OSError, AttributeError) as e:
+                print(f"Error watching {self.path} with inotify, polling instead: {e}")
+        self.mode = 'inotify' if inotify is not None else 'polling'
+
+        # Pick up files that arrived while nobody was watching
+        self._scan()
+        next_scan = time.monotonic() + self.POLL_INTERVAL
+        try:
+            while not self._stopping.is_set():
+                now = time.monotonic()
+                # With inotify, scanning is only needed for files found by a scan that aren't finished yet
+                scanning = inotify is None or self._unsettled
+                timeout = self._batch_due_in(now)
+                if scanning:
+                    timeout = min(timeout, next_scan - now)
+
+                if inotify is not None:
+                    for mask, name in inotify.read(timeout):
+                        if mask & IN_Q_OVERFLOW:
+                            self._scan()
+                        elif mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                            print(f"Watch folder {self.path} was removed, polling instead")
+                            inotify.close()
+                            inotify = None
+                            self.mode = 'polling'
+                            break
+                        elif name:
+                            self._mark_ready(os.path.join(self.path, name))
+                else:
+                    self._stopping.wait(max(timeout, 0))
+
+                now = time.monotonic()
+                if (inotify is None or self._unsettled) and now >= next_scan:
+                    self._scan()
+                    next_scan = now + self.POLL_INTERVAL
+                if self._batch_due_in(time.monotonic()) <= 0:
+                    self._process_batch()
+        except Exception as e:
+            print(f"Error in watch folder {self.path}: {e}")
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _wanted(self, name):
+        return not name.startswith('.') and name.lower().endswith(WATCH_EXTENSIONS)
+
+    def _mark_ready(self, path):
+        if path in self._ready or not self._wanted(os.path.basename(path)) or not os.path.isfile(path):
+            return
+        self._unsettled.pop(path, None)
+        self._last_ready = time.monotonic()
+        self._ready[path] = self._last_ready
+
+    def _scan(self):
+        """Mark files whose size and mtime haven't changed for SETTLE_SECONDS as ready"""
+        now = time.monotonic()
+        present = set()
+        try:
+            with os.scandir(self.path) as entries:
+                for entry in entries:
+                    if entry.path in self._ready or not self._wanted(entry.name) or not entry.is_file():
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    present.add(entry.path)
+                    key = (stat.st_size, stat.st_mtime_ns)
+                    previous = self._unsettled.get(entry.path)
+                    if previous is None or previous[0] != key:
+                        self._unsettled[entry.path] = (key, now)
+                    elif now - previous[1] >= self.SETTLE_SECONDS:
+                        self._mark_ready(entry.path)
+        except OSError as e:
+            print(f"Error scanning watch folder {self.path}: {e}")
+            return
+
+        # Forget files that were removed before they settled
+        for path in list(self._unsettled):
+            if path not in present:
+                del self._unsettled[path]
+
+    def _batch_due_in(self, now):
+        """Seconds until the waiting files should be ingested (<= 0: now)"""
+        if not self._ready:
+            return self.POLL_INTERVAL
+        if len(self._ready) >= self.MAX_BATCH:
+            return 0.0
+        oldest = next(iter(self._ready.values()))
+        return min(self._last_ready + self.BATCH_QUIET_SECONDS, oldest + self.BATCH_MAX_DELAY) - now
+
+    def _process_batch(self):
+        paths = []
+        for path in list(self._ready)[:self.MAX_BATCH]:
+            del self._ready[path]
+            if os.path.isfile(path):
+                paths.append(path)
+        if not paths:
+            return
+
+        try:
+            results = self.ingest(paths)
+        except Exception as e:
+            results = {path: str(e) for path in paths}
+
+        self.stats['batches'] += 1
+        for path in paths:
+            error = results.get(path, "Not processed")
+            if error is None:
+                self._move(path, DONE_DIR)
+                self.stats['done'] += 1
+            else:
+                print(f"Error adding {path} from watch folder: {error}")
+                target = self._move(path, FAILED_DIR)
+                if target is not None:
+                    self._write_error(target, error)
+                self.stats['failed'] += 1
+
+    def _move(self, path, directory):
+        """Move a processed file into directory without overwriting, returns the new path"""
+        stem, extension = os.path.splitext(os.path.basename(path))
+        target = os.path.join(self.path, directory, stem + extension)
+        counter = 1
+        while os.path.exists(target):
+            target = os.path.join(self.path, directory, f"{stem}.{counter}{extension}")
+            counter += 1
+        try:
+            os.replace(path, target)
+            return target
+        except OSError as e:
+            print(f"Error moving {path} to {directory}: {e}")
+            return None
+
+    def _write_error(self, target, error):
+        """Leave the reason a file failed next to it"""
+        try:
+            with open(target + '.error', 'w', encoding='utf-8') as f:
+                f.write(f"{error}\n")
+        except OSError as e:
+            print(f"Error writing {target}.error: {e}")